@@ -0,0 +1,49 @@
+import time
+from fastapi import Request
+from src.core.config import settings
+from src.db.metrics import start_request_stats, reset_request_stats, route_db_metrics
+from src.utils.metrics import Gauge, Histogram
+
+http_request_duration = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route", ("method", "route", "status")
+)
+http_requests_in_flight = Gauge(
+    "http_requests_in_flight", "HTTP requests currently being processed", ("method",)
+)
+
+async def db_metrics_middleware(request: Request, call_next):
+    """Считает запросы к БД, время в БД и ожидание пула для каждого HTTP-запроса"""
+    stats, token = start_request_stats()
+    try:
+        response = await call_next(request)
+    finally:
+        reset_request_stats(token)
+    
+    route = request.scope.get("route")
+    if route is not None:
+        route_db_metrics.record(f"{request.method} {route.path}", stats)
+    
+    if settings.debug:
+        response.headers.update(stats.headers())
+        
+    return response
+
+async def http_metrics_middleware(request: Request, call_next):
+    """Латентность запросов по маршрутам и число обрабатываемых запросов"""
+    method = request.method
+    status = 500
+    started = time.perf_counter()
+    http_requests_in_flight.inc(method=method)
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        http_requests_in_flight.dec(method=method)
+        route = request.scope.get("route")
+        http_request_duration.observe(
+            time.perf_counter() - started,
+            method=method,
+            route=route.path if route is not None else "unmatched",
+            status=status,
+        )
@@ -1,44 +1,106 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from decimal import Decimal
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import List, Optional
 
 from src.api.deps import get_db
-from src.schemas.dish import Dish, DishCreate, DishUpdate, DishAvailability
+from src.api.conditional import is_conditional, is_not_modified, make_etag, not_modified, set_validators
+from src.schemas.dish import (
+    Dish, DishCreate, DishUpdate, DishAvailability,
+    DishAvailabilityBulk, DishAvailabilityBulkResult, DishSearchResult
+)
 from src.services.dish import (
-    get_dish, get_dishes, create_dish, update_dish, 
-    update_dish_availability, delete_dish
+    get_dish_in_restaurant, get_dish_last_modified, get_category_dishes_version, get_dishes_json, create_dish, update_dish, 
+    update_dish_availability, update_dishes_availability, delete_dish, search_dishes_json
 )
 from src.services.menu_category import get_menu_category
+from src.utils.pagination import InvalidCursor
 
 router = APIRouter()
+search_router = APIRouter()
+
+@search_router.get("/search", response_model=List[DishSearchResult])
+async def search_dishes(
+    q: str = Query(..., min_length=1, max_length=200),
+    restaurant_id: Optional[int] = None,
+    min_price: Optional[Decimal] = None,
+    max_price: Optional[Decimal] = None,
+    is_available: Optional[bool] = None,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    """Поиск блюд по названию, ингредиентам и описанию (курсор следующей страницы в X-Next-Cursor)"""
+    try:
+        body, next_cursor = await search_dishes_json(
+            db, q, restaurant_id=restaurant_id, min_price=min_price, max_price=max_price,
+            is_available=is_available, limit=limit, cursor=cursor
+        )
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    response = Response(content=body, media_type="application/json")
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return response
+
+@router.put("/availability", response_model=DishAvailabilityBulkResult)
+async def update_dishes_availability_bulk(
+    restaurant_id: int,
+    availability: DishAvailabilityBulk,
+    db: AsyncSession = Depends(get_db)
+):
+    """Стоп-лист: массовое изменение доступности блюд ресторана"""
+    updated_ids = await update_dishes_availability(
+        db, restaurant_id, availability.dish_ids, availability.is_available
+    )
+    updated = set(updated_ids)
+    return DishAvailabilityBulkResult(
+        is_available=availability.is_available,
+        updated_ids=sorted(updated),
+        not_found_ids=sorted(set(availability.dish_ids) - updated)
+    )
 
 @router.get("/{dish_id}", response_model=Dish)
 async def read_dish(
     restaurant_id: int, 
     dish_id: int, 
+    request: Request,
+    response: Response,
     db: AsyncSession = Depends(get_db)
 ):
-    dish = await get_dish(db, dish_id)
-    if dish is None:
-        raise HTTPException(status_code=404, detail="Dish not found")
+    if is_conditional(request):
+        row = await get_dish_last_modified(db, restaurant_id, dish_id)
+        if row is None:
+            raise HTTPException(status_code=404, detail="Dish not found in this restaurant")
+        etag = make_etag("dish", dish_id, row.last_modified)
+        if is_not_modified(request, etag, row.last_modified):
+            return not_modified(etag, row.last_modified)
     
-    category = await get_menu_category(db, dish.category_id)
-    if category is None or category.restaurant_id != restaurant_id:
+    dish = await get_dish_in_restaurant(db, restaurant_id, dish_id)
+    if dish is None:
         raise HTTPException(status_code=404, detail="Dish not found in this restaurant")
     
+    last_modified = dish.updated_at or dish.created_at
+    set_validators(response, make_etag("dish", dish_id, last_modified), last_modified)
     return dish
 
 @router.get("/categories/{category_id}/dishes", response_model=List[Dish])
 async def read_dishes_in_category(
     restaurant_id: int, 
     category_id: int, 
+    request: Request,
     db: AsyncSession = Depends(get_db)
 ):
-    category = await get_menu_category(db, category_id)
-    if category is None or category.restaurant_id != restaurant_id:
+    version = await get_category_dishes_version(db, restaurant_id, category_id)
+    if version is None:
         raise HTTPException(status_code=404, detail="Category not found in this restaurant")
     
-    return await get_dishes(db, category_id)
+    etag = make_etag("category-dishes", category_id, *version)
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+    
+    body = await get_dishes_json(db, category_id)
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
 
 @router.post("/categories/{category_id}/dishes", response_model=Dish, status_code=status.HTTP_201_CREATED)
 async def create_dish_for_category(
@@ -51,7 +113,7 @@ async def create_dish_for_category(
     if category is None or category.restaurant_id != restaurant_id:
         raise HTTPException(status_code=404, detail="Category not found in this restaurant")
     
-    return await create_dish(db, category_id, dish)
+    return await create_dish(db, restaurant_id, category_id, dish)
 
 @router.put("/{dish_id}", response_model=Dish)
 async def update_dish_in_menu(
@@ -60,15 +122,11 @@ async def update_dish_in_menu(
     dish_update: DishUpdate, 
     db: AsyncSession = Depends(get_db)
 ):
-    dish = await get_dish(db, dish_id)
+    dish = await update_dish(db, restaurant_id, dish_id, dish_update)
     if dish is None:
-        raise HTTPException(status_code=404, detail="Dish not found")
-    
-    category = await get_menu_category(db, dish.category_id)
-    if category is None or category.restaurant_id != restaurant_id:
         raise HTTPException(status_code=404, detail="Dish not found in this restaurant")
     
-    return await update_dish(db, dish_id, dish_update)
+    return dish
 
 @router.put("/{dish_id}/availability", response_model=Dish)
 async def update_dish_availability_status(
@@ -77,15 +135,11 @@ async def update_dish_availability_status(
     availability: DishAvailability, 
     db: AsyncSession = Depends(get_db)
 ):
-    dish = await get_dish(db, dish_id)
+    dish = await update_dish_availability(db, restaurant_id, dish_id, availability)
     if dish is None:
-        raise HTTPException(status_code=404, detail="Dish not found")
-    
-    category = await get_menu_category(db, dish.category_id)
-    if category is None or category.restaurant_id != restaurant_id:
         raise HTTPException(status_code=404, detail="Dish not found in this restaurant")
     
-    return await update_dish_availability(db, dish_id, availability)
+    return dish
 
 @router.delete("/{dish_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_dish_from_menu(
@@ -93,12 +147,6 @@ async def delete_dish_from_menu(
     dish_id: int, 
     db: AsyncSession = Depends(get_db)
 ):
-    dish = await get_dish(db, dish_id)
-    if dish is None:
-        raise HTTPException(status_code=404, detail="Dish not found")
-    
-    category = await get_menu_category(db, dish.category_id)
-    if category is None or category.restaurant_id != restaurant_id:
-        raise HTTPException(status_code=404, detail="Dish not found in this restaurant")
-    
-    await delete_dish(db, dish_id)
\ No newline at end of file
+    deleted = await delete_dish(db, restaurant_id, dish_id)
+    if deleted is None:
+        raise HTTPException(status_code=404, detail="Dish not found in this restaurant")
\ No newline at end of file
@@ -0,0 +1,27 @@
+from datetime import datetime
+from fastapi import APIRouter
+from fastapi.responses import StreamingResponse
+from typing import Optional
+
+from src.services.export import (
+    stream_ndjson, restaurants_export_query, menus_export_query, reviews_export_query
+)
+
+router = APIRouter()
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+@router.get("/restaurants")
+async def export_restaurants(updated_since: Optional[datetime] = None):
+    """Все рестораны в NDJSON (один согласованный снимок)"""
+    return StreamingResponse(stream_ndjson(restaurants_export_query(updated_since)), media_type=NDJSON_MEDIA_TYPE)
+
+@router.get("/menus")
+async def export_menus(updated_since: Optional[datetime] = None):
+    """Все блюда с категорией и id ресторана в NDJSON (один согласованный снимок)"""
+    return StreamingResponse(stream_ndjson(menus_export_query(updated_since)), media_type=NDJSON_MEDIA_TYPE)
+
+@router.get("/reviews")
+async def export_reviews(updated_since: Optional[datetime] = None):
+    """Все отзывы в NDJSON (один согласованный снимок)"""
+    return StreamingResponse(stream_ndjson(reviews_export_query(updated_since)), media_type=NDJSON_MEDIA_TYPE)
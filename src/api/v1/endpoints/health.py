@@ -1,9 +1,12 @@
 from fastapi import APIRouter, Depends
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from datetime import datetime
 import logging
-from src.utils.kafka.producer import event_producer
-from src.utils.kafka.consumer import review_consumer
+from src.utils.kafka.outbox_relay import outbox_relay
+from src.db.session import get_pool_stats
+from src.utils.health import readiness
+from src.db.metrics import route_db_metrics
+from src.utils.metrics import registry as metrics_registry, CONTENT_TYPE as METRICS_CONTENT_TYPE
 
 logger = logging.getLogger(__name__)
 
@@ -11,26 +14,22 @@ router = APIRouter()
 
 @router.get("/health")
 async def health_check():
-    """Проверка здоровья сервиса"""
+    """Проверка здоровья сервиса (сводка по проверкам готовности)"""
     try:
-        kafka_producer_status = "connected" if event_producer.is_connected() else "disconnected"
-        kafka_consumer_status = "connected" if review_consumer.is_connected() else "disconnected"
+        report = await readiness.check()
+        checks = report["checks"]
         
         health_status = {
-            "status": "healthy", 
+            "status": "healthy" if report["ready"] else "unhealthy",
             "service": "restaurant-service",
-            "database": "connected",
-            "kafka_producer": kafka_producer_status,
-            "kafka_consumer": kafka_consumer_status,
+            "database": "connected" if checks["database"]["ok"] else "disconnected",
+            "kafka_producer": "connected" if checks["kafka_producer"]["ok"] else "disconnected",
+            "kafka_consumer": "connected" if checks["kafka_consumer"]["ok"] else "disconnected",
+            "checks": checks,
             "timestamp": datetime.utcnow().isoformat()
         }
         
-        status_code = 200
-        if kafka_producer_status == "disconnected" or kafka_consumer_status == "disconnected":
-            health_status["status"] = "degraded"
-            status_code = 207
-        
-        return JSONResponse(content=health_status, status_code=status_code)
+        return JSONResponse(content=health_status, status_code=200 if report["ready"] else 503)
         
     except Exception as e:
         logger.error(f"Health check error: {e}")
@@ -40,4 +39,41 @@ async def health_check():
             "error": str(e),
             "timestamp": datetime.utcnow().isoformat()
         }
-        return JSONResponse(content=error_status, status_code=500)
\ No newline at end of file
+        return JSONResponse(content=error_status, status_code=500)
+
+@router.get("/health/live")
+async def liveness():
+    """Liveness: процесс жив и обслуживает event loop, зависимости не проверяются"""
+    return {"status": "alive"}
+
+@router.get("/health/ready")
+async def readiness_check():
+    """Readiness: БД, пул соединений, Kafka и отставание консьюмера (результат кешируется)"""
+    report = await readiness.check()
+    return JSONResponse(
+        content={"status": "ready" if report["ready"] else "not_ready", **report},
+        status_code=200 if report["ready"] else 503,
+    )
+
+@router.get("/health/outbox")
+async def outbox_status():
+    """Состояние outbox: размер очереди и пропускная способность relay"""
+    return {
+        "backlog": await outbox_relay.backlog(),
+        **outbox_relay.stats,
+    }
+
+@router.get("/health/db/pool")
+async def db_pool_status():
+    """Статистика пула соединений с БД"""
+    return get_pool_stats()
+
+@router.get("/health/db/routes")
+async def db_route_stats():
+    """Число запросов к БД и время в БД по маршрутам API"""
+    return route_db_metrics.snapshot()
+
+@router.get("/metrics")
+async def metrics():
+    """Метрики HTTP, пула соединений и Kafka в текстовом формате Prometheus"""
+    return Response(content=metrics_registry.render(), media_type=METRICS_CONTENT_TYPE)
\ No newline at end of file
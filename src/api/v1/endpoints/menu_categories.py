@@ -1,12 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 
 from src.api.deps import get_db
+from src.api.conditional import is_not_modified, make_etag, not_modified
 from src.schemas.menu_category import MenuCategory, MenuCategoryCreate, MenuCategoryUpdate
 from src.schemas.dish import DeleteResponse
 from src.services.menu_category import (
-    get_menu_categories, create_menu_category, get_menu_category, 
+    get_menu_categories_json, get_menu_categories_version, create_menu_category, get_menu_category, 
     update_menu_category, delete_menu_category, get_dishes_count_by_category
 )
 from src.services.restaurant import get_restaurant
@@ -16,10 +17,15 @@ router = APIRouter()
 @router.get("/", response_model=List[MenuCategory])
 async def read_menu_categories(
     restaurant_id: int, 
+    request: Request,
     db: AsyncSession = Depends(get_db)
 ):
-    categories = await get_menu_categories(db, restaurant_id)
-    return categories
+    etag = make_etag("categories", restaurant_id, *await get_menu_categories_version(db, restaurant_id))
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+    
+    body = await get_menu_categories_json(db, restaurant_id)
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
 
 @router.post("/", response_model=MenuCategory, status_code=status.HTTP_201_CREATED)
 async def create_menu_category_for_restaurant(
@@ -49,7 +55,10 @@ async def update_menu_category_endpoint(
     if category is None or category.restaurant_id != restaurant_id:
         raise HTTPException(status_code=404, detail="Category not found in this restaurant")
     
-    updated_category = await update_menu_category(db, category_id, category_update)
+    try:
+        updated_category = await update_menu_category(db, category_id, category_update)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     return updated_category
 
 @router.delete("/{category_id}", response_model=DeleteResponse)
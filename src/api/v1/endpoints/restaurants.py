@@ -1,24 +1,84 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from datetime import datetime, timezone
+from decimal import Decimal
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from sqlalchemy.exc import IntegrityError
+from typing import List, Optional
 
 from src.api.deps import get_db
-from src.schemas.restaurant import Restaurant, RestaurantCreate, RestaurantUpdate
+from src.api.conditional import body_etag, is_not_modified, not_modified, set_validators
+from src.schemas.restaurant import Restaurant, RestaurantCreate, RestaurantUpdate, RestaurantWithMenu, RestaurantNearby
+from src.schemas.menu_import import MenuImport, MenuImportResult
 from src.services.restaurant import (
-    get_restaurants, create_restaurant, get_restaurant, 
-    update_restaurant, delete_restaurant
+    get_restaurants_page_json, create_restaurant, get_restaurant, 
+    update_restaurant, delete_restaurant, get_restaurant_menu_json, discover_restaurants_json,
+    get_nearby_restaurants_json
 )
+from src.services.menu_import import import_menu
+from src.utils.pagination import InvalidCursor
 
 router = APIRouter()
 
 @router.get("/", response_model=List[Restaurant])
 async def read_restaurants(
+    request: Request,
     skip: int = 0, 
     limit: int = 100, 
+    cursor: Optional[str] = None,
     db: AsyncSession = Depends(get_db)
 ):
-    restaurants = await get_restaurants(db, skip=skip, limit=limit)
-    return restaurants
+    try:
+        body, next_cursor = await get_restaurants_page_json(db, skip=skip, limit=limit, cursor=cursor)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    etag = body_etag((next_cursor or "").encode('utf-8') + body)
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+    
+    response = Response(content=body, media_type="application/json")
+    set_validators(response, etag)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return response
+
+@router.get("/discover", response_model=List[Restaurant])
+async def discover_restaurants(
+    open_now: bool = False,
+    open_at: Optional[datetime] = None,
+    min_price: Optional[Decimal] = None,
+    max_price: Optional[Decimal] = None,
+    exclude_allergens: Optional[List[str]] = Query(None),
+    ingredients: Optional[List[str]] = Query(None),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    """Рестораны, открытые сейчас (или в open_at, без пояса - местное время), с доступными блюдами в диапазоне цен без указанных аллергенов"""
+    if open_now and open_at is None:
+        open_at = datetime.now(timezone.utc)
+    try:
+        body, next_cursor = await discover_restaurants_json(
+            db, open_at=open_at, min_price=min_price, max_price=max_price,
+            exclude_allergens=exclude_allergens, ingredients=ingredients, limit=limit, cursor=cursor
+        )
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    response = Response(content=body, media_type="application/json")
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return response
+
+@router.get("/nearby", response_model=List[RestaurantNearby])
+async def read_nearby_restaurants(
+    lat: float = Query(..., ge=-90, le=90),
+    lon: float = Query(..., ge=-180, le=180),
+    radius_km: float = Query(5.0, gt=0, le=50),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_db)
+):
+    """Ближайшие рестораны в радиусе radius_km: по расстоянию, затем по рейтингу"""
+    body = await get_nearby_restaurants_json(db, lat, lon, radius_km, limit=limit)
+    return Response(content=body, media_type="application/json")
 
 @router.post("/", response_model=Restaurant, status_code=status.HTTP_201_CREATED)
 async def create_new_restaurant(
@@ -27,6 +87,42 @@ async def create_new_restaurant(
 ):
     return await create_restaurant(db, restaurant)
 
+@router.get("/{restaurant_id}/menu", response_model=RestaurantWithMenu)
+async def read_restaurant_menu(
+    restaurant_id: int,
+    request: Request,
+    db: AsyncSession = Depends(get_db)
+):
+    """Полное меню ресторана: категории с блюдами"""
+    body = await get_restaurant_menu_json(db, restaurant_id)
+    if body is None:
+        raise HTTPException(status_code=404, detail="Restaurant not found")
+    etag = body_etag(body)
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
+
+@router.post("/{restaurant_id}/menu/import", response_model=MenuImportResult)
+async def import_restaurant_menu(
+    restaurant_id: int,
+    menu: MenuImport,
+    upsert: bool = False,
+    db: AsyncSession = Depends(get_db)
+):
+    """Импорт полного меню (категории с блюдами) одной транзакцией"""
+    restaurant = await get_restaurant(db, restaurant_id)
+    if restaurant is None:
+        raise HTTPException(status_code=404, detail="Restaurant not found")
+    
+    try:
+        return await import_menu(db, restaurant_id, menu, upsert=upsert)
+    except IntegrityError as e:
+        await db.rollback()
+        raise HTTPException(
+            status_code=400,
+            detail="Menu conflicts with existing categories" + ("" if upsert else "; use upsert=true to update them")
+        )
+
 @router.put("/{restaurant_id}", response_model=Restaurant)
 async def update_restaurant_endpoint(
     restaurant_id: int, 
@@ -1,31 +1,61 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import List, Optional
 
 from src.api.deps import get_db
+from src.api.conditional import is_not_modified, make_etag, not_modified, set_validators
 from src.schemas.review import Review, RestaurantWithReviews
-from src.services.review import get_restaurant_reviews, get_restaurant_with_reviews
+from src.services.review import (
+    get_restaurant_reviews_json, get_restaurant_reviews_version, get_restaurant_with_reviews,
+    get_restaurant_with_reviews_version
+)
+from src.utils.pagination import InvalidCursor
 
 router = APIRouter()
 
 @router.get("/restaurants/{restaurant_id}/reviews", response_model=List[Review])
 async def read_restaurant_reviews(
     restaurant_id: int,
+    request: Request,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     db: AsyncSession = Depends(get_db)
 ):
-    """Получить отзывы ресторана"""
-    reviews = await get_restaurant_reviews(db, restaurant_id, skip=skip, limit=limit)
-    return reviews
+    """Получить отзывы ресторана (skip или курсор из заголовка X-Next-Cursor)"""
+    version = await get_restaurant_reviews_version(db, restaurant_id)
+    etag = make_etag("reviews", restaurant_id, skip, limit, cursor, *version)
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+    
+    try:
+        body, next_cursor = await get_restaurant_reviews_json(db, restaurant_id, skip=skip, limit=limit, cursor=cursor)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    response = Response(content=body, media_type="application/json")
+    set_validators(response, etag)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return response
 
 @router.get("/restaurants/{restaurant_id}/with-reviews", response_model=RestaurantWithReviews)
 async def read_restaurant_with_reviews(
     restaurant_id: int,
+    request: Request,
+    response: Response,
     db: AsyncSession = Depends(get_db)
 ):
     """Получить ресторан с отзывами"""
+    version = await get_restaurant_with_reviews_version(db, restaurant_id)
+    if version is None:
+        raise HTTPException(status_code=404, detail="Restaurant not found")
+    
+    etag = make_etag("restaurant-reviews", restaurant_id, *version)
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+    
     restaurant = await get_restaurant_with_reviews(db, restaurant_id)
     if restaurant is None:
         raise HTTPException(status_code=404, detail="Restaurant not found")
+    set_validators(response, etag)
     return restaurant
\ No newline at end of file
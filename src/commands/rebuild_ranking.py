@@ -0,0 +1,50 @@
+"""Пересчёт ranking_score всех ресторанов после изменения параметров ранжирования.
+
+Запуск: python -m src.commands.rebuild_ranking [--batch-size N]
+
+Идёт пачками по id, каждая пачка - отдельная транзакция, чтобы не держать
+блокировки на всей таблице. В конце через outbox публикуется событие
+инвалидации - страницы списков сбрасываются во всех репликах.
+"""
+import argparse
+import asyncio
+import logging
+
+from src.core.config import settings
+from src.db.session import AsyncSessionLocal
+from src.services.restaurant import publish_restaurant_invalidation
+from src.services.review import rebuild_ranking_scores
+
+logger = logging.getLogger(__name__)
+
+async def rebuild(batch_size: int = 10000) -> int:
+    logger.info(
+        f"Rebuilding ranking scores: prior mean {settings.ranking_prior_mean}, "
+        f"prior weight {settings.ranking_prior_weight}"
+    )
+    total, last_id = 0, 0
+    async with AsyncSessionLocal() as db:
+        while True:
+            updated, last_id = await rebuild_ranking_scores(db, last_id, batch_size)
+            if last_id is None:
+                break
+            await db.commit()
+            total += updated
+            logger.info(f"Updated {total} ranking scores (up to restaurant {last_id})")
+        if total:
+            # Пустой список: рестораны не трогаем, сбрасываем только версию страниц списка
+            publish_restaurant_invalidation(db, [])
+            await db.commit()
+    logger.info(f"Ranking rebuild finished: {total} restaurants updated")
+    return total
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild restaurant ranking scores")
+    parser.add_argument("--batch-size", type=int, default=10000)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(rebuild(args.batch_size))
+
+if __name__ == "__main__":
+    main()
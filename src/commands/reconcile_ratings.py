@@ -0,0 +1,48 @@
+"""Сверка агрегатов рейтинга ресторанов с таблицей отзывов.
+
+Запуск: python -m src.commands.reconcile_ratings [--fix] [--restaurant-id ID ...]
+
+Колонку restaurants.rating_sum команда не создаёт: её добавляет и заполняет миграция
+0002_rating_sum_and_outbox (alembic upgrade head). --fix лишь пересчитывает разошедшиеся агрегаты.
+"""
+import argparse
+import asyncio
+import logging
+
+from src.db.session import AsyncSessionLocal
+from src.services.review import find_rating_drift, recompute_restaurant_ratings
+
+logger = logging.getLogger(__name__)
+
+async def reconcile(restaurant_ids=None, fix: bool = False):
+    """Поиск расхождений и (опционально) их исправление"""
+    async with AsyncSessionLocal() as db:
+        drift = await find_rating_drift(db, restaurant_ids)
+        for row in drift:
+            logger.warning(
+                f"Rating drift for restaurant {row['id']}: "
+                f"sum={row['rating_sum']} (expected {row['expected_rating_sum']}), "
+                f"count={row['review_count']} (expected {row['expected_review_count']}), "
+                f"avg={row['average_rating']} (expected {row['expected_average_rating']})"
+            )
+
+        if fix and drift:
+            fixed = await recompute_restaurant_ratings(db, [row["id"] for row in drift])
+            await db.commit()
+            logger.info(f"Recomputed ratings for {fixed} restaurants")
+
+        logger.info(f"Reconcile finished: {len(drift)} restaurants with drift")
+        return drift
+
+def main():
+    parser = argparse.ArgumentParser(description="Reconcile restaurant rating aggregates")
+    parser.add_argument("--fix", action="store_true", help="recompute drifted aggregates from reviews")
+    parser.add_argument("--restaurant-id", type=int, action="append", dest="restaurant_ids")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    drift = asyncio.run(reconcile(args.restaurant_ids, args.fix))
+    raise SystemExit(1 if drift and not args.fix else 0)
+
+if __name__ == "__main__":
+    main()
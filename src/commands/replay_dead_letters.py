@@ -0,0 +1,91 @@
+"""Переотправка событий отзывов из DLQ в исходные топики.
+
+Запуск: python -m src.commands.replay_dead_letters [--dry-run] [--batch-size N]
+
+Читает DLQ своей consumer group - от прошлой переотправки до конца топика на момент
+запуска - и пачками отправляет сообщения в исходные топики (заголовок dlq-original-topic)
+с исходными ключом, значением и заголовками. Оффсеты DLQ коммитятся после подтверждения
+всей пачки. --dry-run только печатает сводку по топикам и причинам ошибок.
+"""
+import argparse
+import asyncio
+import logging
+from collections import Counter
+
+from aiokafka import AIOKafkaConsumer, TopicPartition
+
+from src.core.config import settings
+from src.utils.kafka.dead_letter import header, replay_headers
+from src.utils.kafka.producer import KafkaEventProducer
+
+logger = logging.getLogger(__name__)
+
+REPLAY_GROUP_ID = "restaurant-service-reviews-dlq-replay"
+
+async def replay(dry_run: bool = False, batch_size: int = 500):
+    """Переотправка накопившихся сообщений DLQ; возвращает сводку (топик, класс ошибки, тип ошибки) -> число"""
+    topic = settings.kafka_dead_letter_topic
+    consumer = AIOKafkaConsumer(
+        bootstrap_servers=settings.kafka_bootstrap_servers,
+        group_id=REPLAY_GROUP_ID,
+        enable_auto_commit=False,
+        auto_offset_reset="earliest",
+    )
+    producer = KafkaEventProducer()
+    await consumer.start()
+    if not dry_run:
+        await producer.start()
+    summary = Counter()
+    try:
+        await consumer.topics()
+        partitions = [TopicPartition(topic, partition) for partition in consumer.partitions_for_topic(topic) or ()]
+        if not partitions:
+            logger.info(f"Topic {topic} does not exist, nothing to replay")
+            return summary
+        consumer.assign(partitions)
+        end_offsets = await consumer.end_offsets(partitions)
+
+        while True:
+            remaining = [tp for tp in partitions if await consumer.position(tp) < end_offsets[tp]]
+            if not remaining:
+                break
+            batches = await consumer.getmany(*remaining, timeout_ms=1000, max_records=batch_size)
+            records, offsets = [], {}
+            for tp, messages in batches.items():
+                for msg in messages:
+                    if msg.offset >= end_offsets[tp]:
+                        break
+                    offsets[tp] = msg.offset + 1
+                    original_topic = header(msg.headers, "dlq-original-topic")
+                    summary[(original_topic, header(msg.headers, "dlq-error-class"), header(msg.headers, "dlq-error-type"))] += 1
+                    if original_topic is None:
+                        logger.error(f"Skipping {topic} message without dlq-original-topic: partition={msg.partition}, offset={msg.offset}")
+                        continue
+                    records.append((original_topic, msg.value, msg.key, replay_headers(msg.headers)))
+            if dry_run:
+                continue
+            if records:
+                await producer.send_raw(records)
+            if offsets:
+                await consumer.commit(offsets)
+            logger.info(f"Replayed {len(records)} messages from {topic}")
+    finally:
+        await consumer.stop()
+        if not dry_run:
+            await producer.stop()
+    return summary
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay review events from the dead-letter topic")
+    parser.add_argument("--dry-run", action="store_true", help="only summarize dead-lettered events")
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    summary = asyncio.run(replay(args.dry_run, args.batch_size))
+    for (topic, error_class, error_type), count in sorted(summary.items(), key=lambda item: -item[1]):
+        print(f"{count:>8}  {topic}  {error_class}  {error_type}")
+    print(f"{sum(summary.values()):>8}  total{' (dry run, nothing replayed)' if args.dry_run else ''}")
+
+if __name__ == "__main__":
+    main()
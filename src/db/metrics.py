@@ -0,0 +1,108 @@
+import logging
+import time
+from contextvars import ContextVar
+from typing import Optional
+from sqlalchemy import event
+
+slow_query_logger = logging.getLogger("src.db.slow_query")
+
+class RequestDBStats:
+    """Статистика работы с БД в рамках одного HTTP-запроса"""
+
+    __slots__ = ("statements", "db_seconds", "pool_wait_seconds", "slowest_seconds", "slowest_statement")
+
+    def __init__(self):
+        self.statements = 0
+        self.db_seconds = 0.0
+        self.pool_wait_seconds = 0.0
+        self.slowest_seconds = 0.0
+        self.slowest_statement: Optional[str] = None
+
+    def record_statement(self, statement: str, elapsed: float):
+        self.statements += 1
+        self.db_seconds += elapsed
+        if elapsed > self.slowest_seconds:
+            self.slowest_seconds = elapsed
+            self.slowest_statement = statement
+
+    def headers(self) -> dict:
+        return {
+            "X-DB-Statements": str(self.statements),
+            "X-DB-Time-Ms": f"{self.db_seconds * 1000:.2f}",
+            "X-DB-Pool-Wait-Ms": f"{self.pool_wait_seconds * 1000:.2f}",
+            "X-DB-Slowest-Ms": f"{self.slowest_seconds * 1000:.2f}",
+        }
+
+_request_stats: ContextVar[Optional[RequestDBStats]] = ContextVar("db_request_stats", default=None)
+
+def start_request_stats():
+    """Начинает сбор статистики для текущего контекста; возвращает (stats, token) для reset_request_stats"""
+    stats = RequestDBStats()
+    return stats, _request_stats.set(stats)
+
+def reset_request_stats(token):
+    _request_stats.reset(token)
+
+def record_pool_wait(waited: float):
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.pool_wait_seconds += waited
+
+class RouteDBMetrics:
+    """Агрегированные по маршрутам счётчики запросов к БД"""
+
+    def __init__(self):
+        self._routes = {}
+
+    def record(self, route: str, stats: RequestDBStats):
+        entry = self._routes.get(route)
+        if entry is None:
+            entry = self._routes[route] = {
+                "requests": 0,
+                "statements": 0,
+                "max_statements": 0,
+                "db_seconds_total": 0.0,
+                "pool_wait_seconds_total": 0.0,
+                "slowest_seconds": 0.0,
+                "slowest_statement": None,
+            }
+        entry["requests"] += 1
+        entry["statements"] += stats.statements
+        entry["max_statements"] = max(entry["max_statements"], stats.statements)
+        entry["db_seconds_total"] += stats.db_seconds
+        entry["pool_wait_seconds_total"] += stats.pool_wait_seconds
+        if stats.slowest_seconds > entry["slowest_seconds"]:
+            entry["slowest_seconds"] = stats.slowest_seconds
+            entry["slowest_statement"] = stats.slowest_statement
+
+    def snapshot(self) -> dict:
+        result = {}
+        for route, entry in self._routes.items():
+            requests = entry["requests"]
+            result[route] = {
+                **entry,
+                "statements_avg": entry["statements"] / requests,
+                "db_seconds_avg": entry["db_seconds_total"] / requests,
+            }
+        return result
+
+    def clear(self):
+        self._routes.clear()
+
+route_db_metrics = RouteDBMetrics()
+
+def instrument_engine(sync_engine, slow_query_threshold_ms: Optional[float] = None):
+    """Подписывает движок на события выполнения запросов: время, счётчики запроса и журнал медленных запросов"""
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        context._query_started = time.perf_counter()
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - context._query_started
+        stats = _request_stats.get()
+        if stats is not None:
+            stats.record_statement(statement, elapsed)
+        if slow_query_threshold_ms is not None and elapsed * 1000 >= slow_query_threshold_ms:
+            slow_query_logger.warning("Slow query (%.1f ms): %s", elapsed * 1000, statement)
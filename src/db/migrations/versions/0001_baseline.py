@@ -0,0 +1,83 @@
+"""baseline: schema previously created by Base.metadata.create_all
+
+Revision ID: 0001_baseline
+Revises:
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0001_baseline"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.create_table(
+        "restaurants",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String()),
+        sa.Column("description", sa.Text()),
+        sa.Column("address", sa.String()),
+        sa.Column("phone", sa.String()),
+        sa.Column("email", sa.String()),
+        sa.Column("opening_hours", sa.JSON()),
+        sa.Column("is_active", sa.Boolean()),
+        sa.Column("average_rating", sa.Float()),
+        sa.Column("review_count", sa.Integer()),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True)),
+    )
+    op.create_index("ix_restaurants_id", "restaurants", ["id"])
+    op.create_index("ix_restaurants_name", "restaurants", ["name"], unique=True)
+
+    op.create_table(
+        "menu_categories",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("restaurant_id", sa.Integer(), sa.ForeignKey("restaurants.id")),
+        sa.Column("name", sa.String()),
+        sa.Column("description", sa.Text()),
+        sa.Column("order_index", sa.Integer()),
+        sa.Column("is_active", sa.Boolean()),
+    )
+    op.create_index("ix_menu_categories_id", "menu_categories", ["id"])
+
+    op.create_table(
+        "dishes",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("category_id", sa.Integer(), sa.ForeignKey("menu_categories.id")),
+        sa.Column("name", sa.String()),
+        sa.Column("description", sa.Text()),
+        sa.Column("price", sa.Numeric(10, 2)),
+        sa.Column("ingredients", postgresql.ARRAY(sa.String())),
+        sa.Column("allergens", postgresql.ARRAY(sa.String())),
+        sa.Column("preparation_time", sa.Integer()),
+        sa.Column("is_available", sa.Boolean()),
+        sa.Column("is_active", sa.Boolean()),
+        sa.Column("image_url", sa.String(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True)),
+    )
+    op.create_index("ix_dishes_id", "dishes", ["id"])
+
+    op.create_table(
+        "reviews",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("review_id", sa.String()),
+        sa.Column("restaurant_id", sa.Integer(), sa.ForeignKey("restaurants.id"), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("rating", sa.Integer(), nullable=False),
+        sa.Column("comment", sa.Text()),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True)),
+        sa.Column("is_active", sa.Boolean()),
+    )
+    op.create_index("ix_reviews_id", "reviews", ["id"])
+    op.create_index("ix_reviews_review_id", "reviews", ["review_id"], unique=True)
+
+def downgrade() -> None:
+    op.drop_table("reviews")
+    op.drop_table("dishes")
+    op.drop_table("menu_categories")
+    op.drop_table("restaurants")
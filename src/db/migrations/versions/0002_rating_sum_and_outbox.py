@@ -0,0 +1,46 @@
+"""restaurants.rating_sum for incremental rating aggregates, outbox table
+
+Revision ID: 0002_rating_sum_and_outbox
+Revises: 0001_baseline
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002_rating_sum_and_outbox"
+down_revision = "0001_baseline"
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.add_column("restaurants", sa.Column("rating_sum", sa.Integer()))
+    op.execute(
+        """
+        UPDATE restaurants r
+        SET rating_sum = s.rating_sum,
+            review_count = s.review_count,
+            average_rating = CASE WHEN s.review_count > 0 THEN s.rating_sum::float / s.review_count ELSE 0.0 END
+        FROM (
+            SELECT r2.id,
+                   COALESCE(SUM(rv.rating), 0) AS rating_sum,
+                   COUNT(rv.id) AS review_count
+            FROM restaurants r2
+            LEFT JOIN reviews rv ON rv.restaurant_id = r2.id AND rv.is_active
+            GROUP BY r2.id
+        ) s
+        WHERE r.id = s.id
+        """
+    )
+
+    op.create_table(
+        "outbox",
+        sa.Column("id", sa.BigInteger(), primary_key=True),
+        sa.Column("topic", sa.String(), nullable=False),
+        sa.Column("key", sa.String(), nullable=True),
+        sa.Column("payload", sa.JSON(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+
+def downgrade() -> None:
+    op.drop_table("outbox")
+    op.drop_column("restaurants", "rating_sum")
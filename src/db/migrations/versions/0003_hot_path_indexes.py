@@ -0,0 +1,87 @@
+"""hot-path indexes: listings, foreign keys, unique menu category keys
+
+Revision ID: 0003_hot_path_indexes
+Revises: 0002_rating_sum_and_outbox
+Create Date: 2026-10-17
+
+Индексы создаются CONCURRENTLY, чтобы не блокировать запись на больших таблицах.
+Прерванный CREATE INDEX CONCURRENTLY оставляет невалидный индекс, который if_not_exists
+молча пропустил бы, поэтому такие индексы перед созданием удаляются. Уникальность
+(restaurant_id, name) и (restaurant_id, order_index) раньше не проверялась: при дублях
+миграция останавливается со списком, их нужно исправить вручную и повторить upgrade.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003_hot_path_indexes"
+down_revision = "0002_rating_sum_and_outbox"
+branch_labels = None
+depends_on = None
+
+UNIQUE_CATEGORY_KEYS = {
+    "uq_menu_categories_restaurant_name": ("restaurant_id", "name"),
+    "uq_menu_categories_restaurant_order_index": ("restaurant_id", "order_index"),
+}
+
+def _drop_if_invalid(name: str):
+    invalid = op.get_bind().execute(sa.text(
+        "SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+        "WHERE c.relname = :name AND NOT i.indisvalid"
+    ), {"name": name}).first()
+    if invalid:
+        op.drop_index(name, postgresql_concurrently=True, if_exists=True)
+
+def _check_duplicates(name: str, columns: tuple):
+    keys = ", ".join(columns)
+    rows = op.get_bind().execute(sa.text(
+        f"SELECT {keys}, array_agg(id ORDER BY id) AS ids FROM menu_categories "
+        f"GROUP BY {keys} HAVING count(*) > 1 ORDER BY {keys} LIMIT 50"
+    )).all()
+    if rows:
+        duplicates = "\n".join(
+            f"  {dict(zip(columns, row[:-1]))}: menu_categories.id {list(row.ids)}" for row in rows
+        )
+        raise RuntimeError(
+            f"Cannot create {name}: duplicate ({keys}) in menu_categories (first 50 shown):\n{duplicates}\n"
+            "Rename or renumber the duplicates and run the migration again."
+        )
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name in (
+            "ix_dishes_category_id", "ix_reviews_restaurant_listing", "ix_restaurants_listing", *UNIQUE_CATEGORY_KEYS,
+        ):
+            _drop_if_invalid(name)
+        for name, columns in UNIQUE_CATEGORY_KEYS.items():
+            _check_duplicates(name, columns)
+
+        op.create_index(
+            "ix_dishes_category_id", "dishes", ["category_id"],
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+        for name, columns in UNIQUE_CATEGORY_KEYS.items():
+            op.create_index(
+                name, "menu_categories", list(columns),
+                unique=True, postgresql_concurrently=True, if_not_exists=True,
+            )
+        op.create_index(
+            "ix_reviews_restaurant_listing", "reviews",
+            ["restaurant_id", "is_active", sa.text("created_at DESC"), sa.text("id DESC")],
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+        op.create_index(
+            "ix_restaurants_listing", "restaurants",
+            [sa.text("average_rating DESC"), sa.text("review_count DESC"), "id"],
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name in (
+            "ix_restaurants_listing",
+            "ix_reviews_restaurant_listing",
+            "uq_menu_categories_restaurant_order_index",
+            "uq_menu_categories_restaurant_name",
+            "ix_dishes_category_id",
+        ):
+            op.drop_index(name, postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,21 @@
+"""menu_categories.created_at/updated_at for conditional GET validators
+
+Revision ID: 0004_menu_category_timestamps
+Revises: 0003_hot_path_indexes
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004_menu_category_timestamps"
+down_revision = "0003_hot_path_indexes"
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.add_column("menu_categories", sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()))
+    op.add_column("menu_categories", sa.Column("updated_at", sa.DateTime(timezone=True)))
+
+def downgrade() -> None:
+    op.drop_column("menu_categories", "updated_at")
+    op.drop_column("menu_categories", "created_at")
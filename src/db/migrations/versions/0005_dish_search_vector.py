@@ -0,0 +1,53 @@
+"""dishes.search_vector: tsvector maintained by trigger + GIN index for dish search
+
+Revision ID: 0005_dish_search_vector
+Revises: 0004_menu_category_timestamps
+Create Date: 2026-10-17
+
+Вместо GENERATED-колонки используется триггер: array_to_string не IMMUTABLE.
+Конфигурация russian стеммит кириллицу, латиница уходит в english_stem.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import TSVECTOR
+
+revision = "0005_dish_search_vector"
+down_revision = "0004_menu_category_timestamps"
+branch_labels = None
+depends_on = None
+
+SEARCH_VECTOR = """
+    setweight(to_tsvector('russian', coalesce({row}name, '')), 'A')
+    || setweight(to_tsvector('russian', coalesce(array_to_string({row}ingredients, ' '), '')), 'B')
+    || setweight(to_tsvector('russian', coalesce({row}description, '')), 'C')
+"""
+
+def upgrade() -> None:
+    op.add_column("dishes", sa.Column("search_vector", TSVECTOR))
+    op.execute(f"""
+        CREATE OR REPLACE FUNCTION dishes_search_vector_update() RETURNS trigger AS $$
+        BEGIN
+            NEW.search_vector := {SEARCH_VECTOR.format(row="NEW.")};
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER dishes_search_vector_update
+        BEFORE INSERT OR UPDATE OF name, description, ingredients ON dishes
+        FOR EACH ROW EXECUTE FUNCTION dishes_search_vector_update()
+    """)
+    op.execute(f"UPDATE dishes SET search_vector = {SEARCH_VECTOR.format(row='')}")
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_dishes_search_vector", "dishes", ["search_vector"],
+            postgresql_using="gin", postgresql_concurrently=True, if_not_exists=True,
+        )
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index("ix_dishes_search_vector", postgresql_concurrently=True, if_exists=True)
+    op.execute("DROP TRIGGER IF EXISTS dishes_search_vector_update ON dishes")
+    op.execute("DROP FUNCTION IF EXISTS dishes_search_vector_update()")
+    op.drop_column("dishes", "search_vector")
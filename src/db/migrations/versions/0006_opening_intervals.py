@@ -0,0 +1,148 @@
+"""restaurant_opening_intervals for open-now queries, GIN indexes on dish allergens/ingredients
+
+Revision ID: 0006_opening_intervals
+Revises: 0005_dish_search_vector
+Create Date: 2026-10-17
+
+Интервалы существующих ресторанов заполняются из opening_hours. Разбор скопирован
+из src/utils/opening_hours.py на момент ревизии, чтобы миграция не зависела от
+кода приложения.
+"""
+import re
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0006_opening_intervals"
+down_revision = "0005_dish_search_vector"
+branch_labels = None
+depends_on = None
+
+MINUTES_PER_DAY = 24 * 60
+
+DAYS = {
+    "mon": 0, "monday": 0, "пн": 0, "понедельник": 0,
+    "tue": 1, "tuesday": 1, "вт": 1, "вторник": 1,
+    "wed": 2, "wednesday": 2, "ср": 2, "среда": 2,
+    "thu": 3, "thursday": 3, "чт": 3, "четверг": 3,
+    "fri": 4, "friday": 4, "пт": 4, "пятница": 4,
+    "sat": 5, "saturday": 5, "сб": 5, "суббота": 5,
+    "sun": 6, "sunday": 6, "вс": 6, "воскресенье": 6,
+}
+EVERY_DAY = {"daily", "everyday", "all", "ежедневно"}
+CLOSED = {"", "closed", "выходной", "закрыто"}
+ALWAYS_OPEN = {"24h", "24/7", "круглосуточно"}
+
+_TIME_RANGE = re.compile(r"^\s*(\d{1,2})(?::(\d{2}))?\s*[-–]\s*(\d{1,2})(?::(\d{2}))?\s*$")
+
+def _parse_days(key):
+    key = key.strip().lower()
+    if key in EVERY_DAY:
+        return list(range(7))
+    if key in DAYS:
+        return [DAYS[key]]
+    first, sep, last = key.partition("-")
+    if sep and first.strip() in DAYS and last.strip() in DAYS:
+        start, end = DAYS[first.strip()], DAYS[last.strip()]
+        return [(start + i) % 7 for i in range((end - start) % 7 + 1)]
+    return None
+
+def _parse_range(value):
+    if value.strip().lower() in ALWAYS_OPEN:
+        return 0, MINUTES_PER_DAY
+    match = _TIME_RANGE.match(value)
+    if match is None:
+        return None
+    opens = int(match[1]) * 60 + int(match[2] or 0)
+    closes = int(match[3]) * 60 + int(match[4] or 0)
+    if opens >= MINUTES_PER_DAY or closes > MINUTES_PER_DAY:
+        return None
+    return opens, closes
+
+def _day_ranges(value):
+    if value is None or value is False:
+        return []
+    if isinstance(value, str):
+        if value.strip().lower() in CLOSED:
+            return []
+        values = value.split(",")
+    elif isinstance(value, list):
+        values = value
+    else:
+        return None
+    ranges = []
+    for item in values:
+        parsed = _parse_range(item) if isinstance(item, str) else None
+        if parsed is None:
+            return None
+        ranges.append(parsed)
+    return ranges
+
+def opening_intervals(opening_hours):
+    """Часы работы -> слитые интервалы [opens_at, closes_at) в минутах недели; нераспознанное пропускается"""
+    if not isinstance(opening_hours, dict):
+        return []
+    intervals = []
+    for key, value in opening_hours.items():
+        days = _parse_days(str(key))
+        ranges = _day_ranges(value)
+        if days is None or ranges is None:
+            continue
+        for day in days:
+            start = day * MINUTES_PER_DAY
+            for opens, closes in ranges:
+                if closes > opens:
+                    intervals.append((start + opens, start + closes))
+                elif (opens, closes) != (0, 0):
+                    intervals.append((start + opens, start + MINUTES_PER_DAY))
+                    if closes:
+                        next_day = (day + 1) % 7 * MINUTES_PER_DAY
+                        intervals.append((next_day, next_day + closes))
+    merged = []
+    for opens, closes in sorted(intervals):
+        if merged and opens <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], closes))
+        else:
+            merged.append((opens, closes))
+    return merged
+
+def upgrade() -> None:
+    intervals = op.create_table(
+        "restaurant_opening_intervals",
+        sa.Column("id", sa.BigInteger, primary_key=True),
+        sa.Column("restaurant_id", sa.Integer, sa.ForeignKey("restaurants.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("opens_at", sa.Integer, nullable=False),
+        sa.Column("closes_at", sa.Integer, nullable=False),
+    )
+    op.create_index(
+        "ix_restaurant_opening_intervals_restaurant", "restaurant_opening_intervals", ["restaurant_id", "opens_at"]
+    )
+    op.create_index(
+        "ix_restaurant_opening_intervals_range", "restaurant_opening_intervals",
+        [sa.text("int4range(opens_at, closes_at)")], postgresql_using="gist",
+    )
+
+    rows = op.get_bind().execute(sa.text("SELECT id, opening_hours FROM restaurants WHERE opening_hours IS NOT NULL"))
+    values = [
+        {"restaurant_id": row.id, "opens_at": opens_at, "closes_at": closes_at}
+        for row in rows
+        for opens_at, closes_at in opening_intervals(row.opening_hours)
+    ]
+    if values:
+        op.bulk_insert(intervals, values)
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_dishes_allergens", "dishes", ["allergens"],
+            postgresql_using="gin", postgresql_concurrently=True, if_not_exists=True,
+        )
+        op.create_index(
+            "ix_dishes_ingredients", "dishes", ["ingredients"],
+            postgresql_using="gin", postgresql_concurrently=True, if_not_exists=True,
+        )
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index("ix_dishes_ingredients", postgresql_concurrently=True, if_exists=True)
+        op.drop_index("ix_dishes_allergens", postgresql_concurrently=True, if_exists=True)
+    op.drop_table("restaurant_opening_intervals")
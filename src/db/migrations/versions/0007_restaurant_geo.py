@@ -0,0 +1,32 @@
+"""restaurants.latitude/longitude and grid-cell column for nearby search
+
+Revision ID: 0007_restaurant_geo
+Revises: 0006_opening_intervals
+Create Date: 2026-10-17
+
+Поиск рядом без расширений: B-tree по номеру ячейки сетки (src.utils.geo).
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0007_restaurant_geo"
+down_revision = "0006_opening_intervals"
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.add_column("restaurants", sa.Column("latitude", sa.Float, nullable=True))
+    op.add_column("restaurants", sa.Column("longitude", sa.Float, nullable=True))
+    op.add_column("restaurants", sa.Column("geo_cell", sa.BigInteger, nullable=True))
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_restaurants_geo_cell", "restaurants", ["geo_cell"],
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index("ix_restaurants_geo_cell", postgresql_concurrently=True, if_exists=True)
+    op.drop_column("restaurants", "geo_cell")
+    op.drop_column("restaurants", "longitude")
+    op.drop_column("restaurants", "latitude")
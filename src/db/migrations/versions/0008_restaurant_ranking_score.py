@@ -0,0 +1,45 @@
+"""restaurants.ranking_score (Bayesian average) with a descending listing index
+
+Revision ID: 0008_restaurant_ranking_score
+Revises: 0007_restaurant_geo
+Create Date: 2026-10-17
+
+Список ресторанов сортируется по ranking_score, индекс ix_restaurants_listing
+по (average_rating, review_count) больше не используется и удаляется.
+Заполнение использует априорные значения по умолчанию на момент ревизии; при других
+настройках оценки пересчитывает python -m src.commands.rebuild_ranking.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0008_restaurant_ranking_score"
+down_revision = "0007_restaurant_geo"
+branch_labels = None
+depends_on = None
+
+PRIOR_MEAN = 3.5
+PRIOR_WEIGHT = 10.0
+
+def upgrade() -> None:
+    op.add_column("restaurants", sa.Column("ranking_score", sa.Float, nullable=False, server_default="0"))
+    op.execute(sa.text(
+        "UPDATE restaurants SET ranking_score = "
+        "(:mean * :weight + coalesce(rating_sum, 0)) / (coalesce(review_count, 0) + :weight)"
+    ).bindparams(mean=PRIOR_MEAN, weight=PRIOR_WEIGHT))
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_restaurants_ranking", "restaurants", [sa.text("ranking_score DESC"), "id"],
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+        op.drop_index("ix_restaurants_listing", postgresql_concurrently=True, if_exists=True)
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_restaurants_listing", "restaurants",
+            [sa.text("average_rating DESC"), sa.text("review_count DESC"), "id"],
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+        op.drop_index("ix_restaurants_ranking", postgresql_concurrently=True, if_exists=True)
+    op.drop_column("restaurants", "ranking_score")
@@ -1,14 +1,14 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, JSON, Text, Numeric, ForeignKey
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, JSON, Text, Numeric, ForeignKey, Index
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
-from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.orm import relationship, deferred
+from sqlalchemy.dialects.postgresql import ARRAY, TSVECTOR
 from src.db.session import Base
 
 class Dish(Base):
     __tablename__ = "dishes"
 
     id = Column(Integer, primary_key=True, index=True)
-    category_id = Column(Integer, ForeignKey("menu_categories.id"))
+    category_id = Column(Integer, ForeignKey("menu_categories.id"), index=True)
     name = Column(String)
     description = Column(Text)
     price = Column(Numeric(10, 2))
@@ -20,5 +20,13 @@ class Dish(Base):
     image_url = Column(String, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    # Заполняется триггером dishes_search_vector_update (миграция 0005)
+    search_vector = deferred(Column(TSVECTOR))
 
-    category = relationship("MenuCategory", back_populates="dishes")
\ No newline at end of file
+    category = relationship("MenuCategory", back_populates="dishes")
+
+    __table_args__ = (
+        Index("ix_dishes_search_vector", search_vector, postgresql_using="gin"),
+        Index("ix_dishes_allergens", allergens, postgresql_using="gin"),
+        Index("ix_dishes_ingredients", ingredients, postgresql_using="gin"),
+    )
@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, Boolean, Text, ForeignKey
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, ForeignKey, Index
+from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from src.db.session import Base
 
@@ -11,6 +12,13 @@ class MenuCategory(Base):
     description = Column(Text)
     order_index = Column(Integer, default=0)
     is_active = Column(Boolean, default=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
     restaurant = relationship("Restaurant", back_populates="menu_categories")
-    dishes = relationship("Dish", back_populates="category")
\ No newline at end of file
+    dishes = relationship("Dish", back_populates="category", order_by="Dish.name")
+
+    __table_args__ = (
+        Index("uq_menu_categories_restaurant_name", restaurant_id, name, unique=True),
+        Index("uq_menu_categories_restaurant_order_index", restaurant_id, order_index, unique=True),
+    )
\ No newline at end of file
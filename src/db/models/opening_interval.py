@@ -0,0 +1,21 @@
+from sqlalchemy import Column, BigInteger, Integer, ForeignKey, Index
+from sqlalchemy.sql import func
+from src.db.session import Base
+
+class RestaurantOpeningInterval(Base):
+    """Часы работы ресторана, нормализованные из Restaurant.opening_hours.
+
+    Интервал [opens_at, closes_at) в минутах недели (понедельник 00:00 = 0)
+    по местному времени; пересобирается при создании и изменении ресторана.
+    """
+    __tablename__ = "restaurant_opening_intervals"
+
+    id = Column(BigInteger, primary_key=True)
+    restaurant_id = Column(Integer, ForeignKey("restaurants.id", ondelete="CASCADE"), nullable=False)
+    opens_at = Column(Integer, nullable=False)
+    closes_at = Column(Integer, nullable=False)
+
+    __table_args__ = (
+        Index("ix_restaurant_opening_intervals_restaurant", restaurant_id, opens_at),
+        Index("ix_restaurant_opening_intervals_range", func.int4range(opens_at, closes_at), postgresql_using="gist"),
+    )
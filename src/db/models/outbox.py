@@ -0,0 +1,12 @@
+from sqlalchemy import Column, BigInteger, String, DateTime, JSON
+from sqlalchemy.sql import func
+from src.db.session import Base
+
+class OutboxEvent(Base):
+    __tablename__ = "outbox"
+
+    id = Column(BigInteger, primary_key=True)
+    topic = Column(String, nullable=False)
+    key = Column(String, nullable=True)
+    payload = Column(JSON, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, JSON, Text, Float
+from sqlalchemy import Column, Integer, BigInteger, String, Boolean, DateTime, JSON, Text, Float, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from src.db.session import Base
@@ -16,8 +16,20 @@ class Restaurant(Base):
     is_active = Column(Boolean, default=True)
     average_rating = Column(Float, default=0.0) 
     review_count = Column(Integer, default=0)   
+    rating_sum = Column(Integer, default=0)
+    # Байесовское среднее (src.services.restaurant.ranking_score), обновляется вместе с агрегатами рейтинга
+    ranking_score = Column(Float, nullable=False, server_default="0")
+    latitude = Column(Float, nullable=True)
+    longitude = Column(Float, nullable=True)
+    # Ячейка сетки src.utils.geo.geo_cell(latitude, longitude) для поиска рядом
+    geo_cell = Column(BigInteger, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
-    menu_categories = relationship("MenuCategory", back_populates="restaurant")
-    reviews = relationship("Review", back_populates="restaurant") 
\ No newline at end of file
+    menu_categories = relationship("MenuCategory", back_populates="restaurant", order_by="MenuCategory.order_index")
+    reviews = relationship("Review", back_populates="restaurant") 
+
+    __table_args__ = (
+        Index("ix_restaurants_ranking", ranking_score.desc(), id),
+        Index("ix_restaurants_geo_cell", geo_cell),
+    )
\ No newline at end of file
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, Index
 from sqlalchemy.sql import func
 from sqlalchemy import ForeignKey
 from sqlalchemy.orm import relationship
@@ -17,4 +17,8 @@ class Review(Base):
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     is_active = Column(Boolean, default=True)
 
-    restaurant = relationship("Restaurant", back_populates="reviews")
\ No newline at end of file
+    restaurant = relationship("Restaurant", back_populates="reviews")
+
+    __table_args__ = (
+        Index("ix_reviews_restaurant_listing", restaurant_id, is_active, created_at.desc(), id.desc()),
+    )
\ No newline at end of file
@@ -0,0 +1,31 @@
+import time
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from src.db.metrics import record_pool_wait
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """Пул соединений со статистикой выдачи: число выдач, время ожидания, таймауты"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = {
+            "checkouts": 0,
+            "timeouts": 0,
+            "wait_seconds_total": 0.0,
+            "wait_seconds_max": 0.0,
+        }
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            self.stats["timeouts"] += 1
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            record_pool_wait(waited)
+            self.stats["checkouts"] += 1
+            self.stats["wait_seconds_total"] += waited
+            if waited > self.stats["wait_seconds_max"]:
+                self.stats["wait_seconds_max"] = waited
@@ -2,7 +2,54 @@ from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 from src.core.config import settings
+from src.db.pool import InstrumentedAsyncQueuePool
+from src.db.metrics import instrument_engine
+from src.utils.metrics import Counter, Gauge, registry as metrics_registry
 
-engine = create_async_engine(settings.database_url, echo=True)
+engine = create_async_engine(
+    settings.database_url,
+    echo=settings.db_echo,
+    poolclass=InstrumentedAsyncQueuePool,
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
+    pool_timeout=settings.db_pool_timeout,
+    pool_recycle=settings.db_pool_recycle,
+    pool_pre_ping=settings.db_pool_pre_ping,
+    connect_args={"prepared_statement_cache_size": settings.db_statement_cache_size},
+)
+instrument_engine(engine.sync_engine, settings.db_slow_query_threshold_ms)
 AsyncSessionLocal = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
-Base = declarative_base()
\ No newline at end of file
+Base = declarative_base()
+
+def get_pool_stats() -> dict:
+    """Статистика пула соединений: занятость, overflow, ожидание выдачи"""
+    pool = engine.pool
+    stats = dict(pool.stats)
+    checkouts = stats["checkouts"]
+    return {
+        "size": pool.size(),
+        "max_overflow": settings.db_max_overflow,
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        **stats,
+        "wait_seconds_avg": stats["wait_seconds_total"] / checkouts if checkouts else 0.0,
+    }
+
+db_pool_size = Gauge("db_pool_size", "Configured DB connection pool size")
+db_pool_checked_out = Gauge("db_pool_checked_out", "DB connections currently checked out")
+db_pool_overflow = Gauge("db_pool_overflow", "DB connections open beyond the pool size")
+db_pool_checkouts = Counter("db_pool_checkouts_total", "DB connection checkouts")
+db_pool_timeouts = Counter("db_pool_timeouts_total", "DB connection checkouts that timed out")
+db_pool_wait_seconds = Counter("db_pool_wait_seconds_total", "Time spent waiting for a DB connection")
+
+def _collect_pool_metrics():
+    stats = get_pool_stats()
+    db_pool_size.set(stats["size"])
+    db_pool_checked_out.set(stats["checked_out"])
+    db_pool_overflow.set(stats["overflow"])
+    db_pool_checkouts.set(stats["checkouts"])
+    db_pool_timeouts.set(stats["timeouts"])
+    db_pool_wait_seconds.set(stats["wait_seconds_total"])
+
+metrics_registry.add_collector(_collect_pool_metrics)
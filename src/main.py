@@ -2,10 +2,13 @@ from fastapi import FastAPI
 import uvicorn
 import logging
 
-from src.db.session import engine, Base
 from src.utils.kafka.producer import event_producer
 from src.utils.kafka.consumer import review_consumer
+from src.utils.kafka.outbox_relay import outbox_relay
+from src.utils.kafka.invalidation import cache_invalidation_subscriber
+from src.core.config import settings
 from src.api.v1.api import api_router
+from src.api.middleware import db_metrics_middleware, http_metrics_middleware
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -15,25 +18,32 @@ app = FastAPI(title="Restaurant Service", version="1.0.0")
 @app.on_event("startup")
 async def startup_event():
     try:
-        async with engine.begin() as conn:
-            await conn.run_sync(Base.metadata.create_all)
-        logger.info("Database tables created successfully")
-        
         await event_producer.start()
         logger.info("Kafka producer started successfully")
         
+        if settings.outbox_relay_enabled:
+            await outbox_relay.start()
+        
         await review_consumer.start()
         logger.info("Kafka review consumer started successfully")
         
+        if settings.restaurant_cache_invalidation_enabled:
+            await cache_invalidation_subscriber.start()
+        
     except Exception as e:
         logger.error(f"Startup error: {e}")
 
 @app.on_event("shutdown")
 async def shutdown_event():
-    await event_producer.stop()
+    # Сначала потребители: повторы и отправка в DLQ идут через продюсер, он останавливается последним
     await review_consumer.stop()
+    await cache_invalidation_subscriber.stop()
+    await outbox_relay.stop()
+    await event_producer.stop()
     logger.info("Application shutdown complete")
 
+app.middleware("http")(db_metrics_middleware)
+app.middleware("http")(http_metrics_middleware)
 app.include_router(api_router)
 
 @app.get("/")
@@ -27,6 +27,15 @@ class DishUpdate(BaseModel):
 class DishAvailability(BaseModel):
     is_available: bool
 
+class DishAvailabilityBulk(BaseModel):
+    dish_ids: List[int]
+    is_available: bool
+
+class DishAvailabilityBulkResult(BaseModel):
+    is_available: bool
+    updated_ids: List[int]
+    not_found_ids: List[int]
+
 class Dish(DishBase):
     id: int
     category_id: int
@@ -38,6 +47,10 @@ class Dish(DishBase):
     class Config:
         from_attributes = True
 
+class DishSearchResult(Dish):
+    restaurant_id: int
+    rank: float
+
 class DeleteResponse(BaseModel):
     message: str
     deleted_id: int
\ No newline at end of file
@@ -0,0 +1,37 @@
+from pydantic import BaseModel, field_validator
+from typing import List
+from src.schemas.dish import DishCreate
+from src.schemas.menu_category import MenuCategoryCreate
+
+class MenuImportCategory(MenuCategoryCreate):
+    is_active: bool = True
+    dishes: List[DishCreate] = []
+
+    @field_validator("dishes")
+    @classmethod
+    def dish_names_unique(cls, dishes):
+        names = [dish.name for dish in dishes]
+        duplicates = sorted({name for name in names if names.count(name) > 1})
+        if duplicates:
+            raise ValueError(f"Duplicate dish names in category: {duplicates}")
+        return dishes
+
+class MenuImport(BaseModel):
+    categories: List[MenuImportCategory]
+
+    @field_validator("categories")
+    @classmethod
+    def category_keys_unique(cls, categories):
+        names = [category.name for category in categories]
+        if len(set(names)) != len(names):
+            raise ValueError("Duplicate category names in menu")
+        order_indexes = [category.order_index for category in categories]
+        if len(set(order_indexes)) != len(order_indexes):
+            raise ValueError("Duplicate category order_index values in menu")
+        return categories
+
+class MenuImportResult(BaseModel):
+    categories_created: int
+    categories_updated: int
+    dishes_created: int
+    dishes_updated: int
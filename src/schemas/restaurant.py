@@ -1,4 +1,4 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field
 from datetime import datetime
 from typing import Optional, Dict, List
 from src.schemas.menu_category import MenuCategoryWithDishes
@@ -10,6 +10,8 @@ class RestaurantBase(BaseModel):
     phone: str
     email: EmailStr
     opening_hours: Optional[Dict] = None
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
 
 class RestaurantCreate(RestaurantBase):
     pass
@@ -21,6 +23,8 @@ class RestaurantUpdate(BaseModel):
     phone: Optional[str] = None
     email: Optional[EmailStr] = None
     opening_hours: Optional[Dict] = None
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
     is_active: Optional[bool] = None
 
 class Restaurant(RestaurantBase):
@@ -32,5 +36,8 @@ class Restaurant(RestaurantBase):
     class Config:
         from_attributes = True
 
+class RestaurantNearby(Restaurant):
+    distance_km: float
+
 class RestaurantWithMenu(Restaurant):
     menu_categories: List[MenuCategoryWithDishes] = []
\ No newline at end of file
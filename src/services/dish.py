@@ -1,10 +1,34 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy import delete, func, text, update, tuple_, true
 from src.db.models.dish import Dish
 from src.db.models.menu_category import MenuCategory
 from src.db.models.restaurant import Restaurant
-from src.schemas.dish import DishCreate, DishUpdate, DishAvailability
-from src.utils.kafka.producer import event_producer
+from src.schemas.dish import Dish as DishSchema, DishCreate, DishUpdate, DishAvailability
+from src.services.outbox import add_outbox_event
+from src.services.restaurant import invalidate_restaurant_menu, publish_menu_invalidation
+from src.utils.kafka.producer import EventType
+from src.utils.pagination import encode_cursor, decode_cursor, InvalidCursor
+from src.utils.serialization import schema_columns, dump_rows
+
+# Должна совпадать с конфигурацией триггера dishes_search_vector_update (миграция 0005)
+SEARCH_CONFIG = "russian"
+
+def build_dish_event_data(dish, restaurant_id: int) -> dict:
+    """Данные события dish.created / dish.updated"""
+    return {
+        "dish_id": dish.id,
+        "restaurant_id": restaurant_id,
+        "category_id": dish.category_id,
+        "name": dish.name,
+        "description": dish.description,
+        "price": float(dish.price),
+        "ingredients": dish.ingredients or [],
+        "allergens": dish.allergens or [],
+        "preparation_time": dish.preparation_time,
+        "is_available": dish.is_available,
+        "image_url": dish.image_url
+    }
 
 async def get_dishes(db: AsyncSession, category_id: int):
     result = await db.execute(
@@ -14,120 +38,223 @@ async def get_dishes(db: AsyncSession, category_id: int):
     )
     return result.scalars().all()
 
+async def get_dishes_json(db: AsyncSession, category_id: int) -> bytes:
+    """Блюда категории сразу в JSON: выборка только колонок схемы, без ORM-объектов и pydantic"""
+    result = await db.execute(
+        select(*schema_columns(Dish, DishSchema))
+        .filter(Dish.category_id == category_id)
+        .order_by(Dish.name)
+    )
+    return dump_rows(result.mappings())
+
+def _dish_search_query(query: str, restaurant_id: int, min_price, max_price, is_available: bool, limit: int, cursor: str):
+    # tsquery вычисляется один раз в FROM: в общем плане подготовленного запроса
+    # asyncpg выражение в WHERE/ORDER BY иначе разбиралось бы заново для каждой строки
+    tsquery_from = func.websearch_to_tsquery(SEARCH_CONFIG, query).alias("tsquery")
+    tsquery = tsquery_from.column
+    rank = func.ts_rank_cd(Dish.search_vector, tsquery)
+    statement = (
+        select(*schema_columns(Dish, DishSchema), MenuCategory.restaurant_id, rank.label("rank"))
+        .join(MenuCategory, Dish.category_id == MenuCategory.id)
+        .join(tsquery_from, true())
+        .filter(Dish.search_vector.op("@@")(tsquery), Dish.is_active == True, MenuCategory.is_active == True)
+        .order_by(rank.desc(), Dish.id.desc())
+        .limit(limit)
+    )
+    if restaurant_id is not None:
+        statement = statement.filter(MenuCategory.restaurant_id == restaurant_id)
+    if min_price is not None:
+        statement = statement.filter(Dish.price >= min_price)
+    if max_price is not None:
+        statement = statement.filter(Dish.price <= max_price)
+    if is_available is not None:
+        statement = statement.filter(Dish.is_available == is_available)
+    if cursor is not None:
+        last_rank, last_id = decode_cursor(cursor, 2)
+        if not isinstance(last_rank, (int, float)) or not isinstance(last_id, int):
+            raise InvalidCursor("Invalid cursor")
+        statement = statement.filter(tuple_(rank, Dish.id) < tuple_(last_rank, last_id))
+    return statement
+
+async def search_dishes_json(
+    db: AsyncSession, query: str, restaurant_id: int = None, min_price=None, max_price=None,
+    is_available: bool = None, limit: int = 20, cursor: str = None
+):
+    """Полнотекстовый поиск блюд по названию, ингредиентам и описанию (GIN по search_vector).
+
+    Возвращает (JSON-массив, курсор следующей страницы или None); сортировка по релевантности.
+    """
+    # Селективность зависит от слов запроса и фильтров, общий план подготовленного
+    # запроса (после 5 выполнений) для частых слов и крупных ресторанов на порядки медленнее
+    await db.execute(text("SET LOCAL plan_cache_mode = force_custom_plan"))
+    result = await db.execute(
+        _dish_search_query(query, restaurant_id, min_price, max_price, is_available, limit, cursor)
+    )
+    rows = result.mappings().all()
+    next_cursor = None
+    if len(rows) == limit:
+        next_cursor = encode_cursor([rows[-1]["rank"], rows[-1]["id"]])
+    return dump_rows(rows), next_cursor
+
+async def get_dish_last_modified(db: AsyncSession, restaurant_id: int, dish_id: int):
+    """Валидатор для условного GET: строка с last_modified или None, если блюда нет в ресторане"""
+    result = await db.execute(
+        select(func.coalesce(Dish.updated_at, Dish.created_at).label("last_modified"))
+        .join(MenuCategory, Dish.category_id == MenuCategory.id)
+        .filter(Dish.id == dish_id, MenuCategory.restaurant_id == restaurant_id)
+    )
+    return result.first()
+
+async def get_category_dishes_version(db: AsyncSession, restaurant_id: int, category_id: int):
+    """Валидатор списка блюд категории: число блюд, max(updated_at), сумма id; None, если категории нет в ресторане"""
+    result = await db.execute(
+        select(
+            func.count(Dish.id),
+            func.max(func.coalesce(Dish.updated_at, Dish.created_at)),
+            func.coalesce(func.sum(Dish.id), 0),
+        )
+        .select_from(MenuCategory)
+        .outerjoin(Dish, Dish.category_id == MenuCategory.id)
+        .filter(MenuCategory.id == category_id, MenuCategory.restaurant_id == restaurant_id)
+        .group_by(MenuCategory.id)
+    )
+    return result.first()
+
 async def get_dish(db: AsyncSession, dish_id: int):
     result = await db.execute(
         select(Dish).filter(Dish.id == dish_id)
     )
     return result.scalar_one_or_none()
 
-async def create_dish(db: AsyncSession, category_id: int, dish: DishCreate):
+async def get_dish_in_restaurant(db: AsyncSession, restaurant_id: int, dish_id: int):
+    """Блюдо вместе с проверкой принадлежности ресторану - один запрос с JOIN"""
+    result = await db.execute(
+        select(Dish)
+        .join(MenuCategory, Dish.category_id == MenuCategory.id)
+        .filter(Dish.id == dish_id, MenuCategory.restaurant_id == restaurant_id)
+    )
+    return result.scalar_one_or_none()
+
+async def create_dish(db: AsyncSession, restaurant_id: int, category_id: int, dish: DishCreate):
     db_dish = Dish(category_id=category_id, **dish.dict())
     db.add(db_dish)
-    await db.commit()
-    await db.refresh(db_dish)
+    await db.flush()
     
-    result = await db.execute(select(MenuCategory).filter(MenuCategory.id == category_id))
-    category = result.scalar_one_or_none()
-    
-    dish_data = {
-        "dish_id": db_dish.id,
-        "restaurant_id": category.restaurant_id,
-        "category_id": category_id,
-        "name": db_dish.name,
-        "description": db_dish.description,
-        "price": float(db_dish.price),
-        "ingredients": db_dish.ingredients or [],
-        "allergens": db_dish.allergens or [],
-        "preparation_time": db_dish.preparation_time,
-        "is_available": db_dish.is_available,
-        "image_url": db_dish.image_url
-    }
-    await event_producer.send_dish_created(dish_data)
+    dish_data = build_dish_event_data(db_dish, restaurant_id)
+    add_outbox_event(db, EventType.DISH_CREATED, dish_data, key=str(restaurant_id))
+    publish_menu_invalidation(db, restaurant_id)
+    await db.commit()
+    invalidate_restaurant_menu(restaurant_id)
     
     return db_dish
 
-async def update_dish(db: AsyncSession, dish_id: int, dish_update: DishUpdate):
-    db_dish = await get_dish(db, dish_id)
+async def _update_dish_in_restaurant(db: AsyncSession, restaurant_id: int, dish_id: int, values: dict):
+    """UPDATE ... FROM menu_categories ... RETURNING: изменение и проверка принадлежности одним запросом"""
+    result = await db.execute(
+        update(Dish)
+        .where(
+            Dish.id == dish_id,
+            Dish.category_id == MenuCategory.id,
+            MenuCategory.restaurant_id == restaurant_id,
+        )
+        .values(**values)
+        .returning(Dish)
+        .execution_options(synchronize_session=False, populate_existing=True)
+    )
+    return result.scalar_one_or_none()
+
+async def update_dish(db: AsyncSession, restaurant_id: int, dish_id: int, dish_update: DishUpdate):
+    update_data = dish_update.dict(exclude_unset=True)
+    if not update_data:
+        return await get_dish_in_restaurant(db, restaurant_id, dish_id)
+    
+    db_dish = await _update_dish_in_restaurant(db, restaurant_id, dish_id, update_data)
     if db_dish:
-        update_data = dish_update.dict(exclude_unset=True)
-        for field, value in update_data.items():
-            setattr(db_dish, field, value)
+        dish_data = build_dish_event_data(db_dish, restaurant_id)
+        add_outbox_event(db, EventType.DISH_UPDATED, dish_data, key=str(restaurant_id))
+        publish_menu_invalidation(db, restaurant_id)
         await db.commit()
-        await db.refresh(db_dish)
-        
-        result = await db.execute(
-            select(MenuCategory).filter(MenuCategory.id == db_dish.category_id)
-        )
-        category = result.scalar_one_or_none()
-        
-        dish_data = {
-            "dish_id": db_dish.id,
-            "restaurant_id": category.restaurant_id,
-            "category_id": db_dish.category_id,
-            "name": db_dish.name,
-            "description": db_dish.description,
-            "price": float(db_dish.price),
-            "ingredients": db_dish.ingredients or [],
-            "allergens": db_dish.allergens or [],
-            "preparation_time": db_dish.preparation_time,
-            "is_available": db_dish.is_available,
-            "image_url": db_dish.image_url
-        }
-        await event_producer.send_dish_updated(dish_data)
+        invalidate_restaurant_menu(restaurant_id)
         
     return db_dish
 
-async def update_dish_availability(db: AsyncSession, dish_id: int, availability: DishAvailability):
-    db_dish = await get_dish(db, dish_id)
+async def update_dish_availability(db: AsyncSession, restaurant_id: int, dish_id: int, availability: DishAvailability):
+    db_dish = await _update_dish_in_restaurant(
+        db, restaurant_id, dish_id, {"is_available": availability.is_available}
+    )
     if db_dish:
-        db_dish.is_available = availability.is_available
-        await db.commit()
-        await db.refresh(db_dish)
-        
-        result = await db.execute(
-            select(MenuCategory).filter(MenuCategory.id == db_dish.category_id)
-        )
-        category = result.scalar_one_or_none()
-        
         dish_data = {
             "dish_id": db_dish.id,
-            "restaurant_id": category.restaurant_id,
+            "restaurant_id": restaurant_id,
             "name": db_dish.name,
             "is_available": db_dish.is_available
         }
-        await event_producer.send_dish_availability_changed(dish_data)
+        add_outbox_event(db, EventType.DISH_AVAILABILITY_CHANGED, dish_data, key=str(restaurant_id))
+        publish_menu_invalidation(db, restaurant_id)
+        await db.commit()
+        invalidate_restaurant_menu(restaurant_id)
         
     return db_dish
 
-async def delete_dish(db: AsyncSession, dish_id: int):
-    db_dish = await get_dish(db, dish_id)
-    if not db_dish:
-        return None
-    
+async def update_dishes_availability(db: AsyncSession, restaurant_id: int, dish_ids: list, is_available: bool):
+    """Массовое изменение доступности блюд ресторана одним UPDATE ... RETURNING"""
     result = await db.execute(
-        select(MenuCategory, Restaurant)
-        .join(Restaurant, MenuCategory.restaurant_id == Restaurant.id)
-        .filter(MenuCategory.id == db_dish.category_id)
+        update(Dish)
+        .where(
+            Dish.id.in_(set(dish_ids)),
+            Dish.category_id == MenuCategory.id,
+            MenuCategory.restaurant_id == restaurant_id,
+        )
+        .values(is_available=is_available)
+        .returning(Dish.id, Dish.category_id, Dish.name)
+        .execution_options(synchronize_session=False)
     )
-    row = result.first()
-    if row:
-        category, restaurant = row
-        
+    rows = result.all()
+    if rows:
         dish_data = {
-            "dish_id": db_dish.id,
-            "restaurant_id": restaurant.id,
-            "category_id": category.id,
-            "name": db_dish.name,
-            "restaurant_name": restaurant.name
+            "restaurant_id": restaurant_id,
+            "is_available": is_available,
+            "dishes": [
+                {"dish_id": row.id, "category_id": row.category_id, "name": row.name}
+                for row in rows
+            ]
         }
-        
-        await db.delete(db_dish)
+        add_outbox_event(db, EventType.DISH_AVAILABILITY_BATCH_CHANGED, dish_data, key=str(restaurant_id))
+        publish_menu_invalidation(db, restaurant_id)
+    await db.commit()
+    if rows:
+        invalidate_restaurant_menu(restaurant_id)
+    return [row.id for row in rows]
+
+async def delete_dish(db: AsyncSession, restaurant_id: int, dish_id: int, commit: bool = True):
+    """DELETE ... USING menu_categories, restaurants ... RETURNING - проверка принадлежности и удаление одним запросом"""
+    result = await db.execute(
+        delete(Dish)
+        .where(
+            Dish.id == dish_id,
+            Dish.category_id == MenuCategory.id,
+            MenuCategory.restaurant_id == Restaurant.id,
+            Restaurant.id == restaurant_id,
+        )
+        .returning(Dish.id, Dish.category_id, Dish.name, Restaurant.name.label("restaurant_name"))
+        .execution_options(synchronize_session=False)
+    )
+    row = result.first()
+    if row is None:
+        return None
+    
+    dish_data = {
+        "dish_id": row.id,
+        "restaurant_id": restaurant_id,
+        "category_id": row.category_id,
+        "name": row.name,
+        "restaurant_name": row.restaurant_name
+    }
+    add_outbox_event(db, EventType.DISH_DELETED, dish_data, key=str(restaurant_id))
+    if commit:
+        # Без commit инвалидацию публикует вызывающий - одну на всю транзакцию
+        publish_menu_invalidation(db, restaurant_id)
         await db.commit()
-        
-        await event_producer.send_dish_deleted(dish_data)
-        
-        return dish_data
+        invalidate_restaurant_menu(restaurant_id)
     
-    await db.delete(db_dish)
-    await db.commit()
-    return {"dish_id": dish_id}
\ No newline at end of file
+    return dish_data
@@ -0,0 +1,69 @@
+import logging
+from datetime import datetime
+from typing import AsyncIterator, Optional
+from sqlalchemy import or_, func
+from sqlalchemy.future import select
+from src.core.config import settings
+from src.db.session import engine
+from src.db.models.restaurant import Restaurant
+from src.db.models.menu_category import MenuCategory
+from src.db.models.dish import Dish
+from src.db.models.review import Review
+from src.schemas.restaurant import Restaurant as RestaurantSchema
+from src.schemas.dish import Dish as DishSchema
+from src.schemas.review import Review as ReviewSchema
+from src.utils.serialization import schema_columns, dump_ndjson
+
+logger = logging.getLogger(__name__)
+
+def _changed_since(model, updated_since: datetime):
+    return func.coalesce(model.updated_at, model.created_at) >= updated_since
+
+async def stream_ndjson(query) -> AsyncIterator[bytes]:
+    """Выгрузка запроса в NDJSON через серверный курсор.
+
+    Отдельное соединение в read-only транзакции REPEATABLE READ: вся выгрузка видит
+    один снимок, а в памяти одновременно не больше export_batch_size строк.
+    """
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="REPEATABLE READ", postgresql_readonly=True)
+        async with conn.begin():
+            result = await conn.stream(query.execution_options(yield_per=settings.export_batch_size))
+            exported = 0
+            async for rows in result.mappings().partitions():
+                exported += len(rows)
+                yield dump_ndjson(rows)
+    logger.info(f"Export finished: {exported} rows")
+
+def restaurants_export_query(updated_since: Optional[datetime] = None):
+    query = select(
+        *schema_columns(Restaurant, RestaurantSchema),
+        Restaurant.average_rating,
+        Restaurant.review_count,
+    ).order_by(Restaurant.id)
+    if updated_since is not None:
+        query = query.filter(_changed_since(Restaurant, updated_since))
+    return query
+
+def menus_export_query(updated_since: Optional[datetime] = None):
+    """Блюда с категорией и рестораном - одна строка на блюдо"""
+    query = (
+        select(
+            MenuCategory.restaurant_id,
+            MenuCategory.name.label("category_name"),
+            MenuCategory.order_index.label("category_order_index"),
+            MenuCategory.is_active.label("category_is_active"),
+            *schema_columns(Dish, DishSchema),
+        )
+        .join(MenuCategory, Dish.category_id == MenuCategory.id)
+        .order_by(Dish.id)
+    )
+    if updated_since is not None:
+        query = query.filter(or_(_changed_since(Dish, updated_since), _changed_since(MenuCategory, updated_since)))
+    return query
+
+def reviews_export_query(updated_since: Optional[datetime] = None):
+    query = select(*schema_columns(Review, ReviewSchema)).order_by(Review.id)
+    if updated_since is not None:
+        query = query.filter(_changed_since(Review, updated_since))
+    return query
@@ -1,8 +1,12 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
 from src.db.models.menu_category import MenuCategory
 from src.db.models.dish import Dish
-from src.schemas.menu_category import MenuCategoryCreate, MenuCategoryUpdate
+from src.schemas.menu_category import MenuCategory as MenuCategorySchema, MenuCategoryCreate, MenuCategoryUpdate
+from src.services.restaurant import invalidate_restaurant_menu, publish_menu_invalidation
+from src.utils.serialization import schema_columns, dump_rows
 
 async def get_menu_categories(db: AsyncSession, restaurant_id: int):
     result = await db.execute(
@@ -12,37 +16,51 @@ async def get_menu_categories(db: AsyncSession, restaurant_id: int):
     )
     return result.scalars().all()
 
-async def get_menu_category(db: AsyncSession, category_id: int):
+async def get_menu_categories_json(db: AsyncSession, restaurant_id: int) -> bytes:
+    """Категории ресторана сразу в JSON: выборка только колонок схемы, без ORM-объектов и pydantic"""
     result = await db.execute(
-        select(MenuCategory).filter(MenuCategory.id == category_id)
+        select(*schema_columns(MenuCategory, MenuCategorySchema))
+        .filter(MenuCategory.restaurant_id == restaurant_id)
+        .order_by(MenuCategory.order_index)
     )
-    return result.scalar_one_or_none()
+    return dump_rows(result.mappings())
 
-async def create_menu_category(db: AsyncSession, restaurant_id: int, category: MenuCategoryCreate):
-    existing_q = await db.execute(
-        select(MenuCategory).filter(
-            MenuCategory.restaurant_id == restaurant_id,
-            MenuCategory.name == category.name
+async def get_menu_categories_version(db: AsyncSession, restaurant_id: int):
+    """Валидатор списка категорий для условного GET: число, max(updated_at), сумма id"""
+    result = await db.execute(
+        select(
+            func.count(MenuCategory.id),
+            func.max(func.coalesce(MenuCategory.updated_at, MenuCategory.created_at)),
+            func.coalesce(func.sum(MenuCategory.id), 0),
         )
+        .filter(MenuCategory.restaurant_id == restaurant_id)
     )
-    existing = existing_q.scalar_one_or_none()
-    if existing:
-        return None
+    return result.one()
 
-    existing_idx_q = await db.execute(
-        select(MenuCategory).filter(
-            MenuCategory.restaurant_id == restaurant_id,
-            MenuCategory.order_index == category.order_index
-        )
+async def get_menu_category(db: AsyncSession, category_id: int):
+    result = await db.execute(
+        select(MenuCategory).filter(MenuCategory.id == category_id)
     )
-    existing_idx = existing_idx_q.scalar_one_or_none()
-    if existing_idx:
-        return False
+    return result.scalar_one_or_none()
+
+UNIQUE_NAME_INDEX = "uq_menu_categories_restaurant_name"
+UNIQUE_ORDER_INDEX = "uq_menu_categories_restaurant_order_index"
 
+async def create_menu_category(db: AsyncSession, restaurant_id: int, category: MenuCategoryCreate):
     db_category = MenuCategory(restaurant_id=restaurant_id, **category.dict())
     db.add(db_category)
-    await db.commit()
+    publish_menu_invalidation(db, restaurant_id)
+    try:
+        await db.commit()
+    except IntegrityError as e:
+        await db.rollback()
+        if UNIQUE_NAME_INDEX in str(e.orig):
+            return None
+        if UNIQUE_ORDER_INDEX in str(e.orig):
+            return False
+        raise
     await db.refresh(db_category)
+    invalidate_restaurant_menu(restaurant_id)
     return db_category
 
 async def update_menu_category(db: AsyncSession, category_id: int, category_update: MenuCategoryUpdate):
@@ -51,8 +69,18 @@ async def update_menu_category(db: AsyncSession, category_id: int, category_upda
         update_data = category_update.dict(exclude_unset=True)
         for field, value in update_data.items():
             setattr(db_category, field, value)
-        await db.commit()
+        publish_menu_invalidation(db, db_category.restaurant_id)
+        try:
+            await db.commit()
+        except IntegrityError as e:
+            await db.rollback()
+            if UNIQUE_NAME_INDEX in str(e.orig):
+                raise ValueError("Category with this name already exists for this restaurant")
+            if UNIQUE_ORDER_INDEX in str(e.orig):
+                raise ValueError("Category with this order_index already exists for this restaurant")
+            raise
         await db.refresh(db_category)
+        invalidate_restaurant_menu(db_category.restaurant_id)
     return db_category
 
 async def get_dishes_count_by_category(db: AsyncSession, category_id: int):
@@ -77,8 +105,10 @@ async def delete_menu_category(db: AsyncSession, restaurant_id: int, category_id
     if force:
         dishes_to_delete = await db.execute(select(Dish).filter(Dish.category_id == category_id))
         for dish in dishes_to_delete.scalars():
-            await delete_dish(db, dish.id)
+            await delete_dish(db, restaurant_id, dish.id, commit=False)
     
     await db.delete(category)
+    publish_menu_invalidation(db, restaurant_id)
     await db.commit()
+    invalidate_restaurant_menu(restaurant_id)
     return category
\ No newline at end of file
@@ -0,0 +1,146 @@
+from types import SimpleNamespace
+from sqlalchemy import func, insert, update, literal_column
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from src.db.models.dish import Dish
+from src.db.models.menu_category import MenuCategory
+from src.schemas.menu_import import MenuImport
+from src.services.dish import build_dish_event_data
+from src.services.outbox import add_outbox_events
+from src.services.restaurant import invalidate_restaurant_menu, publish_menu_invalidation
+from src.utils.kafka.producer import EventType
+
+DISH_FIELDS = ("name", "description", "price", "ingredients", "allergens", "preparation_time", "image_url")
+
+async def import_menu(db: AsyncSession, restaurant_id: int, menu: MenuImport, upsert: bool = False):
+    """Импорт полного меню одной транзакцией; в режиме upsert категории и блюда сопоставляются по имени.
+
+    В режиме upsert порядок категорий берётся из импорта, а категории, которых в нём нет,
+    ставятся после импортированных в прежнем порядке.
+    """
+    if not menu.categories:
+        return {"categories_created": 0, "categories_updated": 0, "dishes_created": 0, "dishes_updated": 0}
+
+    order_indexes = [category.order_index for category in menu.categories]
+    if upsert:
+        # uq_menu_categories_restaurant_order_index проверяется построчно и не служит арбитром
+        # ON CONFLICT: сдвигаем все order_index ресторана ниже и старых, и импортируемых значений,
+        # чтобы перестановка категорий не упиралась в ещё не обновлённые строки
+        await _shift_order_indexes_below(db, restaurant_id, min(order_indexes))
+
+    category_stmt = pg_insert(MenuCategory).values([
+        {
+            "restaurant_id": restaurant_id,
+            "name": category.name,
+            "description": category.description,
+            "order_index": category.order_index,
+            "is_active": category.is_active,
+        }
+        for category in menu.categories
+    ])
+    if upsert:
+        category_stmt = category_stmt.on_conflict_do_update(
+            index_elements=[MenuCategory.restaurant_id, MenuCategory.name],
+            set_={
+                "description": category_stmt.excluded.description,
+                "order_index": category_stmt.excluded.order_index,
+                "is_active": category_stmt.excluded.is_active,
+                "updated_at": func.now(),
+            },
+        )
+    result = await db.execute(
+        category_stmt.returning(
+            MenuCategory.id, MenuCategory.name, literal_column("xmax = 0").label("inserted")
+        )
+    )
+    category_rows = result.all()
+    category_ids = {row.name: row.id for row in category_rows}
+    categories_created = sum(1 for row in category_rows if row.inserted)
+    if upsert:
+        await _append_categories_left_out(db, restaurant_id, list(category_ids.values()), max(order_indexes))
+
+    existing_dishes = {}
+    if upsert:
+        result = await db.execute(
+            select(Dish.id, Dish.category_id, Dish.name, Dish.is_available)
+            .filter(Dish.category_id.in_(category_ids.values()))
+        )
+        existing_dishes = {(row.category_id, row.name): row for row in result}
+
+    to_insert, to_update = [], []
+    for category in menu.categories:
+        category_id = category_ids[category.name]
+        for dish in category.dishes:
+            values = {field: getattr(dish, field) for field in DISH_FIELDS}
+            existing = existing_dishes.get((category_id, dish.name))
+            if existing is None:
+                to_insert.append({"category_id": category_id, **values})
+            else:
+                to_update.append({"id": existing.id, "category_id": category_id, "is_available": existing.is_available, **values})
+
+    events = []
+    if to_insert:
+        result = await db.execute(
+            insert(Dish).returning(
+                Dish.id, Dish.category_id, Dish.is_available,
+                *(getattr(Dish, field) for field in DISH_FIELDS)
+            ),
+            to_insert,
+        )
+        events.extend(
+            (EventType.DISH_CREATED, build_dish_event_data(row, restaurant_id), str(restaurant_id))
+            for row in result
+        )
+    if to_update:
+        await db.execute(
+            update(Dish),
+            [{key: value for key, value in row.items() if key not in ("category_id", "is_available")} for row in to_update],
+        )
+        events.extend(
+            (EventType.DISH_UPDATED, build_dish_event_data(SimpleNamespace(**row), restaurant_id), str(restaurant_id))
+            for row in to_update
+        )
+
+    await add_outbox_events(db, events)
+    publish_menu_invalidation(db, restaurant_id)
+    await db.commit()
+    invalidate_restaurant_menu(restaurant_id)
+
+    return {
+        "categories_created": categories_created,
+        "categories_updated": len(category_rows) - categories_created,
+        "dishes_created": len(to_insert),
+        "dishes_updated": len(to_update),
+    }
+
+async def _shift_order_indexes_below(db: AsyncSession, restaurant_id: int, lowest: int):
+    """Сдвиг order_index всех категорий ресторана ниже min(текущих, lowest) с сохранением порядка"""
+    span = (
+        select(func.max(MenuCategory.order_index) - func.least(func.min(MenuCategory.order_index), lowest) + 1)
+        .where(MenuCategory.restaurant_id == restaurant_id)
+        .scalar_subquery()
+    )
+    await db.execute(
+        update(MenuCategory)
+        .where(MenuCategory.restaurant_id == restaurant_id)
+        .values(order_index=MenuCategory.order_index - span)
+        .execution_options(synchronize_session=False)
+    )
+
+async def _append_categories_left_out(db: AsyncSession, restaurant_id: int, imported_ids: list, highest: int):
+    """Категории, которых нет в импорте, получают order_index после импортированных"""
+    left_out = (
+        select(
+            MenuCategory.id,
+            func.row_number().over(order_by=(MenuCategory.order_index, MenuCategory.id)).label("position"),
+        )
+        .where(MenuCategory.restaurant_id == restaurant_id, MenuCategory.id.not_in(imported_ids))
+        .subquery()
+    )
+    await db.execute(
+        update(MenuCategory)
+        .where(MenuCategory.id == left_out.c.id)
+        .values(order_index=highest + left_out.c.position, updated_at=func.now())
+        .execution_options(synchronize_session=False)
+    )
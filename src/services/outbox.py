@@ -0,0 +1,34 @@
+from sqlalchemy import event, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from typing import Optional
+from src.db.models.outbox import OutboxEvent
+from src.utils.kafka.producer import EventType, build_event
+from src.utils.kafka.outbox_relay import outbox_relay
+
+def add_outbox_event(db: AsyncSession, event_type: EventType, data: dict, key: Optional[str] = None):
+    """Запись доменного события в outbox в текущей транзакции"""
+    db.add(OutboxEvent(topic=event_type.value, key=key, payload=build_event(event_type, data)))
+    db.info["outbox_pending"] = True
+
+async def add_outbox_events(db: AsyncSession, events: list):
+    """Запись пачки событий (event_type, data, key) в outbox одним многострочным INSERT"""
+    if not events:
+        return
+    await db.execute(
+        insert(OutboxEvent),
+        [
+            {"topic": event_type.value, "key": key, "payload": build_event(event_type, data)}
+            for event_type, data, key in events
+        ],
+    )
+    db.info["outbox_pending"] = True
+
+@event.listens_for(Session, "after_commit")
+def _wake_outbox_relay(session):
+    if session.info.pop("outbox_pending", False):
+        outbox_relay.notify()
+
+@event.listens_for(Session, "after_rollback")
+def _reset_outbox_pending(session):
+    session.info.pop("outbox_pending", None)
@@ -1,34 +1,263 @@
+import time
+from datetime import datetime
+from typing import Iterable, List, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from src.db.models.restaurant import Restaurant
-from src.schemas.restaurant import RestaurantCreate, RestaurantUpdate
-from src.utils.kafka.producer import event_producer
-from sqlalchemy import desc
+from src.db.models.menu_category import MenuCategory
+from src.db.models.dish import Dish
+from src.db.models.opening_interval import RestaurantOpeningInterval
+from src.schemas.restaurant import (
+    Restaurant as RestaurantSchema, RestaurantCreate, RestaurantUpdate, RestaurantWithMenu, RestaurantNearby
+)
+from src.core.config import settings
+from src.utils.cache import LRUCache, LRUCacheBackend, LocalSharedStoreBackend, ReadThroughCache
+from src.utils.metrics import Counter, registry as metrics_registry
+from src.utils.serialization import schema_columns, dump_rows
+from src.utils.pagination import encode_cursor, decode_cursor, InvalidCursor
+from src.utils.opening_hours import opening_intervals, minute_of_week
+from src.utils.geo import EARTH_RADIUS_KM, geo_cell, cell_ranges
+from src.services.outbox import add_outbox_event
+from src.utils.kafka.producer import EventType
+from sqlalchemy import desc, or_, and_, delete, exists, func, insert, literal
 
-async def get_restaurants(db: AsyncSession, skip: int = 0, limit: int = 100):
+menu_cache = LRUCache(
+    max_entries=settings.menu_cache_max_entries,
+    ttl=settings.menu_cache_ttl_seconds,
+    max_bytes=settings.menu_cache_max_bytes,
+)
+
+def _restaurant_cache_backend():
+    if settings.restaurant_cache_backend == "shared":
+        return LocalSharedStoreBackend()
+    return LRUCacheBackend(
+        max_entries=settings.restaurant_cache_max_entries,
+        ttl=settings.restaurant_cache_ttl_seconds,
+    )
+
+restaurant_cache = ReadThroughCache(_restaurant_cache_backend(), ttl=settings.restaurant_cache_ttl_seconds)
+
+LIST_VERSION_KEY = "restaurants:list:version"
+# Событие инвалидации с этим scope сбрасывает только меню, без ресторана и страниц списка
+MENU_SCOPE = "menu"
+
+def _restaurant_key(restaurant_id: int) -> str:
+    return f"restaurant:{restaurant_id}"
+
+async def _list_version() -> bytes:
+    """Версия списков ресторанов: входит в ключи страниц, смена версии сбрасывает все страницы разом"""
+    version = await restaurant_cache.backend.get(LIST_VERSION_KEY)
+    if version is None:
+        version = await _bump_list_version()
+    return version
+
+async def _bump_list_version() -> bytes:
+    # Уникальное значение, а не счётчик: вытесненная версия не может совпасть со старой
+    version = str(time.time_ns()).encode()
+    await restaurant_cache.backend.set(LIST_VERSION_KEY, version, settings.restaurant_cache_ttl_seconds)
+    return version
+
+def invalidate_restaurant_menu(restaurant_id: int):
+    """Сброс закэшированного меню ресторана после изменения блюд или категорий"""
+    menu_cache.invalidate(restaurant_id)
+
+async def invalidate_restaurants(restaurant_ids: Iterable[int]):
+    """Сброс кэша ресторанов, их меню и всех страниц списка в этой реплике"""
+    for restaurant_id in restaurant_ids:
+        await restaurant_cache.invalidate(_restaurant_key(restaurant_id))
+        invalidate_restaurant_menu(restaurant_id)
+    await _bump_list_version()
+
+def publish_restaurant_invalidation(db: AsyncSession, restaurant_ids: Iterable[int]):
+    """Событие инвалидации для остальных реплик; уходит через outbox вместе с транзакцией"""
+    add_outbox_event(db, EventType.RESTAURANT_CACHE_INVALIDATED, {"restaurant_ids": list(restaurant_ids)})
+
+def publish_menu_invalidation(db: AsyncSession, restaurant_id: int):
+    """Сброс только меню ресторана во всех репликах (изменение блюд или категорий); через outbox"""
+    add_outbox_event(
+        db, EventType.RESTAURANT_CACHE_INVALIDATED, {"restaurant_ids": [restaurant_id], "scope": MENU_SCOPE}
+    )
+
+def ranking_score(rating_sum, review_count):
+    """Байесовское среднее рейтинга: мало отзывов - оценка ближе к ranking_prior_mean.
+
+    Работает и для чисел, и для SQL-выражений над колонками.
+    """
+    weight = settings.ranking_prior_weight
+    return (settings.ranking_prior_mean * weight + rating_sum) / (review_count + weight)
+
+def _restaurants_query(columns: list, skip: int, limit: int, cursor: str):
+    # Порядок совпадает с индексом ix_restaurants_ranking - страница читается из индекса без сортировки
+    query = (
+        select(*columns)
+        .order_by(desc(Restaurant.ranking_score), Restaurant.id)
+        .limit(limit)
+    )
+    if cursor is not None:
+        score, last_id = decode_cursor(cursor, 2)
+        if not isinstance(score, (int, float)) or not isinstance(last_id, int):
+            raise InvalidCursor("Invalid cursor")
+        query = query.filter(
+            Restaurant.ranking_score <= score,
+            or_(
+                Restaurant.ranking_score < score,
+                and_(Restaurant.ranking_score == score, Restaurant.id > last_id),
+            ),
+        )
+    else:
+        query = query.offset(skip)
+    return query
+
+async def get_restaurants(db: AsyncSession, skip: int = 0, limit: int = 100, cursor: str = None):
+    result = await db.execute(_restaurants_query([Restaurant], skip, limit, cursor))
+    return result.scalars().all()
+
+def restaurants_next_cursor(restaurants: list, limit: int):
+    """Курсор следующей страницы списка ресторанов (None, если страница последняя)"""
+    if not restaurants or len(restaurants) < limit:
+        return None
+    last = restaurants[-1]
+    return encode_cursor([last.ranking_score, last.id])
+
+async def get_restaurants_page_json(db: AsyncSession, skip: int = 0, limit: int = 100, cursor: str = None):
+    """Страница списка ресторанов через read-through кэш: (JSON-массив, курсор следующей страницы).
+
+    В кэше хранится одно значение: строка курсора, перевод строки и JSON страницы.
+    """
+    async def load():
+        columns = schema_columns(Restaurant, RestaurantSchema)
+        result = await db.execute(
+            _restaurants_query(columns + [Restaurant.ranking_score], skip, limit, cursor)
+        )
+        rows = result.all()
+        next_cursor = restaurants_next_cursor(rows, limit) or ""
+        items = dump_rows((row._mapping for row in rows), fields=list(RestaurantSchema.model_fields))
+        return next_cursor.encode('utf-8') + b"\n" + items
+
+    version = (await _list_version()).decode()
+    key = f"restaurants:list:{version}:{skip}:{limit}:{cursor or ''}"
+    body = await restaurant_cache.get_or_load(key, load, ttl=settings.restaurant_list_cache_ttl_seconds)
+    next_cursor, items = body.split(b"\n", 1)
+    return items, next_cursor.decode('utf-8') or None
+
+async def discover_restaurants_json(
+    db: AsyncSession,
+    open_at: Optional[datetime] = None,
+    min_price=None,
+    max_price=None,
+    exclude_allergens: Optional[List[str]] = None,
+    ingredients: Optional[List[str]] = None,
+    limit: int = 20,
+    cursor: str = None,
+):
+    """Поиск активных ресторанов по фасетам одним запросом: (JSON-массив, курсор следующей страницы).
+
+    open_at - открыт в этот момент (интервалы restaurant_opening_intervals);
+    фильтры по блюдам - есть доступное блюдо в диапазоне цен, без аллергенов
+    exclude_allergens и со всеми ingredients. Порядок - как в списке ресторанов (ranking_score).
+    """
+    query = _restaurants_query(
+        schema_columns(Restaurant, RestaurantSchema) + [Restaurant.ranking_score],
+        0, limit, cursor
+    ).filter(Restaurant.is_active == True)
+
+    if open_at is not None:
+        minute = minute_of_week(open_at, settings.opening_hours_timezone)
+        query = query.filter(exists().where(
+            RestaurantOpeningInterval.restaurant_id == Restaurant.id,
+            func.int4range(RestaurantOpeningInterval.opens_at, RestaurantOpeningInterval.closes_at).op("@>")(minute),
+        ))
+
+    dish_filters = []
+    if min_price is not None:
+        dish_filters.append(Dish.price >= min_price)
+    if max_price is not None:
+        dish_filters.append(Dish.price <= max_price)
+    if exclude_allergens:
+        dish_filters.append(or_(Dish.allergens.is_(None), ~Dish.allergens.overlap(exclude_allergens)))
+    if ingredients:
+        dish_filters.append(Dish.ingredients.contains(ingredients))
+    if dish_filters:
+        query = query.filter(exists().where(
+            MenuCategory.restaurant_id == Restaurant.id,
+            MenuCategory.is_active == True,
+            Dish.category_id == MenuCategory.id,
+            Dish.is_active == True,
+            Dish.is_available == True,
+            *dish_filters,
+        ))
+
+    result = await db.execute(query)
+    rows = result.all()
+    items = dump_rows((row._mapping for row in rows), fields=list(RestaurantSchema.model_fields))
+    return items, restaurants_next_cursor(rows, limit)
+
+def _distance_km(latitude: float, longitude: float):
+    """Расстояние по формуле гаверсинусов, только встроенные функции PostgreSQL"""
+    haversine = (
+        func.power(func.sin(func.radians(Restaurant.latitude - latitude) / 2), 2)
+        + func.cos(func.radians(literal(latitude))) * func.cos(func.radians(Restaurant.latitude))
+        * func.power(func.sin(func.radians(Restaurant.longitude - longitude) / 2), 2)
+    )
+    return 2 * EARTH_RADIUS_KM * func.asin(func.sqrt(func.least(haversine, 1.0)))
+
+async def get_nearby_restaurants_json(db: AsyncSession, latitude: float, longitude: float, radius_km: float, limit: int = 20) -> bytes:
+    """Ближайшие активные рестораны в радиусе: по расстоянию, затем по рейтингу.
+
+    Кандидаты отбираются range scan по ix_restaurants_geo_cell, точное расстояние
+    считается только для них.
+    """
+    distance = _distance_km(latitude, longitude).label("distance_km")
     result = await db.execute(
-        select(Restaurant)
-        .order_by(
-            desc(Restaurant.average_rating),
-            desc(Restaurant.review_count),
-            Restaurant.id
+        select(*schema_columns(Restaurant, RestaurantSchema), distance)
+        .filter(
+            or_(*(Restaurant.geo_cell.between(first, last) for first, last in cell_ranges(latitude, longitude, radius_km))),
+            Restaurant.is_active == True,
+            distance <= radius_km,
         )
-        .offset(skip)
+        .order_by(distance, desc(Restaurant.ranking_score), Restaurant.id)
         .limit(limit)
     )
-    return result.scalars().all()
+    return dump_rows(result.mappings(), fields=list(RestaurantNearby.model_fields))
+
+async def _insert_opening_intervals(db: AsyncSession, restaurant_id: int, opening_hours: Optional[dict]):
+    """Интервалы часов работы из opening_hours в текущей транзакции"""
+    intervals = opening_intervals(opening_hours)
+    if intervals:
+        await db.execute(insert(RestaurantOpeningInterval), [
+            {"restaurant_id": restaurant_id, "opens_at": opens_at, "closes_at": closes_at}
+            for opens_at, closes_at in intervals
+        ])
+
+async def _replace_opening_intervals(db: AsyncSession, restaurant_id: int, opening_hours: Optional[dict]):
+    await db.execute(
+        delete(RestaurantOpeningInterval).filter(RestaurantOpeningInterval.restaurant_id == restaurant_id)
+    )
+    await _insert_opening_intervals(db, restaurant_id, opening_hours)
 
-async def get_restaurant(db: AsyncSession, restaurant_id: int):
+async def _get_restaurant_row(db: AsyncSession, restaurant_id: int):
     result = await db.execute(
         select(Restaurant).filter(Restaurant.id == restaurant_id)
     )
     return result.scalar_one_or_none()
 
+async def get_restaurant(db: AsyncSession, restaurant_id: int) -> Optional[RestaurantSchema]:
+    """Ресторан через read-through кэш"""
+    async def load():
+        restaurant = await _get_restaurant_row(db, restaurant_id)
+        if restaurant is None:
+            return None
+        return RestaurantSchema.model_validate(restaurant).model_dump_json().encode('utf-8')
+
+    body = await restaurant_cache.get_or_load(_restaurant_key(restaurant_id), load)
+    return RestaurantSchema.model_validate_json(body) if body is not None else None
+
 async def create_restaurant(db: AsyncSession, restaurant: RestaurantCreate):
     db_restaurant = Restaurant(**restaurant.dict())
+    db_restaurant.geo_cell = geo_cell(db_restaurant.latitude, db_restaurant.longitude)
+    db_restaurant.ranking_score = ranking_score(0, 0)
     db.add(db_restaurant)
-    await db.commit()
-    await db.refresh(db_restaurant)
+    await db.flush()
     
     restaurant_data = {
         "restaurant_id": db_restaurant.id,
@@ -38,27 +267,42 @@ async def create_restaurant(db: AsyncSession, restaurant: RestaurantCreate):
         "phone": db_restaurant.phone,
         "email": db_restaurant.email,
         "opening_hours": db_restaurant.opening_hours,
+        "latitude": db_restaurant.latitude,
+        "longitude": db_restaurant.longitude,
         "is_active": db_restaurant.is_active
     }
-    await event_producer.send_restaurant_created(restaurant_data)
+    add_outbox_event(db, EventType.RESTAURANT_CREATED, restaurant_data, key=str(restaurant_data["restaurant_id"]))
+    await _insert_opening_intervals(db, db_restaurant.id, db_restaurant.opening_hours)
+    publish_restaurant_invalidation(db, [db_restaurant.id])
+    await db.commit()
+    await db.refresh(db_restaurant)
+    await invalidate_restaurants([db_restaurant.id])
     
     return db_restaurant
 
 async def update_restaurant(db: AsyncSession, restaurant_id: int, restaurant_update: RestaurantUpdate):
-    db_restaurant = await get_restaurant(db, restaurant_id)
+    db_restaurant = await _get_restaurant_row(db, restaurant_id)
     if db_restaurant:
         update_data = restaurant_update.dict(exclude_unset=True)
         for field, value in update_data.items():
             setattr(db_restaurant, field, value)
+        if "latitude" in update_data or "longitude" in update_data:
+            db_restaurant.geo_cell = geo_cell(db_restaurant.latitude, db_restaurant.longitude)
+        if "opening_hours" in update_data:
+            await _replace_opening_intervals(db, restaurant_id, db_restaurant.opening_hours)
+        publish_restaurant_invalidation(db, [restaurant_id])
         await db.commit()
         await db.refresh(db_restaurant)
+        await invalidate_restaurants([restaurant_id])
     return db_restaurant
 
 async def delete_restaurant(db: AsyncSession, restaurant_id: int):
-    db_restaurant = await get_restaurant(db, restaurant_id)
+    db_restaurant = await _get_restaurant_row(db, restaurant_id)
     if db_restaurant:
         await db.delete(db_restaurant)
+        publish_restaurant_invalidation(db, [restaurant_id])
         await db.commit()
+        await invalidate_restaurants([restaurant_id])
     return db_restaurant
 
 async def get_restaurant_with_menu(db: AsyncSession, restaurant_id: int):
@@ -71,4 +315,33 @@ async def get_restaurant_with_menu(db: AsyncSession, restaurant_id: int):
         )
         .filter(Restaurant.id == restaurant_id)
     )
-    return result.scalar_one_or_none()
\ No newline at end of file
+    return result.scalar_one_or_none()
+
+async def get_restaurant_menu_json(db: AsyncSession, restaurant_id: int):
+    """Полное меню ресторана в виде готового JSON (из кэша, если есть)"""
+    body = menu_cache.get(restaurant_id)
+    if body is not None:
+        return body
+
+    with menu_cache.loading(restaurant_id) as generation:
+        restaurant = await get_restaurant_with_menu(db, restaurant_id)
+        if restaurant is None:
+            return None
+
+        body = RestaurantWithMenu.model_validate(restaurant).model_dump_json().encode('utf-8')
+        menu_cache.set(restaurant_id, body, generation)
+    return body
+
+cache_hits = Counter("cache_hits_total", "Cache hits", ("cache",))
+cache_misses = Counter("cache_misses_total", "Cache misses", ("cache",))
+cache_evictions = Counter("cache_evictions_total", "Entries evicted by size limits or TTL", ("cache",))
+cache_invalidations = Counter("cache_invalidations_total", "Explicit cache invalidations", ("cache",))
+
+def _collect_cache_metrics():
+    for name, stats in (("restaurant", restaurant_cache.get_stats()), ("menu", menu_cache.stats)):
+        cache_hits.set(stats["hits"], cache=name)
+        cache_misses.set(stats["misses"], cache=name)
+        cache_evictions.set(stats.get("evictions", 0), cache=name)
+        cache_invalidations.set(stats["invalidations"], cache=name)
+
+metrics_registry.add_collector(_collect_cache_metrics)
\ No newline at end of file
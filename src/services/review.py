@@ -1,8 +1,15 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy import func, update, delete, case, cast, Float, or_, true, tuple_
 from src.db.models.review import Review
 from src.db.models.restaurant import Restaurant
+from src.schemas.review import Review as ReviewSchema
+from src.services.restaurant import ranking_score
+from src.utils.pagination import encode_cursor, decode_cursor, InvalidCursor
+from src.utils.serialization import schema_columns, dump_rows
+from collections import defaultdict
+from datetime import datetime
 import logging
 
 logger = logging.getLogger(__name__)
@@ -26,24 +33,25 @@ async def create_review(db: AsyncSession, review_data: dict):
         )
         
         db.add(review)
+        await db.flush()
+        await apply_rating_delta(db, review_data["restaurant_id"], review.rating, 1)
         await db.commit()
         await db.refresh(review)
         
-        await update_restaurant_ratings(db, review_data["restaurant_id"])
-        
         logger.info(f"Review created successfully: {review_data['review_id']}")
         return review
         
-    except Exception as e:
-        logger.error(f"Error creating review: {e}")
+    except Exception:
         await db.rollback()
-        return None
+        raise
 
 async def update_review(db: AsyncSession, review_data: dict):
     """Обновление отзыва из Kafka события"""
     try:
         result = await db.execute(
-            select(Review).filter(Review.review_id == review_data["review_id"])
+            select(Review)
+            .filter(Review.review_id == review_data["review_id"])
+            .with_for_update()
         )
         review = result.scalar_one_or_none()
         
@@ -56,25 +64,26 @@ async def update_review(db: AsyncSession, review_data: dict):
         review.rating = review_data["new_rating"]
         review.comment = review_data.get("new_comment")
         
+        if review.is_active and old_rating != review_data["new_rating"]:
+            await apply_rating_delta(db, review.restaurant_id, review_data["new_rating"] - old_rating, 0)
+        
         await db.commit()
         await db.refresh(review)
         
-        if old_rating != review_data["new_rating"]:
-            await update_restaurant_ratings(db, review.restaurant_id)
-        
         logger.info(f"Review updated successfully: {review_data['review_id']}")
         return review
         
-    except Exception as e:
-        logger.error(f"Error updating review: {e}")
+    except Exception:
         await db.rollback()
-        return None
+        raise
 
 async def delete_review(db: AsyncSession, review_data: dict):
     """Удаление отзыва из Kafka события"""
     try:
         result = await db.execute(
-            select(Review).filter(Review.review_id == review_data["review_id"])
+            select(Review)
+            .filter(Review.review_id == review_data["review_id"])
+            .with_for_update()
         )
         review = result.scalar_one_or_none()
         
@@ -82,60 +91,326 @@ async def delete_review(db: AsyncSession, review_data: dict):
             logger.warning(f"Review not found: {review_data['review_id']}")
             return None
 
-        restaurant_id = review.restaurant_id
+        if review.is_active:
+            await apply_rating_delta(db, review.restaurant_id, -review.rating, -1)
         await db.delete(review)
         await db.commit()
         
-        await update_restaurant_ratings(db, restaurant_id)
-        
         logger.info(f"Review deleted successfully: {review_data['review_id']}")
         return True
         
-    except Exception as e:
-        logger.error(f"Error deleting review: {e}")
+    except Exception:
         await db.rollback()
-        return False
+        raise
 
-async def update_restaurant_ratings(db: AsyncSession, restaurant_id: int):
-    """Обновление агрегатных данных ресторана (средний рейтинг, количество отзывов)"""
-    try:
+# Не больше строк на один DELETE/SELECT ... IN: у asyncpg лимит 32767 параметров на запрос
+REVIEW_WRITE_CHUNK = 5000
+
+def _fold_state(state, kind: str, review_data: dict):
+    """Состояние отзыва после события; None - отзыва нет, existing=True - строка из БД (возможно, изменённая)"""
+    if kind == "created":
+        if state is not None:
+            return state
+        return {
+            "existing": False,
+            "restaurant_id": review_data["restaurant_id"],
+            "user_id": review_data["user_id"],
+            "rating": review_data["rating"],
+            "comment": review_data.get("comment"),
+        }
+    if state is None:
+        return None
+    if kind == "updated":
+        return {**state, "rating": review_data["new_rating"], "comment": review_data.get("new_comment")}
+    return None
+
+def fold_review_event(folded: dict, kind: str, review_data: dict):
+    """Добавление события к свёртке по review_id (kind: "created" | "updated" | "deleted").
+
+    Для каждого review_id хранится итог для двух случаев - отзыв уже есть в БД и отзыва нет,
+    поэтому свёртка не обращается к БД, а память не растёт с числом событий на отзыв.
+    """
+    review_id = review_data["review_id"]
+    if_exists, if_missing = folded.get(review_id, ({"existing": True}, None))
+    folded[review_id] = (_fold_state(if_exists, kind, review_data), _fold_state(if_missing, kind, review_data))
+
+def _chunks(items: list, size: int = REVIEW_WRITE_CHUNK):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+async def apply_folded_review_events(db: AsyncSession, folded: dict, recompute: bool = False):
+    """Запись итогового состояния свёрнутых отзывов одной транзакцией (без коммита).
+
+    Агрегаты ресторанов обновляются дельтами, а с recompute=True - пересчитываются
+    с нуля одним UPDATE на затронутые рестораны (режим догоняющей обработки).
+    """
+    existing = {}
+    for review_ids in _chunks(list(folded)):
         result = await db.execute(
             select(
-                func.avg(Review.rating).label('avg_rating'),
-                func.count(Review.id).label('review_count')
-            ).filter(
-                Review.restaurant_id == restaurant_id,
-                Review.is_active == True
+                Review.id, Review.review_id, Review.restaurant_id,
+                Review.rating, Review.comment, Review.is_active
             )
+            .filter(Review.review_id.in_(review_ids))
+            .with_for_update()
         )
-        stats = result.first()
-        
-        result = await db.execute(
-            select(Restaurant).filter(Restaurant.id == restaurant_id)
+        existing.update((row.review_id, row) for row in result)
+
+    to_insert, to_update, to_delete = [], [], []
+    deltas = defaultdict(lambda: [0, 0])
+    for review_id, (if_exists, if_missing) in folded.items():
+        old = existing.get(review_id)
+        new = if_exists if old is not None else if_missing
+        if old is not None:
+            if new is not None and new["existing"]:
+                if (new.get("rating", old.rating), new.get("comment", old.comment)) == (old.rating, old.comment):
+                    continue
+                to_update.append({"id": old.id, "rating": new["rating"], "comment": new["comment"]})
+            else:
+                to_delete.append(old.id)
+            if old.is_active:
+                deltas[old.restaurant_id][0] -= old.rating
+                deltas[old.restaurant_id][1] -= 1
+        if new is None:
+            continue
+        if not new["existing"]:
+            to_insert.append({"review_id": review_id, **{key: value for key, value in new.items() if key != "existing"}})
+        if new["existing"] and not old.is_active:
+            continue
+        restaurant_id = old.restaurant_id if new["existing"] else new["restaurant_id"]
+        deltas[restaurant_id][0] += new["rating"]
+        deltas[restaurant_id][1] += 1
+
+    for ids in _chunks(to_delete):
+        await db.execute(delete(Review).where(Review.id.in_(ids)))
+    if to_update:
+        await db.execute(update(Review), to_update)
+    if to_insert:
+        # executemany: SQLAlchemy сам склеивает строки в многострочные INSERT ... VALUES
+        statement = pg_insert(Review)
+        if recompute:
+            # Отзыв, вставленный параллельно, пропускается - агрегаты всё равно считаются по таблице.
+            # При дельтах конфликт должен упасть, иначе дельта разойдётся со строками
+            statement = statement.on_conflict_do_nothing(index_elements=[Review.review_id])
+        await db.execute(statement, to_insert)
+
+    changed = [restaurant_id for restaurant_id, delta in deltas.items() if any(delta)]
+    if recompute:
+        for restaurant_ids in _chunks(sorted(deltas)):
+            await recompute_restaurant_ratings(db, restaurant_ids)
+    else:
+        for restaurant_id in changed:
+            await apply_rating_delta(db, restaurant_id, *deltas[restaurant_id])
+
+    return {
+        "created": len(to_insert),
+        "updated": len(to_update),
+        "deleted": len(to_delete),
+        "restaurants": len(changed),
+    }
+
+async def apply_review_events(db: AsyncSession, events: list):
+    """Применение пачки событий отзывов одной транзакцией (без коммита).
+
+    events - список пар (kind, review_data), kind: "created" | "updated" | "deleted".
+    """
+    folded = {}
+    for kind, review_data in events:
+        fold_review_event(folded, kind, review_data)
+    return await apply_folded_review_events(db, folded)
+
+def _average_rating(rating_sum, review_count):
+    return case((review_count > 0, cast(rating_sum, Float) / review_count), else_=0.0)
+
+async def apply_rating_delta(db: AsyncSession, restaurant_id: int, sum_delta: int, count_delta: int):
+    """Инкрементальное обновление агрегатов ресторана в текущей транзакции (без коммита)"""
+    if not sum_delta and not count_delta:
+        return
+    rating_sum = Restaurant.rating_sum + sum_delta
+    review_count = Restaurant.review_count + count_delta
+    await db.execute(
+        update(Restaurant)
+        .where(Restaurant.id == restaurant_id)
+        .values(
+            rating_sum=rating_sum,
+            review_count=review_count,
+            average_rating=_average_rating(rating_sum, review_count),
+            ranking_score=ranking_score(rating_sum, review_count),
         )
-        restaurant = result.scalar_one_or_none()
-        
-        if restaurant and stats.avg_rating is not None:
-            restaurant.average_rating = float(stats.avg_rating)
-            restaurant.review_count = stats.review_count
-            await db.commit()
-            logger.info(f"Updated restaurant {restaurant_id} ratings: avg={stats.avg_rating}, count={stats.review_count}")
-            
-    except Exception as e:
-        logger.error(f"Error updating restaurant ratings: {e}")
-        await db.rollback()
+        .execution_options(synchronize_session=False)
+    )
 
-async def get_restaurant_reviews(db: AsyncSession, restaurant_id: int, skip: int = 0, limit: int = 100):
-    """Получение отзывов ресторана"""
+def _expected_ratings(restaurant_ids=None):
+    """Агрегаты, пересчитанные с нуля по активным отзывам"""
+    stats = (
+        select(
+            Review.restaurant_id,
+            func.sum(Review.rating).label("rating_sum"),
+            func.count(Review.id).label("review_count"),
+        )
+        .filter(Review.is_active == True)
+        .group_by(Review.restaurant_id)
+    )
+    if restaurant_ids is not None:
+        # Условие по id ресторана само в группировку не протолкнётся - без него агрегируются все отзывы
+        stats = stats.filter(Review.restaurant_id.in_(restaurant_ids))
+    stats = stats.subquery()
+    restaurants = Restaurant.__table__.alias("r")
+    query = (
+        select(
+            restaurants.c.id,
+            restaurants.c.rating_sum,
+            restaurants.c.review_count,
+            restaurants.c.average_rating,
+            func.coalesce(stats.c.rating_sum, 0).label("expected_rating_sum"),
+            func.coalesce(stats.c.review_count, 0).label("expected_review_count"),
+        )
+        .select_from(restaurants.outerjoin(stats, stats.c.restaurant_id == restaurants.c.id))
+    )
+    if restaurant_ids is not None:
+        query = query.filter(restaurants.c.id.in_(restaurant_ids))
+    return query
+
+async def find_rating_drift(db: AsyncSession, restaurant_ids=None):
+    """Поиск ресторанов, у которых сохранённые агрегаты расходятся с отзывами"""
+    expected = _expected_ratings(restaurant_ids).subquery()
+    expected_average = _average_rating(expected.c.expected_rating_sum, expected.c.expected_review_count)
     result = await db.execute(
-        select(Review)
+        select(expected, expected_average.label("expected_average_rating"))
+        .filter(
+            or_(
+                func.coalesce(expected.c.rating_sum, -1) != expected.c.expected_rating_sum,
+                func.coalesce(expected.c.review_count, -1) != expected.c.expected_review_count,
+                func.abs(func.coalesce(expected.c.average_rating, -1.0) - expected_average) > 1e-9,
+            )
+        )
+        .order_by(expected.c.id)
+    )
+    return result.mappings().all()
+
+async def recompute_restaurant_ratings(db: AsyncSession, restaurant_ids=None):
+    """Полный пересчёт агрегатов рейтинга одним UPDATE (без коммита)"""
+    expected = _expected_ratings(restaurant_ids).subquery()
+    result = await db.execute(
+        update(Restaurant)
+        .where(Restaurant.id == expected.c.id)
+        .values(
+            rating_sum=expected.c.expected_rating_sum,
+            review_count=expected.c.expected_review_count,
+            average_rating=_average_rating(expected.c.expected_rating_sum, expected.c.expected_review_count),
+            ranking_score=ranking_score(expected.c.expected_rating_sum, expected.c.expected_review_count),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
+
+async def rebuild_ranking_scores(db: AsyncSession, after_id: int = 0, batch_size: int = 10000):
+    """Пересчёт ranking_score по сохранённым агрегатам для следующей пачки ресторанов (без коммита).
+
+    Пачка - batch_size ресторанов с id > after_id; переписываются только изменившиеся
+    строки. Возвращает (число обновлённых, последний id пачки или None, если ресторанов больше нет).
+    """
+    last_id = (await db.execute(
+        select(func.max(Restaurant.id)).filter(
+            Restaurant.id.in_(
+                select(Restaurant.id).filter(Restaurant.id > after_id).order_by(Restaurant.id).limit(batch_size)
+            )
+        )
+    )).scalar()
+    if last_id is None:
+        return 0, None
+
+    score = ranking_score(func.coalesce(Restaurant.rating_sum, 0), func.coalesce(Restaurant.review_count, 0))
+    result = await db.execute(
+        update(Restaurant)
+        .where(
+            Restaurant.id > after_id,
+            Restaurant.id <= last_id,
+            Restaurant.ranking_score.is_distinct_from(score),
+        )
+        .values(ranking_score=score)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount, last_id
+
+def _restaurant_reviews_query(columns: list, restaurant_id: int, skip: int, limit: int, cursor: str):
+    query = (
+        select(*columns)
         .filter(Review.restaurant_id == restaurant_id, Review.is_active == True)
-        .order_by(Review.created_at.desc())
-        .offset(skip)
+        .order_by(Review.created_at.desc(), Review.id.desc())
         .limit(limit)
     )
+    if cursor is not None:
+        created_at, last_id = decode_cursor(cursor, 2)
+        try:
+            created_at = datetime.fromisoformat(created_at)
+        except (TypeError, ValueError):
+            raise InvalidCursor("Invalid cursor")
+        if not isinstance(last_id, int):
+            raise InvalidCursor("Invalid cursor")
+        query = query.filter(tuple_(Review.created_at, Review.id) < tuple_(created_at, last_id))
+    else:
+        query = query.offset(skip)
+    return query
+
+async def get_restaurant_reviews(db: AsyncSession, restaurant_id: int, skip: int = 0, limit: int = 100, cursor: str = None):
+    """Получение отзывов ресторана"""
+    result = await db.execute(_restaurant_reviews_query([Review], restaurant_id, skip, limit, cursor))
     return result.scalars().all()
 
+async def get_restaurant_reviews_json(db: AsyncSession, restaurant_id: int, skip: int = 0, limit: int = 100, cursor: str = None):
+    """Страница отзывов сразу в JSON и курсор следующей страницы - без ORM-объектов и pydantic"""
+    result = await db.execute(
+        _restaurant_reviews_query(schema_columns(Review, ReviewSchema), restaurant_id, skip, limit, cursor)
+    )
+    rows = result.all()
+    return dump_rows(row._mapping for row in rows), reviews_next_cursor(rows, limit)
+
+async def get_restaurant_reviews_version(db: AsyncSession, restaurant_id: int):
+    """Валидатор списка активных отзывов ресторана для условного GET"""
+    result = await db.execute(
+        select(
+            func.count(Review.id),
+            func.max(func.coalesce(Review.updated_at, Review.created_at)),
+            func.coalesce(func.sum(Review.id), 0),
+        )
+        .filter(Review.restaurant_id == restaurant_id, Review.is_active == True)
+    )
+    return result.one()
+
+async def get_restaurant_with_reviews_version(db: AsyncSession, restaurant_id: int):
+    """Валидатор ресторана с отзывами: поля рейтинга, updated_at ресторана и агрегаты по всем его отзывам"""
+    reviews = (
+        select(
+            func.count(Review.id).label("count"),
+            func.max(func.coalesce(Review.updated_at, Review.created_at)).label("last_modified"),
+            func.coalesce(func.sum(Review.id), 0).label("id_sum"),
+        )
+        .filter(Review.restaurant_id == restaurant_id)
+        .subquery()
+    )
+    result = await db.execute(
+        select(
+            Restaurant.updated_at,
+            Restaurant.created_at,
+            Restaurant.average_rating,
+            Restaurant.review_count,
+            reviews.c.count,
+            reviews.c.last_modified,
+            reviews.c.id_sum,
+        )
+        .join(reviews, true())
+        .filter(Restaurant.id == restaurant_id)
+    )
+    return result.first()
+
+def reviews_next_cursor(reviews: list, limit: int):
+    """Курсор следующей страницы отзывов (None, если страница последняя)"""
+    if not reviews or len(reviews) < limit:
+        return None
+    last = reviews[-1]
+    return encode_cursor([last.created_at.isoformat(), last.id])
+
 async def get_restaurant_with_reviews(db: AsyncSession, restaurant_id: int):
     """Получение ресторана с отзывами"""
     from sqlalchemy.orm import selectinload
@@ -0,0 +1,217 @@
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Hashable, Optional
+
+class _LoadGenerations:
+    """Поколения ключей, для которых сейчас строится значение.
+
+    Поколение нужно только пока идёт загрузка: инвалидация ключа без загрузок в работе
+    ничего не запоминает, поэтому учёт не растёт с числом инвалидированных ключей.
+    """
+
+    def __init__(self):
+        self._loads = {}
+
+    def __len__(self):
+        return len(self._loads)
+
+    @contextmanager
+    def loading(self, key: Hashable):
+        pending = self._loads.setdefault(key, [0, 0])  # [загрузок в работе, поколение]
+        pending[0] += 1
+        try:
+            yield pending[1]
+        finally:
+            pending[0] -= 1
+            if not pending[0]:
+                del self._loads[key]
+
+    def current(self, key: Hashable) -> int:
+        pending = self._loads.get(key)
+        return pending[1] if pending else 0
+
+    def bump(self, key: Hashable):
+        pending = self._loads.get(key)
+        if pending:
+            pending[1] += 1
+
+class LRUCache:
+    """In-process LRU-кэш с ограничением по числу записей, объёму и TTL.
+
+    Поколения ключей защищают от записи устаревшего значения: значение строится внутри
+    loading(key), и если ключ за это время инвалидировали, set() с его поколением игнорируется.
+    """
+
+    def __init__(self, max_entries: int, ttl: float, max_bytes: Optional[int] = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._generations = _LoadGenerations()
+        self._bytes = 0
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+    def get(self, key: Hashable) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.stats["misses"] += 1
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            self._remove(key)
+            self.stats["misses"] += 1
+            return None
+        self._entries.move_to_end(key)
+        self.stats["hits"] += 1
+        return value
+
+    def loading(self, key: Hashable):
+        """Контекст построения значения: отдаёт поколение ключа для set()"""
+        return self._generations.loading(key)
+
+    def set(self, key: Hashable, value: Any, generation: Optional[int] = None, ttl: Optional[float] = None) -> bool:
+        if generation is not None and generation != self._generations.current(key):
+            return False
+        size = self._sizeof(value)
+        if self.max_bytes is not None and size > self.max_bytes:
+            return False
+        self._remove(key)
+        self._entries[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+        self._bytes += size
+        while len(self._entries) > self.max_entries or (
+            self.max_bytes is not None and self._bytes > self.max_bytes
+        ):
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.stats["evictions"] += 1
+        return True
+
+    def invalidate(self, key: Hashable):
+        self._generations.bump(key)
+        self._remove(key)
+        self.stats["invalidations"] += 1
+
+    def clear(self):
+        for key in list(self._entries):
+            self.invalidate(key)
+
+    def _remove(self, key: Hashable):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= self._sizeof(entry[1])
+
+    @staticmethod
+    def _sizeof(value: Any) -> int:
+        return len(value) if isinstance(value, (bytes, bytearray, str)) else 0
+
+
+class CacheBackend:
+    """Хранилище для ReadThroughCache: строковые ключи, значения - bytes.
+
+    Значения сериализуются заранее, чтобы in-process бэкенд можно было заменить
+    на общий для всех реплик (Redis, memcached) без изменения вызывающего кода.
+    """
+
+    async def get(self, key: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    async def set(self, key: str, value: bytes, ttl: float):
+        raise NotImplementedError
+
+    async def delete(self, key: str):
+        raise NotImplementedError
+
+    def stats(self) -> dict:
+        return {}
+
+class LRUCacheBackend(CacheBackend):
+    """In-process бэкенд поверх LRUCache"""
+
+    def __init__(self, max_entries: int, ttl: float, max_bytes: Optional[int] = None):
+        self._cache = LRUCache(max_entries=max_entries, ttl=ttl, max_bytes=max_bytes)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return self._cache.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: float):
+        self._cache.set(key, value, ttl=ttl)
+
+    async def delete(self, key: str):
+        self._cache.invalidate(key)
+
+    def stats(self) -> dict:
+        return {"entries": len(self._cache), "bytes": self._cache.size_bytes, "evictions": self._cache.stats["evictions"]}
+
+class LocalSharedStoreBackend(CacheBackend):
+    """Локальная замена общего хранилища: key -> bytes с TTL и без LRU, как в Redis.
+
+    Все экземпляры в процессе работают с одним словарём, как реплики с одним Redis.
+    """
+
+    _store = {}
+
+    def __init__(self):
+        self._evictions = 0
+
+    async def get(self, key: str) -> Optional[bytes]:
+        entry = self._store.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            self._store.pop(key, None)
+            self._evictions += 1
+            return None
+        return value
+
+    async def set(self, key: str, value: bytes, ttl: float):
+        self._store[key] = (time.monotonic() + ttl, value)
+
+    async def delete(self, key: str):
+        self._store.pop(key, None)
+
+    def stats(self) -> dict:
+        return {"entries": len(self._store), "evictions": self._evictions}
+
+class ReadThroughCache:
+    """Read-through кэш: значение берётся из бэкенда, при промахе строится loader'ом и записывается.
+
+    Поколения ключей (локальные для процесса, только на время загрузки) не дают записать
+    значение, построенное до инвалидации этого ключа.
+    """
+
+    def __init__(self, backend: CacheBackend, ttl: float):
+        self.backend = backend
+        self.ttl = ttl
+        self._generations = _LoadGenerations()
+        self.stats = {"hits": 0, "misses": 0, "invalidations": 0}
+
+    async def get_or_load(self, key: str, loader: Callable[[], Awaitable[Optional[bytes]]],
+                          ttl: Optional[float] = None) -> Optional[bytes]:
+        value = await self.backend.get(key)
+        if value is not None:
+            self.stats["hits"] += 1
+            return value
+        self.stats["misses"] += 1
+
+        with self._generations.loading(key) as generation:
+            value = await loader()
+            if value is not None and generation == self._generations.current(key):
+                await self.backend.set(key, value, self.ttl if ttl is None else ttl)
+        return value
+
+    async def invalidate(self, key: str):
+        self._generations.bump(key)
+        await self.backend.delete(key)
+        self.stats["invalidations"] += 1
+
+    def get_stats(self) -> dict:
+        return {**self.stats, **self.backend.stats()}
@@ -0,0 +1,50 @@
+import math
+from typing import List, Optional, Tuple
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+# Размер ячейки сетки в градусах (~5.5 км по широте). Смена значения требует
+# пересчёта restaurants.geo_cell.
+GEO_CELL_DEGREES = 0.05
+LAT_CELLS = round(180 / GEO_CELL_DEGREES)
+LON_CELLS = round(360 / GEO_CELL_DEGREES)
+
+def _lat_index(latitude: float) -> int:
+    return min(int(math.floor((latitude + 90) / GEO_CELL_DEGREES)), LAT_CELLS - 1)
+
+def _lon_index(longitude: float) -> int:
+    return int(math.floor((longitude + 180) / GEO_CELL_DEGREES)) % LON_CELLS
+
+def geo_cell(latitude: Optional[float], longitude: Optional[float]) -> Optional[int]:
+    """Номер ячейки сетки: строки по широте, внутри строки - по долготе"""
+    if latitude is None or longitude is None:
+        return None
+    return _lat_index(latitude) * LON_CELLS + _lon_index(longitude)
+
+def cell_ranges(latitude: float, longitude: float, radius_km: float) -> List[Tuple[int, int]]:
+    """Диапазоны geo_cell (включительно), покрывающие круг радиуса radius_km.
+
+    По одному диапазону на строку сетки (два - при переходе через 180-й меридиан),
+    так что отбор кандидатов - несколько range scan по B-tree индексу.
+    """
+    delta_lat = radius_km / KM_PER_DEGREE
+    first_row = _lat_index(max(latitude - delta_lat, -90.0))
+    last_row = _lat_index(min(latitude + delta_lat, 90.0))
+
+    # Долготный охват берётся по самой удалённой от экватора широте круга
+    widest_lat = min(abs(latitude) + delta_lat, 90.0)
+    cos_lat = math.cos(math.radians(widest_lat))
+    delta_lon = 180.0 if cos_lat < 1e-9 else radius_km / (KM_PER_DEGREE * cos_lat)
+
+    if delta_lon >= 180.0:
+        spans = [(0, LON_CELLS - 1)]
+    else:
+        first, last = _lon_index(longitude - delta_lon), _lon_index(longitude + delta_lon)
+        spans = [(first, last)] if first <= last else [(first, LON_CELLS - 1), (0, last)]
+
+    return [
+        (row * LON_CELLS + first, row * LON_CELLS + last)
+        for row in range(first_row, last_row + 1)
+        for first, last in spans
+    ]
@@ -0,0 +1,104 @@
+import asyncio
+import logging
+import time
+from datetime import datetime
+from sqlalchemy import text
+from src.core.config import settings
+from src.db.session import engine, get_pool_stats
+from src.utils.kafka.producer import event_producer
+from src.utils.kafka.consumer import review_consumer
+
+logger = logging.getLogger(__name__)
+
+async def _check_database(timeout: float) -> dict:
+    started = time.perf_counter()
+    try:
+        async def ping():
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+        await asyncio.wait_for(ping(), timeout)
+    except asyncio.TimeoutError:
+        return {"ok": False, "error": f"timed out after {timeout}s"}
+    except Exception as e:
+        return {"ok": False, "error": str(e)}
+    return {"ok": True, "latency_ms": round((time.perf_counter() - started) * 1000, 2)}
+
+async def _check_producer(timeout: float) -> dict:
+    try:
+        return {"ok": await event_producer.check_metadata(timeout)}
+    except asyncio.TimeoutError:
+        return {"ok": False, "error": f"metadata request timed out after {timeout}s"}
+    except Exception as e:
+        return {"ok": False, "error": str(e)}
+
+class ReadinessChecker:
+    """Проверка готовности принимать трафик.
+
+    Результат кешируется на readiness_cache_seconds, одновременные пробы ждут
+    одну проверку, так что частые запросы оркестратора не доходят до Postgres и Kafka.
+    """
+
+    def __init__(self, ttl: float):
+        self._ttl = ttl
+        self._report = None
+        self._checked_at = 0.0
+        self._lock = asyncio.Lock()
+
+    def _is_fresh(self) -> bool:
+        return self._report is not None and time.monotonic() - self._checked_at < self._ttl
+
+    async def check(self) -> dict:
+        if self._is_fresh():
+            return self._report
+        async with self._lock:
+            if not self._is_fresh():
+                self._report = await self._run_checks()
+                self._checked_at = time.monotonic()
+        return self._report
+
+    async def _run_checks(self) -> dict:
+        timeout = settings.readiness_check_timeout
+        pool = get_pool_stats()
+        capacity = pool["size"] + pool["max_overflow"]
+        checks = {
+            "db_pool": {
+                "ok": pool["checked_out"] < capacity,
+                "checked_out": pool["checked_out"],
+                "capacity": capacity,
+            }
+        }
+        if checks["db_pool"]["ok"]:
+            checks["database"] = await _check_database(timeout)
+        else:
+            # SELECT 1 всё равно встал бы в очередь пула
+            checks["database"] = {"ok": False, "error": "connection pool is saturated"}
+
+        checks["kafka_producer"] = await _check_producer(timeout)
+        checks["kafka_consumer"] = {
+            "ok": review_consumer.is_connected(),
+            "assigned_partitions": len(review_consumer.assignment()),
+        }
+        lag = review_consumer.partition_lag()
+        max_lag = max(lag.values(), default=0)
+        threshold = settings.readiness_max_consumer_lag
+        checks["consumer_lag"] = {
+            "ok": threshold is None or max_lag <= threshold,
+            "max_lag": max_lag,
+            "threshold": threshold,
+        }
+
+        gating = ["db_pool", "database", "consumer_lag"]
+        if settings.readiness_require_kafka:
+            gating += ["kafka_producer", "kafka_consumer"]
+        ready = all(checks[name]["ok"] for name in gating)
+        if not ready:
+            failed = [name for name in gating if not checks[name]["ok"]]
+            logger.warning(f"Readiness check failed: {failed}")
+
+        return {
+            "ready": ready,
+            "checks": checks,
+            "checked_at": datetime.utcnow().isoformat(),
+        }
+
+readiness = ReadinessChecker(settings.readiness_cache_seconds)
@@ -1,43 +1,136 @@
 import json
+import time
 import asyncio
 import logging
-from aiokafka import AIOKafkaConsumer
+from collections import OrderedDict, defaultdict, deque
+from aiokafka import AIOKafkaConsumer, ConsumerRebalanceListener, TopicPartition
 from src.core.config import settings
-from src.db.session import AsyncSessionLocal
-from src.services.review import create_review, update_review, delete_review
+from src.db.session import AsyncSessionLocal, engine
+from src.utils.kafka.dead_letter import PermanentEventError, dead_letter_headers, is_permanent, retry_delay
+from src.utils.kafka.offsets import PartitionOffsetTracker
+from src.utils.kafka.producer import event_producer
+from src.utils.metrics import Counter, Gauge, Histogram, registry as metrics_registry
+from src.services.review import (
+    create_review, update_review, delete_review, apply_review_events, apply_folded_review_events, fold_review_event,
+)
 
 logger = logging.getLogger(__name__)
 
+REVIEW_EVENT_KINDS = {
+    "restaurant.review_created": "created",
+    "restaurant.review_updated": "updated",
+    "restaurant.review_deleted": "deleted",
+}
+
+consumer_messages = Counter("kafka_consumer_messages_total", "Review events consumed", ("topic",))
+consumer_lag = Gauge("kafka_consumer_lag", "Messages between the partition high watermark and the consumed position", ("topic", "partition"))
+consumer_handler_latency = Histogram("kafka_consumer_handler_seconds", "Review event handler latency", ("topic",))
+consumer_batch_latency = Histogram("kafka_consumer_batch_seconds", "Latency of applying a batch of review events")
+consumer_catchup_active = Gauge("kafka_consumer_catchup_active", "1 while the consumer is in bulk catch-up mode")
+consumer_retries = Counter("kafka_consumer_retries_total", "Review event retries after transient errors", ("topic",))
+consumer_retrying_keys = Gauge("kafka_consumer_retrying_keys", "Reviews whose events are waiting for a retry")
+consumer_dead_lettered = Counter("kafka_consumer_dead_lettered_total", "Review events sent to the dead-letter topic", ("topic", "error_class"))
+
+def build_review_data(topic: str, event_data: dict) -> dict:
+    """Преобразование события Kafka в данные для сервиса отзывов"""
+    data = event_data["data"]
+    kind = REVIEW_EVENT_KINDS[topic]
+    if kind == "created":
+        return {
+            "review_id": data["review_id"],
+            "restaurant_id": data["restaurant_id"],
+            "user_id": data["user_id"],
+            "rating": data["rating"],
+            "comment": data.get("comment"),
+        }
+    if kind == "updated":
+        return {
+            "review_id": data["review_id"],
+            "new_rating": data["new_rating"],
+            "new_comment": data.get("new_comment"),
+        }
+    return {"review_id": data["review_id"]}
+
+def _take_ready(pending: dict, watermark):
+    """Префиксы партиций не новее watermark (при None - все сообщения), упорядоченные по timestamp"""
+    ready = []
+    for messages in pending.values():
+        while messages and (watermark is None or messages[0].timestamp <= watermark):
+            ready.append(messages.popleft())
+    return sorted(ready, key=lambda m: m.timestamp)
+
+class _DrainOnRevoke(ConsumerRebalanceListener):
+    """Дожидается обработки отозванных партиций и коммитит их оффсеты"""
+
+    def __init__(self, review_consumer):
+        self.review_consumer = review_consumer
+
+    async def on_partitions_revoked(self, revoked):
+        await self.review_consumer.drain_partitions(revoked)
+
+    async def on_partitions_assigned(self, assigned):
+        pass
+
 class KafkaReviewConsumer:
     def __init__(self, bootstrap_servers: str = None):
         self.bootstrap_servers = bootstrap_servers or settings.kafka_bootstrap_servers
         self.consumer = None
         self._is_connected = False
+        self._batch_mode = settings.kafka_consumer_batch_mode
+        self._workers = max(1, min(settings.kafka_consumer_workers, engine.pool.size()))
+        self._task = None
+        self._trackers = {}
+        self._review_routes = OrderedDict()
+        self._positions = {}
+        self._catchup_skip = {}
+        self._retrying = {}
+        self._retry_slots = asyncio.Semaphore(settings.kafka_consumer_max_retrying_keys)
+        self._retry_tasks = set()
+        self._uncommitted = 0
+        self._last_commit = time.monotonic()
 
     async def start(self):
         try:
             logger.info(f"Starting Kafka consumer with bootstrap servers: {self.bootstrap_servers}")
+            parallel = self._workers > 1
             self.consumer = AIOKafkaConsumer(
-                "restaurant.review_created",
-                "restaurant.review_updated", 
-                "restaurant.review_deleted",
                 bootstrap_servers=self.bootstrap_servers,
                 group_id="restaurant-service-reviews-v2",
-                enable_auto_commit=True,
+                # Оффсет коммитится только после записи в БД или отправки в DLQ
+                enable_auto_commit=False,
                 auto_offset_reset="earliest", 
             )
+            self.consumer.subscribe(list(REVIEW_EVENT_KINDS), listener=_DrainOnRevoke(self))
             await self.consumer.start()
             self._is_connected = True
             logger.info("Kafka consumer started successfully")
             
-            asyncio.create_task(self.consume_messages())
+            if parallel:
+                self._task = asyncio.create_task(self.consume_parallel())
+            elif self._batch_mode:
+                self._task = asyncio.create_task(self.consume_batches())
+            else:
+                self._task = asyncio.create_task(self.consume_messages())
             
         except Exception as e:
             logger.error(f"Failed to start Kafka consumer: {e}")
             self._is_connected = False
 
     async def stop(self):
+        # Дожидаемся отмены цикла и повторов: иначе они дошлют в DLQ уже после остановки продюсера
+        tasks = [self._task, *self._retry_tasks] if self._task else list(self._retry_tasks)
+        self._task = None
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        # Задача, отменённая до первого шага, не проходит свой finally
+        self._retrying.clear()
+        self._retry_slots = asyncio.Semaphore(settings.kafka_consumer_max_retrying_keys)
         if self.consumer and self._is_connected:
+            try:
+                await self.commit_offsets()
+            except Exception as e:
+                logger.error(f"Failed to commit offsets on stop: {e}")
             try:
                 await self.consumer.stop()
                 self._is_connected = False
@@ -48,6 +141,36 @@ class KafkaReviewConsumer:
     def is_connected(self):
         return self._is_connected
 
+    def _mark_consumed(self, tp: TopicPartition, offset: int, count: int = 1):
+        consumer_messages.inc(count, topic=tp.topic)
+        if offset + 1 > self._positions.get(tp, -1):
+            self._positions[tp] = offset + 1
+
+    def assignment(self) -> set:
+        if not self._is_connected:
+            return set()
+        return self.consumer.assignment()
+
+    def partition_lag(self, positions: dict = None) -> dict:
+        """Отставание по партициям: high watermark минус позиция последнего обработанного сообщения.
+
+        positions - позиции, перекрывающие обработанные (например, уже полученные, но не записанные).
+        """
+        lag = {}
+        for tp in self.assignment():
+            highwater = self.consumer.highwater(tp)
+            position = (positions or {}).get(tp, self._positions.get(tp))
+            if highwater is None or position is None:
+                continue
+            lag[tp] = max(highwater - position, 0)
+        return lag
+
+    def collect_lag_metrics(self):
+        consumer_lag.clear()
+        for tp, lag in self.partition_lag().items():
+            consumer_lag.set(lag, topic=tp.topic, partition=tp.partition)
+        consumer_retrying_keys.set(len(self._retrying))
+
     async def consume_messages(self):
         """Основной цикл обработки сообщений"""
         logger.info("Starting to consume messages from Kafka...")
@@ -55,19 +178,431 @@ class KafkaReviewConsumer:
             async for msg in self.consumer:
                 try:
                     logger.info(f"Received message: topic={msg.topic}, partition={msg.partition}, offset={msg.offset}")
-                    event_data = json.loads(msg.value.decode('utf-8'))
-                    logger.info(f"Parsed event: {event_data['event_type']}")
-                    await self.handle_event(msg.topic, event_data)
-                    
+                    tp = TopicPartition(msg.topic, msg.partition)
+                    self._trackers.setdefault(tp, PartitionOffsetTracker()).add(msg.offset)
+                    await self.process_message(tp, msg)
+                    await self.maybe_commit_offsets()
+                    if self._should_catch_up():
+                        await self._settle()
+                        await self.catch_up()
+                except asyncio.CancelledError:
+                    raise
                 except Exception as e:
                     logger.error(f"Error processing message: {e}")
-                    
+
         except Exception as e:
             logger.error(f"Error in consume loop: {e}")
 
+    async def consume_batches(self):
+        """Пакетный цикл: одна сессия и одна транзакция на пачку, оффсеты коммитятся после записи в БД"""
+        logger.info("Starting to consume messages from Kafka in batch mode...")
+        while True:
+            try:
+                if self._should_catch_up():
+                    await self._settle()
+                    await self.catch_up()
+                batches = await self.consumer.getmany(
+                    timeout_ms=settings.kafka_consumer_batch_max_wait_ms,
+                    max_records=settings.kafka_consumer_batch_size,
+                )
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error in batch consume loop: {e}")
+                await asyncio.sleep(1)
+                continue
+            if not batches:
+                continue
+            try:
+                started = time.perf_counter()
+                for tp, messages in batches.items():
+                    tracker = self._trackers.setdefault(tp, PartitionOffsetTracker())
+                    for msg in messages:
+                        tracker.add(msg.offset)
+                await self.handle_batch([msg for messages in batches.values() for msg in messages])
+                await self.commit_offsets()
+                consumer_batch_latency.observe(time.perf_counter() - started)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error processing batch, rewinding to its start: {e}")
+                for tp, messages in batches.items():
+                    self._trackers.pop(tp, None)
+                    self.consumer.seek(tp, messages[0].offset)
+                await asyncio.sleep(1)
+
+    async def handle_batch(self, messages: list):
+        """Обработка пачки сообщений одной транзакцией; при ошибке - по одному, с повторами и DLQ"""
+        events = []
+        for msg in sorted(messages, key=lambda m: m.timestamp):
+            tp = TopicPartition(msg.topic, msg.partition)
+            try:
+                event_data = self._parse(msg)
+            except PermanentEventError as e:
+                await self._dead_letter(tp, msg, e, 1)
+                continue
+            if event_data["data"]["review_id"] in self._retrying:
+                # Отзыв ждёт повтора: его события встают в очередь за ним, а не в общую транзакцию
+                await self.process_message(tp, msg, event_data)
+                continue
+            events.append((tp, msg, event_data))
+        if not events:
+            return
+
+        async with AsyncSessionLocal() as db:
+            try:
+                review_events = [
+                    (REVIEW_EVENT_KINDS[msg.topic], build_review_data(msg.topic, event_data))
+                    for _, msg, event_data in events
+                ]
+                stats = await apply_review_events(db, review_events)
+                await db.commit()
+                logger.info(f"Applied batch of {len(events)} review events: {stats}")
+                for tp, msg, _ in events:
+                    self._finish(tp, msg)
+                return
+            except Exception as e:
+                await db.rollback()
+                logger.error(f"Batch of {len(events)} review events failed, falling back to per-event processing: {e}")
+
+        for tp, msg, event_data in events:
+            await self.process_message(tp, msg, event_data)
+
+    async def consume_parallel(self):
+        """Параллельный цикл: события одного ресторана обрабатываются по порядку, разных - конкурентно"""
+        logger.info(f"Starting to consume messages from Kafka with {self._workers} workers...")
+        queues = [asyncio.Queue(maxsize=settings.kafka_consumer_worker_queue_size) for _ in range(self._workers)]
+        workers = [asyncio.create_task(self._worker(queue)) for queue in queues]
+        try:
+            while True:
+                try:
+                    batches = await self.consumer.getmany(
+                        timeout_ms=settings.kafka_consumer_batch_max_wait_ms,
+                        max_records=settings.kafka_consumer_batch_size,
+                    )
+                    await self._dispatch(batches, queues)
+                    await self.commit_offsets()
+                    if self._should_catch_up():
+                        for queue in queues:
+                            await queue.join()
+                        await self._settle()
+                        await self.catch_up()
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.error(f"Error in parallel consume loop: {e}")
+                    await asyncio.sleep(1)
+        finally:
+            for worker in workers:
+                worker.cancel()
+
+    async def _dispatch(self, batches: dict, queues: list):
+        """Раздача опроса по очередям воркеров в порядке timestamp, как в handle_batch.
+
+        Создание, изменение и удаление отзыва приходят из разных топиков: без слияния по времени
+        изменение могло уйти воркеру раньше создания (и в другую очередь - ресторан ещё неизвестен).
+        """
+        for tp, messages in batches.items():
+            tracker = self._trackers.setdefault(tp, PartitionOffsetTracker())
+            for msg in messages:
+                tracker.add(msg.offset)
+        for msg in sorted((msg for messages in batches.values() for msg in messages), key=lambda m: m.timestamp):
+            tp = TopicPartition(msg.topic, msg.partition)
+            try:
+                event_data = self._parse(msg)
+            except PermanentEventError as e:
+                await self._dead_letter(tp, msg, e, 1)
+                continue
+            key = self._routing_key(msg.topic, event_data)
+            await queues[hash(key) % len(queues)].put((tp, msg, event_data))
+
+    def _should_catch_up(self) -> bool:
+        """Суммарное отставание выше порога, и сорвавшееся догоняющее окно уже перечитано обычным путём"""
+        threshold = settings.kafka_consumer_catchup_lag_threshold
+        if threshold is None:
+            return False
+        assigned = self.assignment()
+        if any(tp in assigned and self._positions.get(tp, -1) < offset for tp, offset in self._catchup_skip.items()):
+            return False
+        self._catchup_skip.clear()
+        return sum(self.partition_lag().values()) > threshold
+
+    async def catch_up(self):
+        """Догоняющий режим: события сворачиваются по review_id в памяти и пишутся пачками.
+
+        События разных топиков сливаются по timestamp: сворачиваются только сообщения не новее
+        последнего полученного в каждой ещё отстающей партиции. Пачка пишется одной транзакцией
+        с пересчётом агрегатов затронутых ресторанов, после неё коммитятся оффсеты. Если запись
+        не удалась, окно перечитывается обычным путём. Выход - когда отставание не больше
+        kafka_consumer_catchup_exit_lag.
+        """
+        logger.info(f"Consumer lag {sum(self.partition_lag().values())} exceeds threshold, switching to catch-up mode")
+        consumer_catchup_active.set(1)
+        pending = defaultdict(deque)
+        fetched, last_timestamp, window_start = {}, {}, {}
+        folded, folded_offsets, consumed, events = {}, {}, defaultdict(int), 0
+        try:
+            while True:
+                try:
+                    batches = await self.consumer.getmany(
+                        timeout_ms=settings.kafka_consumer_batch_max_wait_ms,
+                        max_records=settings.kafka_consumer_catchup_fetch_size,
+                    )
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.error(f"Error in catch-up consume loop: {e}")
+                    await asyncio.sleep(1)
+                    continue
+                for tp, messages in batches.items():
+                    window_start.setdefault(tp, messages[0].offset)
+                    pending[tp].extend(messages)
+                    fetched[tp] = messages[-1].offset + 1
+                    last_timestamp[tp] = messages[-1].timestamp
+                    events += len(messages)
+
+                lag = self.partition_lag(fetched)
+                caught_up = sum(lag.values()) <= settings.kafka_consumer_catchup_exit_lag
+                flush = caught_up or events >= settings.kafka_consumer_catchup_flush_events
+                watermark = None if flush else min(
+                    (last_timestamp.get(tp, -1) for tp, value in lag.items() if value > 0), default=None
+                )
+                for msg in _take_ready(pending, watermark):
+                    tp = TopicPartition(msg.topic, msg.partition)
+                    folded_offsets[tp] = max(folded_offsets.get(tp, 0), msg.offset + 1)
+                    consumed[tp] += 1
+                    try:
+                        event_data = self._parse(msg)
+                    except PermanentEventError as e:
+                        await self._send_to_dead_letter(msg, e, 1)
+                        continue
+                    fold_review_event(folded, REVIEW_EVENT_KINDS[msg.topic], build_review_data(msg.topic, event_data))
+
+                if flush and events:
+                    if not await self._flush_catch_up(folded, folded_offsets):
+                        assigned = self.assignment()
+                        for tp, offset in window_start.items():
+                            if tp in assigned:
+                                self.consumer.seek(tp, offset)
+                        self._catchup_skip = dict(fetched)
+                        await asyncio.sleep(1)
+                        return
+                    for tp, offset in folded_offsets.items():
+                        self._mark_consumed(tp, offset - 1, consumed[tp])
+                    folded, folded_offsets, consumed, window_start, events = {}, {}, defaultdict(int), {}, 0
+                if caught_up:
+                    logger.info("Consumer caught up, switching back to streaming mode")
+                    return
+        finally:
+            consumer_catchup_active.set(0)
+
+    async def _settle(self):
+        """Перед догоняющим режимом: дождаться повторов и закоммитить обработанное.
+
+        Догоняющий режим коммитит оффсеты сам, старые трекеры откатили бы их назад.
+        """
+        for tracker in list(self._trackers.values()):
+            await tracker.wait_idle()
+        await self.commit_offsets()
+        self._trackers.clear()
+
+    async def _flush_catch_up(self, folded: dict, offsets: dict) -> bool:
+        started = time.perf_counter()
+        async with AsyncSessionLocal() as db:
+            try:
+                stats = await apply_folded_review_events(db, folded, recompute=True)
+                await db.commit()
+            except Exception as e:
+                await db.rollback()
+                logger.error(f"Catch-up write of {len(folded)} reviews failed, re-reading the window through the regular path: {e}")
+                return False
+        consumer_batch_latency.observe(time.perf_counter() - started)
+        logger.info(f"Catch-up applied {len(folded)} reviews: {stats}")
+        await self._commit(offsets)
+        return True
+
+    async def _commit(self, offsets: dict):
+        """Коммит оффсетов ещё назначенных партиций; ошибка коммита не прерывает цикл"""
+        assigned = self.assignment()
+        offsets = {tp: offset for tp, offset in offsets.items() if tp in assigned}
+        if not offsets:
+            return
+        try:
+            await self.consumer.commit(offsets)
+        except Exception as e:
+            logger.error(f"Failed to commit offsets: {e}")
+
+    def _routing_key(self, topic: str, event_data: dict):
+        """Ключ шардирования: restaurant_id, для событий без него - ресторан из ранее увиденного создания отзыва"""
+        data = event_data["data"]
+        review_id = data["review_id"]
+        restaurant_id = data.get("restaurant_id")
+        if restaurant_id is None:
+            restaurant_id = self._review_routes.get(review_id)
+        if restaurant_id is None:
+            return review_id
+        if REVIEW_EVENT_KINDS.get(topic) == "created":
+            self._review_routes[review_id] = restaurant_id
+            self._review_routes.move_to_end(review_id)
+            if len(self._review_routes) > 100_000:
+                self._review_routes.popitem(last=False)
+        return restaurant_id
+
+    async def _worker(self, queue: asyncio.Queue):
+        while True:
+            tp, msg, event_data = await queue.get()
+            try:
+                await self.process_message(tp, msg, event_data)
+            except Exception as e:
+                logger.error(f"Error processing message: topic={msg.topic}, partition={msg.partition}, offset={msg.offset}: {e}")
+            finally:
+                queue.task_done()
+
+    def _parse(self, msg) -> dict:
+        """Разбор сообщения; битый payload - постоянная ошибка"""
+        try:
+            event_data = json.loads(msg.value.decode('utf-8'))
+            build_review_data(msg.topic, event_data)
+        except Exception as e:
+            raise PermanentEventError(f"Malformed {msg.topic} event: {e!r}") from e
+        return event_data
+
+    def _finish(self, tp: TopicPartition, msg):
+        """Сообщение обработано или отправлено в DLQ - его оффсет можно коммитить"""
+        tracker = self._trackers.get(tp)
+        if tracker:
+            tracker.done(msg.offset)
+        self._mark_consumed(tp, msg.offset)
+
+    async def process_message(self, tp: TopicPartition, msg, event_data: dict = None):
+        """Обработка сообщения с классификацией ошибок.
+
+        Постоянная ошибка - сразу в DLQ. Временная - повтор в фоне с экспоненциальной задержкой,
+        пока следующие события того же отзыва ждут в его очереди, а остальные обрабатываются дальше.
+        """
+        if event_data is None:
+            try:
+                event_data = self._parse(msg)
+            except PermanentEventError as e:
+                await self._dead_letter(tp, msg, e, 1)
+                return
+        review_id = event_data["data"]["review_id"]
+        if review_id in self._retrying:
+            self._retrying[review_id].append((tp, msg, event_data))
+            return
+
+        error = await self._try_handle(msg.topic, event_data)
+        if error is None:
+            self._finish(tp, msg)
+        elif is_permanent(error):
+            await self._dead_letter(tp, msg, error, 1)
+        else:
+            # Ограничение числа отзывов в повторах - иначе при недоступной БД копились бы все события
+            await self._retry_slots.acquire()
+            self._retrying[review_id] = deque([(tp, msg, event_data)])
+            task = asyncio.create_task(self._retry(review_id, error))
+            self._retry_tasks.add(task)
+            task.add_done_callback(self._retry_tasks.discard)
+
+    async def _try_handle(self, topic: str, event_data: dict):
+        """Ошибка обработки события или None"""
+        try:
+            await self.handle_event(topic, event_data)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            return e
+        return None
+
+    async def _retry(self, review_id: str, error: BaseException):
+        """Повторы для очереди событий отзыва: голова повторяется до успеха, постоянной ошибки или исчерпания попыток"""
+        queue = self._retrying[review_id]
+        try:
+            while queue:
+                tp, msg, event_data = queue[0]
+                attempts = 1
+                while error is not None and not is_permanent(error) and attempts < settings.kafka_consumer_max_attempts:
+                    logger.warning(f"Retrying {msg.topic} event for review {review_id} after attempt {attempts}: {error!r}")
+                    consumer_retries.inc(topic=msg.topic)
+                    await asyncio.sleep(retry_delay(attempts))
+                    attempts += 1
+                    error = await self._try_handle(msg.topic, event_data)
+                if error is None:
+                    self._finish(tp, msg)
+                else:
+                    await self._dead_letter(tp, msg, error, attempts)
+                queue.popleft()
+                if queue:
+                    error = await self._try_handle(queue[0][1].topic, queue[0][2])
+        finally:
+            self._retrying.pop(review_id, None)
+            self._retry_slots.release()
+
+    async def _send_to_dead_letter(self, msg, error: BaseException, attempts: int):
+        """Отправка исходного сообщения в DLQ; при недоступной Kafka - до успеха, чтобы событие не потерялось"""
+        headers = dead_letter_headers(msg, error, attempts)
+        error_class = "permanent" if is_permanent(error) else "retries_exhausted"
+        logger.error(
+            f"Sending message to {settings.kafka_dead_letter_topic} ({error_class}, {attempts} attempts): "
+            f"topic={msg.topic}, partition={msg.partition}, offset={msg.offset}: {error!r}"
+        )
+        failures = 0
+        while True:
+            try:
+                await event_producer.send_raw([(settings.kafka_dead_letter_topic, msg.value, msg.key, headers)])
+                break
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                failures += 1
+                logger.error(f"Failed to send message to {settings.kafka_dead_letter_topic}, retrying: {e}")
+                await asyncio.sleep(retry_delay(failures))
+        consumer_dead_lettered.inc(topic=msg.topic, error_class=error_class)
+
+    async def _dead_letter(self, tp: TopicPartition, msg, error: BaseException, attempts: int):
+        await self._send_to_dead_letter(msg, error, attempts)
+        self._finish(tp, msg)
+
+    async def maybe_commit_offsets(self):
+        """Коммит раз в kafka_consumer_commit_every событий или kafka_consumer_commit_interval_ms"""
+        self._uncommitted += 1
+        elapsed_ms = (time.monotonic() - self._last_commit) * 1000
+        if self._uncommitted >= settings.kafka_consumer_commit_every or elapsed_ms >= settings.kafka_consumer_commit_interval_ms:
+            await self.commit_offsets()
+
+    async def commit_offsets(self, partitions=None):
+        """Коммит оффсетов, до которых все события уже обработаны"""
+        offsets = {}
+        for tp, tracker in self._trackers.items():
+            if partitions is not None and tp not in partitions:
+                continue
+            offset = tracker.committable()
+            if offset is not None:
+                offsets[tp] = offset
+        if offsets:
+            await self.consumer.commit(offsets)
+            for tp, offset in offsets.items():
+                self._trackers[tp].mark_committed(offset)
+        if partitions is None:
+            self._uncommitted = 0
+            self._last_commit = time.monotonic()
+
+    async def drain_partitions(self, partitions):
+        """Ожидание обработки уже полученных событий отозванных партиций"""
+        revoked = [tp for tp in partitions if tp in self._trackers]
+        for tp in revoked:
+            await self._trackers[tp].wait_idle()
+        try:
+            await self.commit_offsets(set(revoked))
+        except Exception as e:
+            logger.error(f"Failed to commit offsets for revoked partitions: {e}")
+        for tp in revoked:
+            self._trackers.pop(tp, None)
+
     async def handle_event(self, topic: str, event_data: dict):
-        """Обработка события в зависимости от топика"""
+        """Обработка события в зависимости от топика; ошибки пробрасываются для классификации"""
         logger.info(f"Handling event from topic: {topic}")
+        started = time.perf_counter()
         async with AsyncSessionLocal() as db:
             try:
                 if topic == "restaurant.review_created":
@@ -76,21 +611,13 @@ class KafkaReviewConsumer:
                     await self.handle_review_updated(db, event_data)
                 elif topic == "restaurant.review_deleted":
                     await self.handle_review_deleted(db, event_data)
-                    
-            except Exception as e:
-                logger.error(f"Error handling event from topic {topic}: {e}")
-                await db.rollback()
+            finally:
+                consumer_handler_latency.observe(time.perf_counter() - started, topic=topic)
 
     async def handle_review_created(self, db, event_data: dict):
         """Обработка создания отзыва"""
         logger.info(f"Creating review: {event_data['data']['review_id']}")
-        review_data = {
-            "review_id": event_data["data"]["review_id"],
-            "restaurant_id": event_data["data"]["restaurant_id"],
-            "user_id": event_data["data"]["user_id"],
-            "rating": event_data["data"]["rating"],
-            "comment": event_data["data"].get("comment"),
-        }
+        review_data = build_review_data("restaurant.review_created", event_data)
         result = await create_review(db, review_data)
         if result:
             logger.info(f"Successfully created review: {event_data['data']['review_id']}")
@@ -100,11 +627,7 @@ class KafkaReviewConsumer:
     async def handle_review_updated(self, db, event_data: dict):
         """Обработка обновления отзыва"""
         logger.info(f"Updating review: {event_data['data']['review_id']}")
-        review_data = {
-            "review_id": event_data["data"]["review_id"],
-            "new_rating": event_data["data"]["new_rating"],
-            "new_comment": event_data["data"].get("new_comment"),
-        }
+        review_data = build_review_data("restaurant.review_updated", event_data)
         result = await update_review(db, review_data)
         if result:
             logger.info(f"Successfully updated review: {event_data['data']['review_id']}")
@@ -114,13 +637,12 @@ class KafkaReviewConsumer:
     async def handle_review_deleted(self, db, event_data: dict):
         """Обработка удаления отзыва"""
         logger.info(f"Deleting review: {event_data['data']['review_id']}")
-        review_data = {
-            "review_id": event_data["data"]["review_id"],
-        }
+        review_data = build_review_data("restaurant.review_deleted", event_data)
         result = await delete_review(db, review_data)
         if result:
             logger.info(f"Successfully deleted review: {event_data['data']['review_id']}")
         else:
             logger.error(f"Failed to delete review: {event_data['data']['review_id']}")
 
-review_consumer = KafkaReviewConsumer()
\ No newline at end of file
+review_consumer = KafkaReviewConsumer()
+metrics_registry.add_collector(review_consumer.collect_lag_metrics)
\ No newline at end of file
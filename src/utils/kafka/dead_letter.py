@@ -0,0 +1,65 @@
+import random
+from datetime import datetime
+from sqlalchemy.exc import DBAPIError
+from src.core.config import settings
+
+# Префикс служебных заголовков DLQ; остальные заголовки - исходные заголовки события
+DLQ_HEADER_PREFIX = "dlq-"
+REPLAYS_HEADER = "dlq-replays"
+
+# SQLSTATE, при которых повтор не поможет: классы 22 (данные) и 23 (ограничения, кроме unique -
+# это гонка двух созданий одного отзыва, повтор увидит уже существующий отзыв)
+_PERMANENT_SQLSTATE_CLASSES = ("22", "23")
+_RETRYABLE_SQLSTATES = {"23505"}
+
+class PermanentEventError(Exception):
+    """Событие нельзя обработать ни при каком повторе (битый payload, несуществующий ресторан и т.п.)"""
+
+def _sqlstate(error: DBAPIError):
+    return getattr(error.orig, "sqlstate", None) or getattr(error.orig, "pgcode", None)
+
+def is_permanent(error: BaseException) -> bool:
+    """Постоянная ошибка - сразу в DLQ; временная (соединение, таймаут, блокировки) - повтор"""
+    if isinstance(error, PermanentEventError):
+        return True
+    if isinstance(error, DBAPIError):
+        if error.connection_invalidated:
+            return False
+        sqlstate = _sqlstate(error) or ""
+        return sqlstate[:2] in _PERMANENT_SQLSTATE_CLASSES and sqlstate not in _RETRYABLE_SQLSTATES
+    # Разбор payload: json.loads, отсутствующие поля, неизвестный топик
+    return isinstance(error, (KeyError, TypeError, ValueError))
+
+def retry_delay(attempt: int) -> float:
+    """Экспоненциальная задержка с полным джиттером перед попыткой attempt + 1"""
+    cap = min(settings.kafka_consumer_retry_max_delay, settings.kafka_consumer_retry_base_delay * 2 ** (attempt - 1))
+    return random.uniform(0, cap)
+
+def dead_letter_headers(msg, error: BaseException, attempts: int) -> list:
+    """Исходные заголовки сообщения и метаданные ошибки для записи в DLQ"""
+    metadata = {
+        "original-topic": msg.topic,
+        "original-partition": str(msg.partition),
+        "original-offset": str(msg.offset),
+        "original-timestamp": str(msg.timestamp),
+        "error-class": "permanent" if is_permanent(error) else "retries_exhausted",
+        "error-type": type(error).__name__,
+        "error-message": str(error)[:1000],
+        "attempts": str(attempts),
+        "failed-at": datetime.utcnow().isoformat(),
+    }
+    headers = [(key, value) for key, value in (msg.headers or ()) if not key.startswith(DLQ_HEADER_PREFIX) or key == REPLAYS_HEADER]
+    return headers + [(DLQ_HEADER_PREFIX + key, value.encode("utf-8")) for key, value in metadata.items()]
+
+def header(headers, name: str):
+    """Значение заголовка как строка (None, если заголовка нет)"""
+    for key, value in headers or ():
+        if key == name:
+            return value.decode("utf-8") if value is not None else None
+    return None
+
+def replay_headers(headers) -> list:
+    """Заголовки для переотправки из DLQ: исходные заголовки события и счётчик переотправок"""
+    replays = int(header(headers, REPLAYS_HEADER) or 0) + 1
+    kept = [(key, value) for key, value in headers or () if not key.startswith(DLQ_HEADER_PREFIX)]
+    return kept + [(REPLAYS_HEADER, str(replays).encode("utf-8"))]
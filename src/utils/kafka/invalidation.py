@@ -0,0 +1,68 @@
+import json
+import asyncio
+import logging
+from aiokafka import AIOKafkaConsumer
+from src.core.config import settings
+from src.utils.kafka.producer import EventType
+from src.services.restaurant import MENU_SCOPE, invalidate_restaurant_menu, invalidate_restaurants
+
+logger = logging.getLogger(__name__)
+
+class CacheInvalidationSubscriber:
+    """Получение событий инвалидации кэша ресторанов каждой репликой.
+
+    Консьюмер без group_id: каждая реплика читает все сообщения топика, начиная
+    с текущего конца, и оффсеты не коммитит - пропущенное за время простоя
+    покрывается TTL кэша.
+    """
+
+    def __init__(self, bootstrap_servers: str = None):
+        self.bootstrap_servers = bootstrap_servers or settings.kafka_bootstrap_servers
+        self.consumer = None
+        self._task = None
+        self.stats = {"received": 0, "invalidated": 0, "failed": 0}
+
+    async def start(self):
+        try:
+            self.consumer = AIOKafkaConsumer(
+                EventType.RESTAURANT_CACHE_INVALIDATED.value,
+                bootstrap_servers=self.bootstrap_servers,
+                group_id=None,
+                enable_auto_commit=False,
+                auto_offset_reset="latest",
+            )
+            await self.consumer.start()
+            self._task = asyncio.create_task(self._run())
+            logger.info("Cache invalidation subscriber started")
+        except Exception as e:
+            logger.error(f"Failed to start cache invalidation subscriber: {e}")
+            self.consumer = None
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        if self.consumer:
+            try:
+                await self.consumer.stop()
+            except Exception as e:
+                logger.error(f"Error stopping cache invalidation subscriber: {e}")
+            self.consumer = None
+
+    async def _run(self):
+        async for msg in self.consumer:
+            self.stats["received"] += 1
+            try:
+                event_data = json.loads(msg.value.decode('utf-8'))
+                restaurant_ids = event_data["data"]["restaurant_ids"]
+                if event_data["data"].get("scope") == MENU_SCOPE:
+                    for restaurant_id in restaurant_ids:
+                        invalidate_restaurant_menu(restaurant_id)
+                else:
+                    await invalidate_restaurants(restaurant_ids)
+                self.stats["invalidated"] += len(restaurant_ids)
+            except Exception as e:
+                self.stats["failed"] += 1
+                logger.error(f"Failed to apply cache invalidation at offset {msg.offset}: {e}")
+
+cache_invalidation_subscriber = CacheInvalidationSubscriber()
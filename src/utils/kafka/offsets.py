@@ -0,0 +1,37 @@
+import asyncio
+from typing import Optional
+
+class PartitionOffsetTracker:
+    """Учёт обработанных оффсетов партиции: коммитится только непрерывно обработанный префикс"""
+
+    def __init__(self):
+        self._pending = set()
+        self._next_offset = None
+        self._committed = None
+        self._idle = asyncio.Event()
+        self._idle.set()
+
+    def add(self, offset: int):
+        self._pending.add(offset)
+        self._next_offset = offset + 1
+        self._idle.clear()
+
+    def done(self, offset: int):
+        self._pending.discard(offset)
+        if not self._pending:
+            self._idle.set()
+
+    def committable(self) -> Optional[int]:
+        """Оффсет для коммита, если он продвинулся с прошлого коммита"""
+        if self._next_offset is None:
+            return None
+        offset = min(self._pending) if self._pending else self._next_offset
+        if offset == self._committed:
+            return None
+        return offset
+
+    def mark_committed(self, offset: int):
+        self._committed = offset
+
+    async def wait_idle(self):
+        await self._idle.wait()
@@ -0,0 +1,96 @@
+import asyncio
+import logging
+import time
+from sqlalchemy import delete, func
+from sqlalchemy.future import select
+from src.core.config import settings
+from src.db.models.outbox import OutboxEvent
+from src.db.session import AsyncSessionLocal
+from src.utils.kafka.producer import event_producer
+
+logger = logging.getLogger(__name__)
+
+class OutboxRelay:
+    """Фоновая доставка событий из таблицы outbox в Kafka (at-least-once)"""
+
+    def __init__(self, batch_size: int = None, poll_interval: float = None):
+        self.batch_size = batch_size or settings.outbox_relay_batch_size
+        self.poll_interval = poll_interval or settings.outbox_relay_poll_interval
+        self._task = None
+        self._wakeup = asyncio.Event()
+        self.stats = {
+            "relayed": 0,
+            "batches": 0,
+            "failures": 0,
+            "last_batch_size": 0,
+            "last_batch_seconds": 0.0,
+            "last_batch_rate": 0.0,
+        }
+
+    async def start(self):
+        self._task = asyncio.create_task(self._run())
+        logger.info("Outbox relay started")
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+            logger.info("Outbox relay stopped")
+
+    def notify(self):
+        """Разбудить relay после коммита транзакции с новыми событиями"""
+        self._wakeup.set()
+
+    async def backlog(self) -> int:
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(select(func.count()).select_from(OutboxEvent))
+            return result.scalar_one()
+
+    async def _run(self):
+        while True:
+            self._wakeup.clear()
+            try:
+                relayed = await self.relay_batch()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.stats["failures"] += 1
+                logger.error(f"Outbox relay batch failed: {e}")
+                relayed = 0
+            if relayed < self.batch_size:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def relay_batch(self) -> int:
+        """Отправка одной пачки событий: SELECT ... FOR UPDATE SKIP LOCKED, отправка, удаление"""
+        started = time.monotonic()
+        async with AsyncSessionLocal() as db:
+            async with db.begin():
+                result = await db.execute(
+                    select(OutboxEvent.id, OutboxEvent.topic, OutboxEvent.key, OutboxEvent.payload)
+                    .order_by(OutboxEvent.id)
+                    .limit(self.batch_size)
+                    .with_for_update(skip_locked=True)
+                )
+                rows = result.all()
+                if not rows:
+                    return 0
+
+                await event_producer.send_batch([(row.topic, row.payload, row.key) for row in rows])
+                await db.execute(
+                    delete(OutboxEvent)
+                    .where(OutboxEvent.id.in_([row.id for row in rows]))
+                    .execution_options(synchronize_session=False)
+                )
+
+        elapsed = time.monotonic() - started
+        self.stats["relayed"] += len(rows)
+        self.stats["batches"] += 1
+        self.stats["last_batch_size"] = len(rows)
+        self.stats["last_batch_seconds"] = elapsed
+        self.stats["last_batch_rate"] = len(rows) / elapsed if elapsed else 0.0
+        return len(rows)
+
+outbox_relay = OutboxRelay()
@@ -1,122 +1,179 @@
 import json
 import uuid
+import time
+import asyncio
 from datetime import datetime
+from enum import Enum
+from functools import partial
+from typing import Callable, Optional
 from aiokafka import AIOKafkaProducer
+from src.core.config import settings
+from src.utils.metrics import Counter, Histogram
 import logging
 
 logger = logging.getLogger(__name__)
 
+class EventType(str, Enum):
+    DISH_CREATED = "dish.created"
+    DISH_UPDATED = "dish.updated"
+    DISH_AVAILABILITY_CHANGED = "dish.availability_changed"
+    DISH_AVAILABILITY_BATCH_CHANGED = "dish.availability_batch_changed"
+    DISH_DELETED = "dish.deleted"
+    RESTAURANT_CREATED = "restaurant.created"
+    RESTAURANT_CACHE_INVALIDATED = "restaurant.cache_invalidated"
+
+def build_event(event_type: EventType, data: dict) -> dict:
+    """Формирование конверта доменного события"""
+    return {
+        "event_id": str(uuid.uuid4()),
+        "event_type": event_type.value,
+        "timestamp": datetime.utcnow().isoformat(),
+        "source_service": "restaurant-service",
+        "data": data
+    }
+
+producer_send_latency = Histogram(
+    "kafka_producer_send_seconds", "Time from publish to broker acknowledgement", ("topic",)
+)
+producer_sent = Counter("kafka_producer_sent_total", "Events acknowledged by the broker", ("topic",))
+producer_failures = Counter("kafka_producer_failures_total", "Events that failed to be delivered", ("topic",))
+
+FailureCallback = Callable[[str, dict, BaseException], None]
+
 class KafkaEventProducer:
-    def __init__(self, bootstrap_servers: str = "localhost:9092"):
-        self.bootstrap_servers = bootstrap_servers
+    def __init__(self, bootstrap_servers: str = None):
+        self.bootstrap_servers = bootstrap_servers or settings.kafka_bootstrap_servers
         self.producer = None
+        self._is_connected = False
+        self._async_mode = settings.kafka_producer_async_mode
+        self._queue = None
+        self._flusher = None
+        self._failure_callbacks = []
+        self.stats = {"published": 0, "sent": 0, "failed": 0}
 
     async def start(self):
         self.producer = AIOKafkaProducer(
-            bootstrap_servers=self.bootstrap_servers
+            bootstrap_servers=self.bootstrap_servers,
+            linger_ms=settings.kafka_producer_linger_ms,
+            max_batch_size=settings.kafka_producer_max_batch_size,
+            compression_type=settings.kafka_producer_compression_type,
         )
         await self.producer.start()
+        self._is_connected = True
+
+        if self._async_mode:
+            self._queue = asyncio.Queue(maxsize=settings.kafka_producer_queue_size)
+            self._flusher = asyncio.create_task(self._flush_loop())
 
     async def stop(self):
+        if self._flusher:
+            try:
+                await asyncio.wait_for(self._queue.join(), timeout=settings.kafka_producer_drain_timeout)
+            except asyncio.TimeoutError:
+                logger.error(f"Producer drain timed out, {self._queue.qsize()} events not sent")
+            self._flusher.cancel()
+            self._flusher = None
         if self.producer:
             await self.producer.stop()
+            self._is_connected = False
 
     def is_connected(self):
-        return self.is_connected and self.producer is not None
-
-    async def send_dish_created(self, dish_data: dict):
-        """Отправка события создания блюда"""
-        event = {
-            "event_id": str(uuid.uuid4()),
-            "event_type": "dish.created",
-            "timestamp": datetime.utcnow().isoformat(),
-            "source_service": "restaurant-service",
-            "data": dish_data
-        }
-        
-        try:
-            await self.producer.send_and_wait(
-                "dish.created",
-                json.dumps(event).encode('utf-8')
-            )
-            logger.info(f"Dish created event sent: {dish_data['dish_id']}")
-        except Exception as e:
-            logger.error(f"Failed to send dish created event: {e}")
-
-    async def send_dish_updated(self, dish_data: dict):
-        """Отправка события обновления блюда"""
-        event = {
-            "event_id": str(uuid.uuid4()),
-            "event_type": "dish.updated",
-            "timestamp": datetime.utcnow().isoformat(),
-            "source_service": "restaurant-service",
-            "data": dish_data
-        }
-        
-        try:
-            await self.producer.send_and_wait(
-                "dish.updated",
-                json.dumps(event).encode('utf-8')
-            )
-            logger.info(f"Dish updated event sent: {dish_data['dish_id']}")
-        except Exception as e:
-            logger.error(f"Failed to send dish updated event: {e}")
-
-    async def send_dish_availability_changed(self, dish_data: dict):
-        """Отправка события изменения доступности блюда"""
-        event = {
-            "event_id": str(uuid.uuid4()),
-            "event_type": "dish.availability_changed",
-            "timestamp": datetime.utcnow().isoformat(),
-            "source_service": "restaurant-service",
-            "data": dish_data
-        }
-        
-        try:
-            await self.producer.send_and_wait(
-                "dish.availability_changed",
-                json.dumps(event).encode('utf-8')
-            )
-            logger.info(f"Dish availability changed event sent: {dish_data['dish_id']}")
-        except Exception as e:
-            logger.error(f"Failed to send dish availability changed event: {e}")
-
-    async def send_restaurant_created(self, restaurant_data: dict):
-        """Отправка события создания ресторана"""
-        event = {
-            "event_id": str(uuid.uuid4()),
-            "event_type": "restaurant.created",
-            "timestamp": datetime.utcnow().isoformat(),
-            "source_service": "restaurant-service",
-            "data": restaurant_data
+        return self._is_connected and self.producer is not None
+
+    async def check_metadata(self, timeout: float) -> bool:
+        """Проверка связи с кластером: запрос метаданных брокеров"""
+        if not self.is_connected():
+            return False
+        metadata = await asyncio.wait_for(self.producer.client.fetch_all_metadata(), timeout)
+        return bool(metadata.brokers())
+
+    def add_failure_callback(self, callback: FailureCallback):
+        """Регистрация обработчика неуспешной доставки события"""
+        self._failure_callbacks.append(callback)
+
+    def get_stats(self) -> dict:
+        return {
+            **self.stats,
+            "queued": self._queue.qsize() if self._queue else 0,
+            "async_mode": self._async_mode,
         }
-        
+
+    async def publish(self, event_type: EventType, data: dict, key: Optional[str] = None):
+        """Публикация доменного события"""
+        event = build_event(event_type, data)
+        topic = event_type.value
+        value = json.dumps(event).encode('utf-8')
+        key_bytes = key.encode('utf-8') if key is not None else None
+        self.stats["published"] += 1
+
+        started = time.perf_counter()
+        if self._queue is not None:
+            await self._queue.put((topic, event, value, key_bytes, started))
+            return
+
         try:
-            await self.producer.send_and_wait(
-                "restaurant.created",
-                json.dumps(event).encode('utf-8')
-            )
-            logger.info(f"Restaurant created event sent: {restaurant_data['restaurant_id']}")
+            await self.producer.send_and_wait(topic, value, key=key_bytes)
+            self._on_sent(topic, started)
+            logger.info(f"Event {topic} sent: {event['event_id']}")
         except Exception as e:
-            logger.error(f"Failed to send restaurant created event: {e}")
-
-    async def send_dish_deleted(self, dish_data: dict):
-        """Отправка события удаления блюда"""
-        event = {
-            "event_id": str(uuid.uuid4()),
-            "event_type": "dish.deleted",
-            "timestamp": datetime.utcnow().isoformat(),
-            "source_service": "restaurant-service",
-            "data": dish_data
-        }
-        
+            self._on_failure(topic, event, e)
+
+    async def send_batch(self, records: list):
+        """Отправка пачки готовых событий (topic, event, key) с ожиданием подтверждения всех"""
+        await self.send_raw([
+            (topic, json.dumps(event).encode('utf-8'), key.encode('utf-8') if key is not None else None, None)
+            for topic, event, key in records
+        ])
+
+    async def send_raw(self, records: list):
+        """Отправка пачки сообщений как есть (topic, value, key, headers) с ожиданием подтверждения всех"""
+        started = time.perf_counter()
+        deliveries = []
+        for topic, value, key, headers in records:
+            deliveries.append(await self.producer.send(topic, value, key=key, headers=headers))
         try:
-            await self.producer.send_and_wait(
-                "dish.deleted",
-                json.dumps(event).encode('utf-8')
-            )
-            logger.info(f"Dish deleted event sent: {dish_data['dish_id']}")
-        except Exception as e:
-            logger.error(f"Failed to send dish deleted event: {e}")
+            await asyncio.gather(*deliveries)
+        except Exception:
+            self.stats["failed"] += len(records)
+            for topic, _, _, _ in records:
+                producer_failures.inc(topic=topic)
+            raise
+        for topic, _, _, _ in records:
+            self._on_sent(topic, started)
+
+    async def _flush_loop(self):
+        """Фоновая передача событий из очереди в батчи продюсера"""
+        while True:
+            topic, event, value, key, started = await self._queue.get()
+            try:
+                delivery = await self.producer.send(topic, value, key=key)
+                delivery.add_done_callback(partial(self._on_delivery, topic, event, started))
+            except Exception as e:
+                self._on_failure(topic, event, e)
+            finally:
+                self._queue.task_done()
+
+    def _on_delivery(self, topic: str, event: dict, started: float, delivery: asyncio.Future):
+        if delivery.cancelled():
+            self._on_failure(topic, event, asyncio.CancelledError())
+        elif delivery.exception() is not None:
+            self._on_failure(topic, event, delivery.exception())
+        else:
+            self._on_sent(topic, started)
+
+    def _on_sent(self, topic: str, started: float):
+        self.stats["sent"] += 1
+        producer_sent.inc(topic=topic)
+        producer_send_latency.observe(time.perf_counter() - started, topic=topic)
+
+    def _on_failure(self, topic: str, event: dict, error: BaseException):
+        self.stats["failed"] += 1
+        producer_failures.inc(topic=topic)
+        logger.error(f"Failed to send {topic} event {event['event_id']}: {error}")
+        for callback in self._failure_callbacks:
+            try:
+                callback(topic, event, error)
+            except Exception as e:
+                logger.error(f"Delivery failure callback error: {e}")
 
-event_producer = KafkaEventProducer()
\ No newline at end of file
+event_producer = KafkaEventProducer()
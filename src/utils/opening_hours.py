@@ -0,0 +1,110 @@
+import logging
+import re
+from datetime import datetime
+from typing import List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+logger = logging.getLogger(__name__)
+
+MINUTES_PER_DAY = 24 * 60
+
+DAYS = {
+    "mon": 0, "monday": 0, "пн": 0, "понедельник": 0,
+    "tue": 1, "tuesday": 1, "вт": 1, "вторник": 1,
+    "wed": 2, "wednesday": 2, "ср": 2, "среда": 2,
+    "thu": 3, "thursday": 3, "чт": 3, "четверг": 3,
+    "fri": 4, "friday": 4, "пт": 4, "пятница": 4,
+    "sat": 5, "saturday": 5, "сб": 5, "суббота": 5,
+    "sun": 6, "sunday": 6, "вс": 6, "воскресенье": 6,
+}
+EVERY_DAY = {"daily", "everyday", "all", "ежедневно"}
+CLOSED = {"", "closed", "выходной", "закрыто"}
+ALWAYS_OPEN = {"24h", "24/7", "круглосуточно"}
+
+_TIME_RANGE = re.compile(r"^\s*(\d{1,2})(?::(\d{2}))?\s*[-–]\s*(\d{1,2})(?::(\d{2}))?\s*$")
+
+def _parse_days(key: str) -> Optional[List[int]]:
+    key = key.strip().lower()
+    if key in EVERY_DAY:
+        return list(range(7))
+    if key in DAYS:
+        return [DAYS[key]]
+    first, sep, last = key.partition("-")
+    if sep and first.strip() in DAYS and last.strip() in DAYS:
+        start, end = DAYS[first.strip()], DAYS[last.strip()]
+        return [(start + i) % 7 for i in range((end - start) % 7 + 1)]
+    return None
+
+def _parse_range(value: str) -> Optional[Tuple[int, int]]:
+    """'10:00-22:00' / '10-22' -> (минуты открытия, минуты закрытия) от начала суток"""
+    if value.strip().lower() in ALWAYS_OPEN:
+        return 0, MINUTES_PER_DAY
+    match = _TIME_RANGE.match(value)
+    if match is None:
+        return None
+    opens = int(match[1]) * 60 + int(match[2] or 0)
+    closes = int(match[3]) * 60 + int(match[4] or 0)
+    if opens >= MINUTES_PER_DAY or closes > MINUTES_PER_DAY:
+        return None
+    return opens, closes
+
+def _day_ranges(value) -> Optional[List[Tuple[int, int]]]:
+    if value is None or value is False:
+        return []
+    if isinstance(value, str):
+        if value.strip().lower() in CLOSED:
+            return []
+        values = value.split(",")
+    elif isinstance(value, list):
+        values = value
+    else:
+        return None
+    ranges = []
+    for item in values:
+        parsed = _parse_range(item) if isinstance(item, str) else None
+        if parsed is None:
+            return None
+        ranges.append(parsed)
+    return ranges
+
+def opening_intervals(opening_hours: Optional[dict]) -> List[Tuple[int, int]]:
+    """Свободный JSON часов работы -> интервалы [opens_at, closes_at) в минутах недели.
+
+    Ключи - дни (mon, monday, пн, mon-fri, daily), значения - "10:00-22:00",
+    список или строка диапазонов через запятую, "closed"/null, "24h". Работа через
+    полночь переносится на следующий день. Нераспознанные записи пропускаются.
+    """
+    if not isinstance(opening_hours, dict):
+        return []
+    intervals = []
+    for key, value in opening_hours.items():
+        days = _parse_days(str(key))
+        ranges = _day_ranges(value)
+        if days is None or ranges is None:
+            logger.warning(f"Unrecognized opening hours entry {key!r}: {value!r}")
+            continue
+        for day in days:
+            start = day * MINUTES_PER_DAY
+            for opens, closes in ranges:
+                if closes > opens:
+                    intervals.append((start + opens, start + closes))
+                elif (opens, closes) != (0, 0):
+                    intervals.append((start + opens, start + MINUTES_PER_DAY))
+                    if closes:
+                        next_day = (day + 1) % 7 * MINUTES_PER_DAY
+                        intervals.append((next_day, next_day + closes))
+    return _merge(intervals)
+
+def _merge(intervals: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    merged = []
+    for opens, closes in sorted(intervals):
+        if merged and opens <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], closes))
+        else:
+            merged.append((opens, closes))
+    return merged
+
+def minute_of_week(moment: datetime, timezone: str) -> int:
+    """Минута недели (понедельник 00:00 = 0) в часовом поясе ресторанов; время без пояса считается местным"""
+    local = moment if moment.tzinfo is None else moment.astimezone(ZoneInfo(timezone))
+    return local.weekday() * MINUTES_PER_DAY + local.hour * 60 + local.minute
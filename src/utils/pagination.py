@@ -0,0 +1,20 @@
+import base64
+import json
+
+class InvalidCursor(ValueError):
+    pass
+
+def encode_cursor(values: list) -> str:
+    """Непрозрачный курсор из значений ключа сортировки последней строки страницы"""
+    raw = json.dumps(values, separators=(",", ":"), default=str).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip("=")
+
+def decode_cursor(cursor: str, size: int) -> list:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except Exception:
+        raise InvalidCursor("Invalid cursor")
+    if not isinstance(values, list) or len(values) != size:
+        raise InvalidCursor("Invalid cursor")
+    return values
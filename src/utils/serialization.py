@@ -0,0 +1,32 @@
+from decimal import Decimal
+from typing import Iterable, Optional, Sequence
+import orjson
+
+def schema_columns(model, schema) -> list:
+    """Колонки ORM-модели в порядке полей pydantic-схемы ответа"""
+    return [getattr(model, name) for name in schema.model_fields]
+
+def _default(value):
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+def dump_rows(rows: Iterable, fields: Optional[Sequence[str]] = None) -> bytes:
+    """JSON-массив из строк-маппингов.
+
+    Тот же JSON, что FastAPI строит через response_model: компактные разделители,
+    UTF-8 без экранирования, datetime с суффиксом Z, Decimal строкой. Значения
+    совпадают, но запись float - не всегда: где json.dumps даёт экспоненту
+    (|x| < 1e-4 или >= 1e16), orjson пишет 0.00001 и 1e16 вместо 1e-05 и 1e+16.
+    fields - оставить только эти ключи (если в выборке есть служебные колонки).
+    """
+    if fields is None:
+        items = [dict(row) for row in rows]
+    else:
+        items = [{name: row[name] for name in fields} for row in rows]
+    return orjson.dumps(items, default=_default, option=orjson.OPT_UTC_Z)
+
+def dump_ndjson(rows: Iterable) -> bytes:
+    """Строки-маппинги в NDJSON: по одному JSON-объекту на строку"""
+    option = orjson.OPT_UTC_Z | orjson.OPT_APPEND_NEWLINE
+    return b"".join(orjson.dumps(dict(row), default=_default, option=option) for row in rows)
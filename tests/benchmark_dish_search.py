@@ -0,0 +1,111 @@
+"""Задержка поиска блюд на синтетических данных.
+
+    python -m tests.benchmark_dish_search [--dishes 1000000] [--repeat 50] [--keep]
+
+Создаёт отдельный ресторан с --dishes блюдами (search_vector заполняет триггер),
+прогоняет типичные запросы через search_dishes_json и печатает p50/p95/max.
+Без --keep данные удаляются после замера.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+
+from sqlalchemy import text
+
+from src.db.models import review  # noqa: F401 - Restaurant.reviews ссылается на модель по имени
+from src.db.session import AsyncSessionLocal, engine
+from src.services.dish import search_dishes_json
+
+NAMES = ["борщ", "солянка", "плов", "пельмени", "вареники", "шашлык", "паста", "пицца", "салат", "суп",
+         "бургер", "стейк", "ризотто", "лазанья", "рамен", "удон", "сырники", "блины", "котлета", "рагу"]
+INGREDIENTS = ["говядина", "свинина", "курица", "лосось", "креветки", "грибы", "сыр", "томаты", "картофель",
+               "рис", "лук", "чеснок", "сливки", "шпинат", "баклажан", "тыква", "базилик", "перец", "мёд", "кунжут"]
+CATEGORIES = 50
+
+def _sql_array(words: list) -> str:
+    return "ARRAY[" + ",".join(f"'{word}'" for word in words) + "]"
+
+async def _seed(dishes: int) -> int:
+    names, ingredients = _sql_array(NAMES), _sql_array(INGREDIENTS)
+    async with engine.begin() as conn:
+        restaurant_id = (await conn.execute(text(
+            "INSERT INTO restaurants (name, address, phone, email, is_active, average_rating, rating_sum, review_count) "
+            "VALUES (:name, 'Benchmark street, 1', '+70000000000', 'bench@example.com', true, 0, 0, 0) RETURNING id"
+        ), {"name": f"Search benchmark {uuid.uuid4().hex}"})).scalar_one()
+        await conn.execute(text(
+            "INSERT INTO menu_categories (restaurant_id, name, order_index, is_active) "
+            "SELECT :rid, 'Категория ' || g, g, true FROM generate_series(1, :count) g"
+        ), {"rid": restaurant_id, "count": CATEGORIES})
+        await conn.execute(text(f"""
+            INSERT INTO dishes (category_id, name, description, price, ingredients, allergens,
+                                preparation_time, is_available, is_active)
+            SELECT c.ids[1 + g % {CATEGORIES}],
+                   initcap(({names})[1 + g % {len(NAMES)}]) || ' ' || g,
+                   'Домашний рецепт: ' || ({ingredients})[1 + (g / 7) % {len(INGREDIENTS)}],
+                   (100 + g % 1900)::numeric(10, 2),
+                   ARRAY[({ingredients})[1 + g % {len(INGREDIENTS)}], ({ingredients})[1 + (g / 3) % {len(INGREDIENTS)}]],
+                   '{{}}', 5 + g % 60, g % 10 <> 0, true
+            FROM generate_series(1, :count) g,
+                 (SELECT array_agg(id ORDER BY id) AS ids FROM menu_categories WHERE restaurant_id = :rid) c
+        """), {"rid": restaurant_id, "count": dishes})
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        # Как после autovacuum: свежая статистика обеих таблиц, карта видимости, пустой pending list GIN
+        await conn.execute(text("VACUUM ANALYZE dishes, menu_categories"))
+    return restaurant_id
+
+async def _cleanup(restaurant_id: int):
+    async with engine.begin() as conn:
+        await conn.execute(text(
+            "DELETE FROM dishes USING menu_categories "
+            "WHERE dishes.category_id = menu_categories.id AND menu_categories.restaurant_id = :rid"
+        ), {"rid": restaurant_id})
+        await conn.execute(text("DELETE FROM menu_categories WHERE restaurant_id = :rid"), {"rid": restaurant_id})
+        await conn.execute(text("DELETE FROM restaurants WHERE id = :rid"), {"rid": restaurant_id})
+
+async def _measure(repeat: int, **params) -> list:
+    timings = []
+    async with AsyncSessionLocal() as db:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            await search_dishes_json(db, **params)
+            timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+async def run(dishes: int, repeat: int, keep: bool):
+    started = time.perf_counter()
+    restaurant_id = await _seed(dishes)
+    print(f"seeded {dishes} dishes into restaurant {restaurant_id} in {time.perf_counter() - started:.1f}s")
+
+    async with AsyncSessionLocal() as db:
+        _, cursor = await search_dishes_json(db, "борщ", limit=20)
+    scenarios = {
+        "rare word": {"query": "борщ говядина мёд"},
+        "common word": {"query": "курица"},
+        "restaurant + price": {"query": "плов", "restaurant_id": restaurant_id, "min_price": 500, "max_price": 900},
+        "available only": {"query": "пицца сыр", "is_available": True},
+        "next page": {"query": "борщ", "cursor": cursor},
+        "no matches": {"query": "несуществующее"},
+    }
+    try:
+        for name, params in scenarios.items():
+            timings = sorted(await _measure(repeat, **params))
+            p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+            print(f"{name:<20} p50 {statistics.median(timings):8.2f} ms  p95 {p95:8.2f} ms  max {timings[-1]:8.2f} ms")
+    finally:
+        if not keep:
+            await _cleanup(restaurant_id)
+        await engine.dispose()
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark dish full-text search latency")
+    parser.add_argument("--dishes", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--keep", action="store_true", help="do not delete the synthetic restaurant")
+    args = parser.parse_args()
+    asyncio.run(run(args.dishes, args.repeat, args.keep))
+
+if __name__ == "__main__":
+    main()
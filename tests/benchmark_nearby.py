@@ -0,0 +1,131 @@
+"""Задержка поиска ресторанов рядом на синтетических данных.
+
+    python -m tests.benchmark_nearby [--restaurants 500000] [--repeat 50] [--keep]
+
+Создаёт --restaurants ресторанов (70% в трёх городах, остальные равномерно по
+большой области), прогоняет get_nearby_restaurants_json для разных радиусов
+и печатает p50/p95/max. Для сравнения - тот же запрос без отбора по geo_cell.
+Без --keep данные удаляются после замера.
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+import uuid
+
+from sqlalchemy import desc, select, text
+
+from src.db.models import review  # noqa: F401 - Restaurant.reviews ссылается на модель по имени
+from src.db.models.restaurant import Restaurant
+from src.db.session import AsyncSessionLocal, engine
+from src.services.restaurant import _distance_km, get_nearby_restaurants_json
+from src.utils.geo import GEO_CELL_DEGREES, LON_CELLS, geo_cell
+
+CITIES = [(55.75, 37.62), (59.94, 30.31), (56.84, 60.60)]
+REGION = ((43.0, 70.0), (20.0, 140.0))
+
+async def _seed(count: int, prefix: str):
+    cities = ",".join(f"({n}, {lat}, {lon})" for n, (lat, lon) in enumerate(CITIES))
+    (lat_min, lat_max), (lon_min, lon_max) = REGION
+    async with engine.begin() as conn:
+        await conn.execute(text(f"""
+            INSERT INTO restaurants (name, address, phone, email, is_active, average_rating, rating_sum, review_count,
+                                     latitude, longitude)
+            SELECT :prefix || g, 'Benchmark street, ' || g, '+70000000000', 'bench@example.com', true,
+                   round((random() * 5)::numeric, 2), 0, (random() * 500)::int, lat, lon
+            FROM (
+                SELECT g,
+                       CASE WHEN g % 10 < 7 THEN c.lat + (random() - 0.5) * 0.6
+                            ELSE {lat_min} + random() * {lat_max - lat_min} END AS lat,
+                       CASE WHEN g % 10 < 7 THEN c.lon + (random() - 0.5) * 1.0
+                            ELSE {lon_min} + random() * {lon_max - lon_min} END AS lon
+                FROM generate_series(1, :count) g
+                JOIN (VALUES {cities}) AS c(n, lat, lon) ON c.n = g % {len(CITIES)}
+            ) points
+        """), {"prefix": prefix, "count": count})
+        # Та же формула, что и src.utils.geo.geo_cell
+        await conn.execute(text(f"""
+            UPDATE restaurants
+            SET geo_cell = floor((latitude + 90) / {GEO_CELL_DEGREES})::bigint * {LON_CELLS}
+                           + mod(floor((longitude + 180) / {GEO_CELL_DEGREES})::bigint, {LON_CELLS})
+            WHERE name LIKE :pattern
+        """), {"pattern": prefix + "%"})
+        sample = (await conn.execute(text(
+            "SELECT latitude, longitude, geo_cell FROM restaurants WHERE name LIKE :pattern LIMIT 1000"
+        ), {"pattern": prefix + "%"})).all()
+        assert all(geo_cell(row.latitude, row.longitude) == row.geo_cell for row in sample)
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await conn.execute(text("VACUUM ANALYZE restaurants"))
+
+async def _cleanup(prefix: str):
+    async with engine.begin() as conn:
+        await conn.execute(text("DELETE FROM restaurants WHERE name LIKE :pattern"), {"pattern": prefix + "%"})
+
+def _percentiles(timings: list) -> str:
+    timings = sorted(timings)
+    p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+    return f"p50 {statistics.median(timings):8.2f} ms  p95 {p95:8.2f} ms  max {timings[-1]:8.2f} ms"
+
+async def _measure(repeat: int, points: list, radius_km: float) -> list:
+    timings = []
+    async with AsyncSessionLocal() as db:
+        for i in range(repeat):
+            latitude, longitude = points[i % len(points)]
+            started = time.perf_counter()
+            await get_nearby_restaurants_json(db, latitude, longitude, radius_km)
+            timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+async def _measure_full_scan(repeat: int, points: list, radius_km: float) -> list:
+    timings = []
+    async with AsyncSessionLocal() as db:
+        for i in range(repeat):
+            latitude, longitude = points[i % len(points)]
+            distance = _distance_km(latitude, longitude)
+            started = time.perf_counter()
+            await db.execute(
+                select(Restaurant.id, distance)
+                .filter(Restaurant.is_active == True, distance <= radius_km)
+                .order_by(distance, desc(Restaurant.average_rating))
+                .limit(20)
+            )
+            timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+async def run(count: int, repeat: int, keep: bool):
+    prefix = f"Nearby benchmark {uuid.uuid4().hex[:8]} "
+    rng = random.Random(1)
+    city_points = [(lat + rng.uniform(-0.2, 0.2), lon + rng.uniform(-0.3, 0.3)) for lat, lon in CITIES for _ in range(20)]
+    (lat_min, lat_max), (lon_min, lon_max) = REGION
+    rural_points = [(rng.uniform(lat_min, lat_max), rng.uniform(lon_min, lon_max)) for _ in range(60)]
+
+    started = time.perf_counter()
+    try:
+        await _seed(count, prefix)
+        print(f"seeded {count} restaurants in {time.perf_counter() - started:.1f}s")
+        for name, points, radius_km in (
+            ("city, 1 km", city_points, 1.0),
+            ("city, 5 km", city_points, 5.0),
+            ("city, 20 km", city_points, 20.0),
+            ("sparse, 50 km", rural_points, 50.0),
+        ):
+            print(f"{name:<22} {_percentiles(await _measure(repeat, points, radius_km))}")
+        baseline = await _measure_full_scan(max(3, repeat // 10), city_points, 5.0)
+        print(f"{'full scan, 5 km':<22} {_percentiles(baseline)}")
+    finally:
+        if not keep:
+            await _cleanup(prefix)
+        await engine.dispose()
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark nearby restaurant search latency")
+    parser.add_argument("--restaurants", type=int, default=500_000)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--keep", action="store_true", help="do not delete the synthetic restaurants")
+    args = parser.parse_args()
+    asyncio.run(run(args.restaurants, args.repeat, args.keep))
+
+if __name__ == "__main__":
+    main()
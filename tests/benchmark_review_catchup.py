@@ -0,0 +1,110 @@
+"""Пособытийное воспроизведение истории отзывов против догоняющего режима.
+
+    python -m tests.benchmark_review_catchup [--events 200000] [--restaurants 200] [--sample 3000] [--flush 200000]
+
+Генерирует историю событий (создание, правки, часть удалений) по --restaurants
+ресторанам. Пособытийный путь (create_review/update_review/delete_review, как при
+обычном потреблении) прогоняется на первых --sample событиях, догоняющий - на всей
+истории пачками по --flush событий. Печатает событий в секунду; данные удаляются.
+"""
+import argparse
+import asyncio
+import random
+import time
+import uuid
+
+from sqlalchemy import text
+
+from src.db.models import review  # noqa: F401 - Restaurant.reviews ссылается на модель по имени
+from src.db.session import AsyncSessionLocal, engine
+from src.services.review import (
+    apply_folded_review_events, create_review, delete_review, find_rating_drift, fold_review_event, update_review,
+)
+
+HANDLERS = {"created": create_review, "updated": update_review, "deleted": delete_review}
+
+def _history(count: int, restaurant_ids: list, prefix: str) -> list:
+    """Около половины событий - создания, остальные - правки и удаления уже созданных отзывов"""
+    rng = random.Random(1)
+    events, alive, next_id = [], [], 0
+    while len(events) < count:
+        roll = rng.random()
+        if roll < 0.5 or not alive:
+            review_id = f"{prefix}{next_id}"
+            next_id += 1
+            alive.append(review_id)
+            events.append(("created", {
+                "review_id": review_id, "restaurant_id": rng.choice(restaurant_ids),
+                "user_id": rng.randint(1, 10_000), "rating": rng.randint(1, 5), "comment": "Benchmark review",
+            }))
+        elif roll < 0.9:
+            events.append(("updated", {
+                "review_id": rng.choice(alive), "new_rating": rng.randint(1, 5), "new_comment": "Edited",
+            }))
+        else:
+            review_id = alive.pop(rng.randrange(len(alive)))
+            events.append(("deleted", {"review_id": review_id}))
+    return events
+
+async def _seed(count: int, prefix: str) -> list:
+    async with engine.begin() as conn:
+        result = await conn.execute(text(
+            "INSERT INTO restaurants (name, address, phone, email, is_active, average_rating, rating_sum, review_count) "
+            "SELECT :prefix || g, 'Benchmark street, ' || g, '+70000000000', 'bench@example.com', true, 0, 0, 0 "
+            "FROM generate_series(1, :count) g RETURNING id"
+        ), {"prefix": prefix, "count": count})
+        return [row.id for row in result]
+
+async def _cleanup(restaurant_ids: list):
+    async with engine.begin() as conn:
+        await conn.execute(text("DELETE FROM reviews WHERE restaurant_id = ANY(:ids)"), {"ids": restaurant_ids})
+        await conn.execute(text("DELETE FROM restaurants WHERE id = ANY(:ids)"), {"ids": restaurant_ids})
+
+async def _replay_per_event(events: list) -> float:
+    started = time.perf_counter()
+    async with AsyncSessionLocal() as db:
+        for kind, review_data in events:
+            await HANDLERS[kind](db, review_data)
+    return time.perf_counter() - started
+
+async def _replay_catch_up(events: list, flush_events: int) -> float:
+    started = time.perf_counter()
+    for start in range(0, len(events), flush_events):
+        folded = {}
+        for kind, review_data in events[start:start + flush_events]:
+            fold_review_event(folded, kind, review_data)
+        async with AsyncSessionLocal() as db:
+            await apply_folded_review_events(db, folded, recompute=True)
+            await db.commit()
+    return time.perf_counter() - started
+
+async def run(count: int, restaurants: int, sample: int, flush_events: int):
+    prefix = f"Catch-up benchmark {uuid.uuid4().hex[:8]} "
+    restaurant_ids = await _seed(restaurants, prefix)
+    try:
+        sample = min(sample, count)
+        per_event = await _replay_per_event(_history(sample, restaurant_ids, prefix + "sample "))
+        print(f"{'per event':<12} {sample:>8} events  {sample / per_event:10.0f} events/s")
+
+        events = _history(count, restaurant_ids, prefix)
+        bulk = await _replay_catch_up(events, flush_events)
+        print(f"{'catch-up':<12} {count:>8} events  {count / bulk:10.0f} events/s")
+
+        async with AsyncSessionLocal() as db:
+            drift = await find_rating_drift(db, restaurant_ids)
+        print(f"restaurants with rating drift: {len(drift)}")
+    finally:
+        await _cleanup(restaurant_ids)
+        await engine.dispose()
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark review history replay: per event vs catch-up mode")
+    parser.add_argument("--events", type=int, default=200_000)
+    parser.add_argument("--restaurants", type=int, default=200)
+    parser.add_argument("--sample", type=int, default=3000, help="events replayed one by one")
+    parser.add_argument("--flush", type=int, default=200_000, help="events folded per catch-up transaction")
+    args = parser.parse_args()
+    asyncio.run(run(args.events, args.restaurants, args.sample, args.flush))
+
+if __name__ == "__main__":
+    main()
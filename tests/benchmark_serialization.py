@@ -0,0 +1,69 @@
+"""Сравнение сериализации списков: ORM + response_model против выборки колонок + orjson.
+
+    python -m tests.benchmark_serialization [--rows 200] [--repeat 200]
+"""
+import argparse
+import timeit
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from types import SimpleNamespace
+from typing import List
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+from src.schemas.dish import Dish
+from src.schemas.menu_category import MenuCategory
+from src.schemas.restaurant import Restaurant
+from src.schemas.review import Review
+from src.utils.serialization import dump_rows
+
+def legacy_json(schema, objects) -> bytes:
+    """Тело ответа, которое FastAPI строит для response_model=List[schema]"""
+    adapter = TypeAdapter(List[schema])
+    content = adapter.dump_python(adapter.validate_python(objects, from_attributes=True), mode="json")
+    return JSONResponse(content=content).body
+
+def _rows(schema, count: int) -> list:
+    now = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    samples = {
+        Restaurant: lambda i: {
+            "name": f"Ресторан {i}", "description": "Описание" if i % 2 else None, "address": "ул. Ленина, 1",
+            "phone": "+70000000000", "email": f"r{i}@example.com", "opening_hours": {"mon": "10-22"},
+            "latitude": 55.75 + i / 1e4 if i % 2 else None, "longitude": 37.61 + i / 1e4 if i % 2 else None,
+            "id": i, "is_active": True, "created_at": now + timedelta(seconds=i), "updated_at": None,
+        },
+        MenuCategory: lambda i: {
+            "name": f"Категория {i}", "description": None, "order_index": i,
+            "id": i, "restaurant_id": 1, "is_active": True,
+        },
+        Dish: lambda i: {
+            "name": f"Блюдо {i}", "description": "Состав \"домашний\"", "price": Decimal("349.90"),
+            "ingredients": ["мука", "вода"], "allergens": ["глютен"], "preparation_time": 15,
+            "image_url": None, "id": i, "category_id": 1, "is_available": i % 3 != 0, "is_active": True,
+            "created_at": now + timedelta(microseconds=i), "updated_at": now,
+        },
+        Review: lambda i: {
+            "restaurant_id": 1, "user_id": i, "rating": i % 5 + 1, "comment": "Вкусно" if i % 2 else None,
+            "id": i, "review_id": f"rv-{i}", "is_active": True,
+            "created_at": now - timedelta(minutes=i), "updated_at": None,
+        },
+    }
+    return [{name: samples[schema](i)[name] for name in schema.model_fields} for i in range(1, count + 1)]
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark list serialization paths")
+    parser.add_argument("--rows", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    for schema in (Restaurant, MenuCategory, Dish, Review):
+        rows = _rows(schema, args.rows)
+        objects = [SimpleNamespace(**row) for row in rows]
+        legacy, fast = legacy_json(schema, objects), dump_rows(rows)
+        assert legacy == fast, f"{schema.__name__}: outputs differ"
+        legacy_us = timeit.timeit(lambda: legacy_json(schema, objects), number=args.repeat) / args.repeat * 1e6
+        fast_us = timeit.timeit(lambda: dump_rows(rows), number=args.repeat) / args.repeat * 1e6
+        print(f"{schema.__name__:<14} {args.rows} rows: response_model {legacy_us:9.1f} us, "
+              f"orjson {fast_us:8.1f} us, x{legacy_us / fast_us:.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+import asyncio
+import uuid
+from contextlib import contextmanager
+
+import pytest
+import pytest_asyncio
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import event, text
+
+from src.db.session import engine, AsyncSessionLocal
+
+
+class QueryCounter:
+    """Собирает SQL-запросы, выполненные через engine, пока подписан на before_cursor_execute"""
+
+    def __init__(self):
+        self.statements = []
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+
+@contextmanager
+def count_queries():
+    counter = QueryCounter()
+    event.listen(engine.sync_engine, "before_cursor_execute", counter)
+    try:
+        yield counter
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", counter)
+
+
+@contextmanager
+def assert_max_queries(budget: int):
+    """Падает, если блок выполнил больше запросов, чем заявлено в бюджете"""
+    with count_queries() as counter:
+        yield counter
+    assert counter.count <= budget, (
+        f"{counter.count} statements executed, budget is {budget}:\n"
+        + "\n".join(counter.statements)
+    )
+
+
+@pytest.fixture(scope="session")
+def event_loop():
+    # Пул соединений asyncpg привязан к циклу событий, поэтому один цикл на всю сессию
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+@pytest_asyncio.fixture(scope="session")
+async def database():
+    try:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+    except Exception as e:
+        pytest.skip(f"Database is not available: {e}")
+    yield engine
+    await engine.dispose()
+
+
+@pytest_asyncio.fixture
+async def db(database):
+    async with AsyncSessionLocal() as session:
+        yield session
+
+
+@pytest_asyncio.fixture
+async def client(database):
+    from src.main import app
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        yield ac
+
+
+@pytest_asyncio.fixture
+async def menu(db):
+    """Ресторан с категорией и блюдом, созданные напрямую через сервисы"""
+    from src.schemas.dish import DishCreate
+    from src.schemas.menu_category import MenuCategoryCreate
+    from src.schemas.restaurant import RestaurantCreate
+    from src.services.dish import create_dish
+    from src.services.menu_category import create_menu_category
+    from src.services.restaurant import create_restaurant
+
+    restaurant = await create_restaurant(db, RestaurantCreate(
+        name=f"Test restaurant {uuid.uuid4().hex}",
+        address="Test street, 1",
+        phone="+70000000000",
+        email="test@example.com",
+    ))
+    category = await create_menu_category(db, restaurant.id, MenuCategoryCreate(name="Main", order_index=0))
+    dish = await create_dish(db, restaurant.id, category.id, DishCreate(name="Soup", price=100, preparation_time=10))
+    return {"restaurant_id": restaurant.id, "category_id": category.id, "dish_id": dish.id}
@@ -0,0 +1,97 @@
+from types import SimpleNamespace
+
+import pytest
+
+from src.utils import cache as cache_module
+from src.utils.cache import LRUCache, LRUCacheBackend, ReadThroughCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = SimpleNamespace(value=1000.0)
+    monkeypatch.setattr(cache_module, "time", SimpleNamespace(monotonic=lambda: now.value))
+    return now
+
+
+def test_evicts_least_recently_used_entry(clock):
+    cache = LRUCache(max_entries=2, ttl=60)
+    cache.set("a", b"1")
+    cache.set("b", b"2")
+    assert cache.get("a") == b"1"
+
+    # Чтение "a" сделало самым старым "b" - вытесняется он
+    cache.set("c", b"3")
+    assert cache.get("b") is None
+    assert cache.get("a") == b"1" and cache.get("c") == b"3"
+    assert cache.stats["evictions"] == 1
+
+
+def test_evicts_by_size_and_rejects_oversized_value(clock):
+    cache = LRUCache(max_entries=10, ttl=60, max_bytes=10)
+    cache.set("a", b"x" * 4)
+    cache.set("b", b"x" * 4)
+    cache.set("c", b"x" * 4)
+    assert cache.get("a") is None and len(cache) == 2 and cache.size_bytes == 8
+
+    assert cache.set("big", b"x" * 11) is False
+    assert cache.get("big") is None and len(cache) == 2
+
+    cache.set("b", b"x")
+    assert cache.size_bytes == 5
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = LRUCache(max_entries=10, ttl=60)
+    cache.set("default", b"1")
+    cache.set("short", b"2", ttl=5)
+
+    clock.value += 5
+    assert cache.get("short") is None
+    assert cache.get("default") == b"1"
+
+    clock.value += 55
+    assert cache.get("default") is None
+    assert len(cache) == 0 and cache.size_bytes == 0
+
+
+def test_set_with_stale_generation_is_ignored(clock):
+    cache = LRUCache(max_entries=10, ttl=60)
+    with cache.loading("menu") as generation:
+        # Значение строилось из БД, а ключ за это время инвалидировали
+        cache.invalidate("menu")
+        assert cache.set("menu", b"old", generation=generation) is False
+    assert cache.get("menu") is None
+    with cache.loading("menu") as generation:
+        assert cache.set("menu", b"new", generation=generation) is True
+    assert cache.get("menu") == b"new"
+
+
+def test_generations_are_kept_only_during_loads(clock):
+    cache = LRUCache(max_entries=10, ttl=60)
+    for key in range(1000):
+        cache.set(key, b"1")
+        cache.invalidate(key)
+    with cache.loading("menu"):
+        with cache.loading("menu"):
+            cache.invalidate("menu")
+        assert len(cache._generations) == 1
+    assert len(cache._generations) == 0
+
+
+@pytest.mark.asyncio
+async def test_read_through_skips_value_loaded_before_invalidation():
+    cache = ReadThroughCache(LRUCacheBackend(max_entries=10, ttl=60), ttl=60)
+
+    async def stale_loader():
+        await cache.invalidate("list")
+        return b"old"
+
+    assert await cache.get_or_load("list", stale_loader) == b"old"
+    assert await cache.backend.get("list") is None
+    assert len(cache._generations) == 0
+
+    async def loader():
+        return b"new"
+
+    assert await cache.get_or_load("list", loader) == b"new"
+    assert await cache.backend.get("list") == b"new"
@@ -0,0 +1,110 @@
+import asyncio
+import json
+import uuid
+from collections import namedtuple
+
+import pytest
+from aiokafka import TopicPartition
+from sqlalchemy.exc import OperationalError
+
+from src.core.config import settings
+from src.services.review import create_review
+from src.utils.kafka import consumer as consumer_module
+from src.utils.kafka.consumer import KafkaReviewConsumer
+from src.utils.kafka.dead_letter import dead_letter_headers, header, is_permanent, replay_headers, retry_delay
+from src.utils.kafka.offsets import PartitionOffsetTracker
+
+Message = namedtuple("Message", "topic partition offset timestamp key value headers")
+CREATED = "restaurant.review_created"
+
+
+def _message(offset, review_id, value=None):
+    payload = {"event_type": CREATED, "data": {"review_id": review_id, "restaurant_id": 1, "user_id": 1, "rating": 5}}
+    return Message(CREATED, 0, offset, offset, b"key", value or json.dumps(payload).encode(), [("trace-id", b"abc")])
+
+
+@pytest.mark.asyncio
+async def test_missing_restaurant_is_permanent(db):
+    with pytest.raises(Exception) as error:
+        await create_review(db, {"review_id": uuid.uuid4().hex, "restaurant_id": -1, "user_id": 1, "rating": 5})
+    assert is_permanent(error.value)
+    assert is_permanent(KeyError("rating"))
+    assert not is_permanent(OperationalError("SELECT 1", {}, ConnectionResetError()))
+    assert not is_permanent(asyncio.TimeoutError())
+
+
+def test_dead_letter_headers_round_trip():
+    msg = _message(7, "r")
+    headers = dead_letter_headers(msg, KeyError("rating"), 1)
+    assert ("trace-id", b"abc") in headers
+    assert header(headers, "dlq-original-offset") == "7"
+    assert header(headers, "dlq-error-class") == "permanent"
+
+    replayed = replay_headers(headers)
+    assert replayed == [("trace-id", b"abc"), ("dlq-replays", b"1")]
+    assert header(replay_headers(dead_letter_headers(msg._replace(headers=replayed), KeyError(), 1)), "dlq-replays") == "2"
+
+
+def test_retry_delay_is_capped(monkeypatch):
+    monkeypatch.setattr(settings, "kafka_consumer_retry_max_delay", 2.0)
+    assert all(0 <= retry_delay(attempt) <= 2.0 for attempt in range(1, 30))
+
+
+@pytest.mark.asyncio
+async def test_transient_error_is_retried_without_blocking_other_reviews(monkeypatch):
+    monkeypatch.setattr(settings, "kafka_consumer_retry_base_delay", 0.01)
+    monkeypatch.setattr(settings, "kafka_consumer_max_attempts", 3)
+    dead_letters, handled = [], []
+
+    async def send_raw(records):
+        dead_letters.extend(records)
+
+    monkeypatch.setattr(consumer_module.event_producer, "send_raw", send_raw)
+    review_consumer = KafkaReviewConsumer()
+    failures = {"flaky": 1, "broken": 10}
+
+    async def handle_event(topic, event_data):
+        review_id = event_data["data"]["review_id"]
+        if failures.get(review_id, 0) > 0:
+            failures[review_id] -= 1
+            raise OperationalError("INSERT", {}, ConnectionResetError())
+        handled.append((review_id, event_data["data"]["rating"]))
+
+    review_consumer.handle_event = handle_event
+    tp = TopicPartition(CREATED, 0)
+    tracker = review_consumer._trackers[tp] = PartitionOffsetTracker()
+    messages = [_message(0, "flaky"), _message(1, "other"), _message(2, "flaky"), _message(3, "broken"), _message(4, "bad", b"{")]
+    for msg in messages:
+        tracker.add(msg.offset)
+        await review_consumer.process_message(tp, msg)
+
+    # Пока flaky ждёт повтора, остальные отзывы уже обработаны, а битое сообщение ушло в DLQ
+    assert handled == [("other", 5)]
+    assert tracker.committable() == 0
+    await asyncio.wait_for(tracker.wait_idle(), timeout=5)
+
+    assert handled == [("other", 5), ("flaky", 5), ("flaky", 5)]
+    assert [(header(h, "dlq-original-offset"), header(h, "dlq-error-class")) for _, _, _, h in dead_letters] == [
+        ("4", "permanent"),
+        ("3", "retries_exhausted"),
+    ]
+    assert all(topic == settings.kafka_dead_letter_topic and key == b"key" for topic, _, key, _ in dead_letters)
+    assert tracker.committable() == 5
+    assert not review_consumer._retrying
+
+
+@pytest.mark.asyncio
+async def test_stop_waits_for_pending_retries(monkeypatch):
+    monkeypatch.setattr(settings, "kafka_consumer_retry_base_delay", 60.0)
+    review_consumer = KafkaReviewConsumer()
+
+    async def handle_event(topic, event_data):
+        raise OperationalError("INSERT", {}, ConnectionResetError())
+
+    review_consumer.handle_event = handle_event
+    await review_consumer.process_message(TopicPartition(CREATED, 0), _message(0, "flaky"))
+    assert review_consumer._retry_tasks
+
+    await review_consumer.stop()
+    # Повтор отменён и завершён до возврата из stop - продюсер можно останавливать
+    assert not review_consumer._retry_tasks and not review_consumer._retrying
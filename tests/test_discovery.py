@@ -0,0 +1,52 @@
+import uuid
+from datetime import datetime
+
+import pytest
+
+from src.schemas.dish import DishCreate
+from src.schemas.restaurant import RestaurantUpdate
+from src.services.dish import create_dish
+from src.services.restaurant import update_restaurant
+from src.utils.opening_hours import opening_intervals
+
+MONDAY_NOON = datetime(2026, 10, 19, 12, 0)
+MONDAY_LATE = datetime(2026, 10, 19, 23, 30)
+TUESDAY_EARLY = datetime(2026, 10, 20, 0, 30)
+
+
+def test_opening_intervals_parsing():
+    assert opening_intervals({"mon": "10:00-22:00"}) == [(600, 1320)]
+    # Работа через полночь переходит на следующий день, воскресенье - на понедельник
+    assert opening_intervals({"sun": "20:00-03:00"}) == [(0, 180), (9840, 10080)]
+    assert opening_intervals({"mon-tue": "9-18", "wed": "closed"}) == [(540, 1080), (1980, 2520)]
+    assert opening_intervals({"daily": "24h"}) == [(0, 10080)]
+    assert opening_intervals({"someday": "whenever"}) == []
+    assert opening_intervals(None) == []
+
+
+@pytest.mark.asyncio
+async def test_discover_open_now_and_dish_facets(client, db, menu):
+    marker = f"ing{uuid.uuid4().hex[:8]}"
+    await create_dish(db, menu["restaurant_id"], menu["category_id"], DishCreate(
+        name="Nut cake", price=250, preparation_time=15, ingredients=[marker], allergens=["nuts"],
+    ))
+    await create_dish(db, menu["restaurant_id"], menu["category_id"], DishCreate(
+        name="Tea", price=80, preparation_time=2, ingredients=[marker],
+    ))
+    await update_restaurant(db, menu["restaurant_id"], RestaurantUpdate(opening_hours={"mon": "10:00-01:00"}))
+
+    async def discover(**params):
+        response = await client.get("/restaurants/discover", params={"ingredients": [marker], **params})
+        assert response.status_code == 200
+        return [item["id"] for item in response.json()]
+
+    assert await discover() == [menu["restaurant_id"]]
+    assert await discover(open_at=MONDAY_NOON.isoformat()) == [menu["restaurant_id"]]
+    assert await discover(open_at=TUESDAY_EARLY.isoformat()) == [menu["restaurant_id"]]
+    assert await discover(open_at=datetime(2026, 10, 20, 12, 0).isoformat()) == []
+
+    assert await discover(min_price=200, exclude_allergens=["nuts"]) == []
+    assert await discover(max_price=100, exclude_allergens=["nuts"]) == [menu["restaurant_id"]]
+
+    await update_restaurant(db, menu["restaurant_id"], RestaurantUpdate(opening_hours={"tue": "12-14"}))
+    assert await discover(open_at=MONDAY_LATE.isoformat()) == []
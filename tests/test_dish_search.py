@@ -0,0 +1,53 @@
+import uuid
+
+import pytest
+
+from src.schemas.dish import DishCreate
+from src.services.dish import create_dish
+
+
+@pytest.mark.asyncio
+async def test_search_ranks_name_matches_first(client, db, menu):
+    word = f"zq{uuid.uuid4().hex[:8]}"
+    in_name = await create_dish(db, menu["restaurant_id"], menu["category_id"], DishCreate(
+        name=f"Pasta {word}", price=300, preparation_time=10,
+    ))
+    in_ingredients = await create_dish(db, menu["restaurant_id"], menu["category_id"], DishCreate(
+        name="Pizza", ingredients=[word, "cheese"], price=500, preparation_time=20,
+    ))
+
+    response = await client.get("/dishes/search", params={"q": word})
+    assert response.status_code == 200
+    assert [item["id"] for item in response.json()] == [in_name.id, in_ingredients.id]
+    assert response.json()[0]["restaurant_id"] == menu["restaurant_id"]
+
+    response = await client.get("/dishes/search", params={"q": word, "min_price": 400})
+    assert [item["id"] for item in response.json()] == [in_ingredients.id]
+
+
+@pytest.mark.asyncio
+async def test_search_keyset_pagination(client, db, menu):
+    word = f"zq{uuid.uuid4().hex[:8]}"
+    ids = []
+    for i in range(5):
+        dish = await create_dish(db, menu["restaurant_id"], menu["category_id"], DishCreate(
+            name=f"Dish {i} {word}", price=100, preparation_time=5,
+        ))
+        ids.append(dish.id)
+
+    seen, cursor = [], None
+    while True:
+        params = {"q": word, "restaurant_id": menu["restaurant_id"], "limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        response = await client.get("/dishes/search", params=params)
+        assert response.status_code == 200
+        seen += [item["id"] for item in response.json()]
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+    assert sorted(seen) == sorted(ids)
+    assert len(seen) == len(set(seen))
+
+    response = await client.get("/dishes/search", params={"q": word, "cursor": "garbage"})
+    assert response.status_code == 400
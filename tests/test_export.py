@@ -0,0 +1,101 @@
+import json
+import uuid
+
+import pytest
+from sqlalchemy import func, select
+
+from src.core.config import settings
+from src.schemas.dish import Dish as DishSchema, DishCreate
+from src.schemas.menu_category import MenuCategoryCreate, MenuCategoryUpdate
+from src.schemas.restaurant import Restaurant as RestaurantSchema, RestaurantUpdate
+from src.schemas.review import Review as ReviewSchema
+from src.services.dish import create_dish
+from src.services.export import reviews_export_query, stream_ndjson
+from src.services.menu_category import create_menu_category, update_menu_category
+from src.services.restaurant import update_restaurant
+from src.services.review import create_review, update_review
+
+MENU_FIELDS = {"restaurant_id", "category_name", "category_order_index", "category_is_active"} | set(DishSchema.model_fields)
+
+
+async def _now(db):
+    # Отдельная завершённая транзакция: правки после неё получат updated_at не раньше этой метки
+    moment = (await db.execute(select(func.clock_timestamp()))).scalar_one()
+    await db.commit()
+    return moment
+
+
+async def _export(client, kind, updated_since=None):
+    params = {"updated_since": updated_since.isoformat()} if updated_since else {}
+    response = await client.get(f"/export/{kind}", params=params)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert response.content == b"" or response.content.endswith(b"\n")
+    return [json.loads(line) for line in response.content.splitlines()]
+
+
+async def _reviews(db, restaurant_id, count):
+    prefix = uuid.uuid4().hex
+    for n in range(count):
+        await create_review(db, {"review_id": f"{prefix}-{n}", "restaurant_id": restaurant_id, "user_id": 1, "rating": 3})
+    return [f"{prefix}-{n}" for n in range(count)]
+
+
+@pytest.mark.asyncio
+async def test_export_line_shapes(client, db, menu):
+    started = await _now(db)
+    await update_restaurant(db, menu["restaurant_id"], RestaurantUpdate(description="Exported"))
+    [review_id] = await _reviews(db, menu["restaurant_id"], 1)
+
+    restaurants = [row for row in await _export(client, "restaurants", started) if row["id"] == menu["restaurant_id"]]
+    assert len(restaurants) == 1
+    assert set(restaurants[0]) == set(RestaurantSchema.model_fields) | {"average_rating", "review_count"}
+    assert restaurants[0]["review_count"] == 1
+
+    dishes = [row for row in await _export(client, "menus") if row["restaurant_id"] == menu["restaurant_id"]]
+    assert [(row["id"], row["category_name"]) for row in dishes] == [(menu["dish_id"], "Main")]
+    assert set(dishes[0]) == MENU_FIELDS
+
+    reviews = [row for row in await _export(client, "reviews", started) if row["review_id"] == review_id]
+    assert len(reviews) == 1
+    assert set(reviews[0]) == set(ReviewSchema.model_fields)
+
+
+@pytest.mark.asyncio
+async def test_updated_since_filters_changed_rows(client, db, menu):
+    restaurant_id = menu["restaurant_id"]
+    other = await create_menu_category(db, restaurant_id, MenuCategoryCreate(name="Drinks", order_index=1))
+    other_dish = await create_dish(db, restaurant_id, other.id, DishCreate(name="Tea", price=50, preparation_time=2))
+    changed_review, unchanged_review = await _reviews(db, restaurant_id, 2)
+    since = await _now(db)
+
+    assert restaurant_id not in [row["id"] for row in await _export(client, "restaurants", since)]
+    await update_restaurant(db, restaurant_id, RestaurantUpdate(description="Changed"))
+    assert restaurant_id in [row["id"] for row in await _export(client, "restaurants", since)]
+
+    # Блюдо не менялось, но изменилась его категория - строка меню попадает в выгрузку
+    await update_menu_category(db, menu["category_id"], MenuCategoryUpdate(description="Changed"))
+    dish_ids = [row["id"] for row in await _export(client, "menus", since) if row["restaurant_id"] == restaurant_id]
+    assert dish_ids == [menu["dish_id"]]
+    assert other_dish.id not in dish_ids
+
+    await update_review(db, {"review_id": changed_review, "new_rating": 5, "new_comment": "Changed"})
+    review_ids = [row["review_id"] for row in await _export(client, "reviews", since)]
+    assert changed_review in review_ids and unchanged_review not in review_ids
+
+
+@pytest.mark.asyncio
+async def test_export_reads_one_snapshot_across_batches(db, menu, monkeypatch):
+    monkeypatch.setattr(settings, "export_batch_size", 1)
+    since = await _now(db)
+    first, second, third = await _reviews(db, menu["restaurant_id"], 3)
+
+    chunks = stream_ndjson(reviews_export_query(since))
+    exported = [json.loads(line) for line in (await chunks.__anext__()).splitlines()]
+    assert [row["review_id"] for row in exported] == [first]
+
+    # Правка после первой пачки не видна: выгрузка читает снимок, взятый на её старте
+    await update_review(db, {"review_id": third, "new_rating": 1, "new_comment": "Changed"})
+    async for chunk in chunks:
+        exported += [json.loads(line) for line in chunk.splitlines()]
+    assert [(row["review_id"], row["rating"]) for row in exported] == [(first, 3), (second, 3), (third, 3)]
@@ -0,0 +1,61 @@
+import json
+import uuid
+import pytest
+
+from src.schemas.dish import Dish
+from src.schemas.menu_category import MenuCategory
+from src.schemas.restaurant import Restaurant
+from src.schemas.review import Review
+from src.services.dish import get_dishes
+from src.services.menu_category import get_menu_categories
+from src.services.restaurant import get_restaurants
+from src.services.review import create_review, get_restaurant_reviews
+from src.utils.serialization import dump_rows
+from tests.benchmark_serialization import legacy_json
+
+
+@pytest.mark.asyncio
+async def test_category_list_matches_response_model(client, db, menu):
+    response = await client.get(f"/restaurants/{menu['restaurant_id']}/menu/categories/")
+    expected = legacy_json(MenuCategory, await get_menu_categories(db, menu["restaurant_id"]))
+    assert response.content == expected
+
+
+@pytest.mark.asyncio
+async def test_dish_list_matches_response_model(client, db, menu):
+    url = f"/restaurants/{menu['restaurant_id']}/menu/dishes/categories/{menu['category_id']}/dishes"
+    response = await client.get(url)
+    assert response.content == legacy_json(Dish, await get_dishes(db, menu["category_id"]))
+
+
+@pytest.mark.asyncio
+async def test_review_list_matches_response_model(client, db, menu):
+    for rating in (3, 5):
+        await create_review(db, {
+            "review_id": uuid.uuid4().hex,
+            "restaurant_id": menu["restaurant_id"],
+            "user_id": rating,
+            "rating": rating,
+            "comment": "Отлично" if rating == 5 else None,
+        })
+    response = await client.get(f"/restaurants/{menu['restaurant_id']}/reviews?limit=1")
+    expected = legacy_json(Review, await get_restaurant_reviews(db, menu["restaurant_id"], limit=1))
+    assert response.content == expected
+    assert response.headers["X-Next-Cursor"]
+
+
+@pytest.mark.asyncio
+async def test_restaurant_list_matches_response_model(client, db, menu):
+    response = await client.get("/restaurants/?limit=5")
+    assert response.content == legacy_json(Restaurant, await get_restaurants(db, limit=5))
+
+
+@pytest.mark.parametrize("value", [1e-05, -2.5e-07, 1e16, 1.2345678901234568e17, 0.0001, 55.75, -0.0, 0.0])
+def test_float_values_survive_but_notation_may_differ(value):
+    # Координаты около нуля и distance_km: orjson не повторяет экспоненту json.dumps,
+    # поэтому гарантия - равенство значений, а не байтов
+    legacy = json.dumps([{"latitude": value}], separators=(",", ":")).encode()
+    body = dump_rows([{"latitude": value}])
+    assert json.loads(body) == json.loads(legacy) == [{"latitude": value}]
+    if 1e-4 <= abs(value) < 1e16 or value == 0:
+        assert body == legacy
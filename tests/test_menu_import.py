@@ -0,0 +1,43 @@
+import pytest
+from sqlalchemy import select
+
+from src.db.models.menu_category import MenuCategory
+
+
+def _category(name, order_index, dishes=()):
+    return {"name": name, "order_index": order_index, "dishes": [
+        {"name": dish, "price": 100, "preparation_time": 5} for dish in dishes
+    ]}
+
+
+async def _order(db, restaurant_id):
+    result = await db.execute(
+        select(MenuCategory.name, MenuCategory.order_index)
+        .filter(MenuCategory.restaurant_id == restaurant_id)
+        .order_by(MenuCategory.order_index)
+    )
+    rows = [tuple(row) for row in result]
+    await db.commit()
+    return rows
+
+
+@pytest.mark.asyncio
+async def test_upsert_reorders_and_renames_categories(db, client, menu):
+    restaurant_id = menu["restaurant_id"]
+    url = f"/restaurants/{restaurant_id}/menu/import"
+    response = await client.post(url, json={"categories": [
+        _category("Main", 0, ["Soup"]), _category("Drinks", 1, ["Tea"]), _category("Desserts", 2),
+    ]}, params={"upsert": "true"})
+    assert response.status_code == 200
+
+    # Main и Drinks меняются местами, Desserts переименован в Sweets и встаёт на занятую позицию
+    response = await client.post(url, json={"categories": [
+        _category("Drinks", 0, ["Tea"]), _category("Main", 1, ["Soup"]), _category("Sweets", 2),
+    ]}, params={"upsert": "true"})
+    assert response.status_code == 200, response.text
+    assert response.json() == {"categories_created": 1, "categories_updated": 2, "dishes_created": 0, "dishes_updated": 2}
+    # Категория, которой нет в импорте, остаётся и ставится после импортированных
+    assert await _order(db, restaurant_id) == [("Drinks", 0), ("Main", 1), ("Sweets", 2), ("Desserts", 3)]
+
+    response = await client.post(url, json={"categories": [_category("Desserts", 0), _category("Extra", 5)]})
+    assert response.status_code == 400
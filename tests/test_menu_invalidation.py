@@ -0,0 +1,56 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import select
+
+from src.db.models.outbox import OutboxEvent
+from src.schemas.dish import DishUpdate
+from src.services.dish import update_dish
+from src.services.restaurant import LIST_VERSION_KEY, MENU_SCOPE, menu_cache, restaurant_cache
+from src.utils.kafka.invalidation import CacheInvalidationSubscriber
+from src.utils.kafka.producer import EventType
+
+
+@pytest.mark.asyncio
+async def test_dish_write_publishes_menu_invalidation(db, menu):
+    restaurant_id = menu["restaurant_id"]
+    await update_dish(db, restaurant_id, menu["dish_id"], DishUpdate(price=150))
+
+    result = await db.execute(
+        select(OutboxEvent.payload)
+        .filter(OutboxEvent.topic == EventType.RESTAURANT_CACHE_INVALIDATED.value)
+        .order_by(OutboxEvent.id.desc())
+        .limit(1)
+    )
+    assert result.scalar_one()["data"] == {"restaurant_ids": [restaurant_id], "scope": MENU_SCOPE}
+
+
+class _Messages:
+    def __init__(self, payloads):
+        self._messages = iter(
+            SimpleNamespace(offset=offset, value=json.dumps(payload).encode()) for offset, payload in enumerate(payloads)
+        )
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._messages)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+@pytest.mark.asyncio
+async def test_menu_scope_drops_only_the_menu():
+    menu_cache.set(-1, b"[]")
+    version = await restaurant_cache.backend.get(LIST_VERSION_KEY)
+
+    subscriber = CacheInvalidationSubscriber()
+    subscriber.consumer = _Messages([{"data": {"restaurant_ids": [-1], "scope": MENU_SCOPE}}])
+    await subscriber._run()
+
+    assert subscriber.stats == {"received": 1, "invalidated": 1, "failed": 0}
+    assert menu_cache.get(-1) is None
+    assert await restaurant_cache.backend.get(LIST_VERSION_KEY) == version
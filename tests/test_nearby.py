@@ -0,0 +1,58 @@
+import math
+import random
+import uuid
+
+import pytest
+
+from src.schemas.restaurant import RestaurantCreate, RestaurantUpdate
+from src.services.restaurant import create_restaurant, update_restaurant
+from src.utils.geo import KM_PER_DEGREE, cell_ranges, geo_cell
+
+
+def _covered(cell: int, ranges) -> bool:
+    return any(first <= cell <= last for first, last in ranges)
+
+
+@pytest.mark.parametrize("latitude, longitude", [(55.75, 37.61), (-33.9, 151.2), (64.1, 179.99), (89.9, 0.0)])
+def test_cell_ranges_cover_the_radius(latitude, longitude):
+    rng = random.Random(42)
+    radius_km = 12.0
+    ranges = cell_ranges(latitude, longitude, radius_km)
+    for _ in range(500):
+        bearing = rng.uniform(0, 2 * math.pi)
+        distance = rng.uniform(0, radius_km)
+        point_lat = latitude + distance * math.cos(bearing) / KM_PER_DEGREE
+        point_lon = longitude + distance * math.sin(bearing) / (KM_PER_DEGREE * math.cos(math.radians(latitude)))
+        point_lat = max(min(point_lat, 90.0), -90.0)
+        point_lon = (point_lon + 180) % 360 - 180
+        assert _covered(geo_cell(point_lat, point_lon), ranges)
+
+
+async def _restaurant(db, latitude, longitude):
+    return await create_restaurant(db, RestaurantCreate(
+        name=f"Geo restaurant {uuid.uuid4().hex}",
+        address="Test street, 1",
+        phone="+70000000000",
+        email="test@example.com",
+        latitude=latitude,
+        longitude=longitude,
+    ))
+
+
+@pytest.mark.asyncio
+async def test_nearby_orders_by_distance(client, db):
+    # Случайная точка в океане, чтобы не пересекаться с данными других тестов
+    latitude, longitude = random.uniform(-50, -40), random.uniform(-140, -100)
+    near = await _restaurant(db, latitude + 0.01, longitude)
+    far = await _restaurant(db, latitude - 0.05, longitude + 0.05)
+    outside = await _restaurant(db, latitude + 0.5, longitude)
+
+    response = await client.get("/restaurants/nearby", params={"lat": latitude, "lon": longitude, "radius_km": 10})
+    assert response.status_code == 200
+    items = response.json()
+    assert [item["id"] for item in items] == [near.id, far.id]
+    assert items[0]["distance_km"] == pytest.approx(0.01 * KM_PER_DEGREE, rel=1e-3)
+
+    await update_restaurant(db, outside.id, RestaurantUpdate(latitude=latitude, longitude=longitude))
+    response = await client.get("/restaurants/nearby", params={"lat": latitude, "lon": longitude, "radius_km": 10, "limit": 1})
+    assert [item["id"] for item in response.json()] == [outside.id]
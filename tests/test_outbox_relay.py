@@ -0,0 +1,76 @@
+import uuid
+
+import pytest
+from sqlalchemy import select
+
+from src.db.models.outbox import OutboxEvent
+from src.db.session import AsyncSessionLocal
+from src.services.outbox import add_outbox_events
+from src.utils.kafka import outbox_relay as relay_module
+from src.utils.kafka.outbox_relay import OutboxRelay
+from src.utils.kafka.producer import EventType
+
+
+async def _seed(db, key, count):
+    await add_outbox_events(db, [(EventType.DISH_UPDATED, {"n": n}, key) for n in range(count)])
+    await db.commit()
+    result = await db.execute(select(OutboxEvent.id).filter(OutboxEvent.key == key).order_by(OutboxEvent.id))
+    return result.scalars().all()
+
+
+async def _remaining(db, key):
+    result = await db.execute(select(OutboxEvent.id).filter(OutboxEvent.key == key).order_by(OutboxEvent.id))
+    ids = result.scalars().all()
+    await db.commit()
+    return ids
+
+
+async def _drain(relay):
+    while await relay.relay_batch():
+        pass
+
+
+@pytest.mark.asyncio
+async def test_relay_skips_locked_rows_and_deletes_sent(db, monkeypatch):
+    key = uuid.uuid4().hex
+    ids = await _seed(db, key, 3)
+    sent = []
+
+    async def send_batch(records):
+        sent.extend(payload["data"]["n"] for _, payload, record_key in records if record_key == key)
+
+    monkeypatch.setattr(relay_module.event_producer, "send_batch", send_batch)
+    relay = OutboxRelay(batch_size=2)
+
+    # Строку держит другая транзакция (второй экземпляр relay) - её пропускаем, не ждём
+    async with AsyncSessionLocal() as other:
+        async with other.begin():
+            await other.execute(select(OutboxEvent.id).filter(OutboxEvent.id == ids[1]).with_for_update())
+            await _drain(relay)
+            assert sent == [0, 2]
+            assert await _remaining(db, key) == [ids[1]]
+
+    await _drain(relay)
+    assert sent == [0, 2, 1]
+    assert await _remaining(db, key) == []
+
+
+@pytest.mark.asyncio
+async def test_failed_send_keeps_events(db, monkeypatch):
+    key = uuid.uuid4().hex
+    ids = await _seed(db, key, 2)
+
+    async def send_batch(records):
+        raise ConnectionError("broker is down")
+
+    monkeypatch.setattr(relay_module.event_producer, "send_batch", send_batch)
+    with pytest.raises(ConnectionError):
+        await OutboxRelay(batch_size=1000).relay_batch()
+    assert await _remaining(db, key) == ids
+
+    async def delivered(records):
+        pass
+
+    monkeypatch.setattr(relay_module.event_producer, "send_batch", delivered)
+    await _drain(OutboxRelay(batch_size=1000))
+    assert await _remaining(db, key) == []
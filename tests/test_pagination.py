@@ -0,0 +1,59 @@
+import uuid
+
+import pytest
+from sqlalchemy import func, update
+
+from src.db.models.review import Review
+from src.services.review import create_review
+from src.utils.pagination import InvalidCursor, decode_cursor, encode_cursor
+
+
+def test_cursor_round_trip_is_url_safe():
+    values = ["2026-10-17T10:00:00.123456+00:00", 2**40, 4.25, None, "ключ/?+"]
+    cursor = encode_cursor(values)
+    assert "=" not in cursor and "+" not in cursor and "/" not in cursor
+    assert decode_cursor(cursor, len(values)) == values
+
+
+@pytest.mark.parametrize("cursor", ["garbage", "", "!!!", encode_cursor({"id": 1}), encode_cursor([1, 2, 3])])
+def test_malformed_cursor_is_rejected(cursor):
+    with pytest.raises(InvalidCursor):
+        decode_cursor(cursor, 2)
+
+
+async def _pages(client, restaurant_id, limit):
+    pages, cursor = [], None
+    while True:
+        params = {"limit": limit}
+        if cursor:
+            params["cursor"] = cursor
+        response = await client.get(f"/restaurants/{restaurant_id}/reviews", params=params)
+        assert response.status_code == 200
+        pages.append([item["review_id"] for item in response.json()])
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            return pages
+
+
+@pytest.mark.asyncio
+async def test_review_pages_split_ties_on_created_at(db, client, menu):
+    restaurant_id = menu["restaurant_id"]
+    prefix = uuid.uuid4().hex
+    review_ids = [f"{prefix}-{n}" for n in range(4)]
+    for review_id in review_ids:
+        await create_review(db, {"review_id": review_id, "restaurant_id": restaurant_id, "user_id": 1, "rating": 5})
+    # Одинаковый created_at у всех отзывов: порядок и граница страницы держатся на id
+    await db.execute(update(Review).filter(Review.review_id.in_(review_ids)).values(created_at=func.now()))
+    await db.commit()
+
+    pages = await _pages(client, restaurant_id, limit=3)
+    assert [len(page) for page in pages] == [3, 1]
+    assert sorted(sum(pages, [])) == sorted(review_ids)
+
+    # Последняя страница заполнена целиком: курсор ещё выдаётся, следующая страница пустая
+    pages = await _pages(client, restaurant_id, limit=2)
+    assert [len(page) for page in pages] == [2, 2, 0]
+    assert sorted(sum(pages, [])) == sorted(review_ids)
+
+    response = await client.get(f"/restaurants/{restaurant_id}/reviews", params={"cursor": encode_cursor(["yesterday", 1])})
+    assert response.status_code == 400
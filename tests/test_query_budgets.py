@@ -0,0 +1,68 @@
+import pytest
+
+from tests.conftest import assert_max_queries
+
+
+@pytest.mark.asyncio
+async def test_read_dish_budget(client, menu):
+    url = f"/restaurants/{menu['restaurant_id']}/menu/dishes/{menu['dish_id']}"
+    with assert_max_queries(1):
+        response = await client.get(url)
+    assert response.status_code == 200
+    assert response.json()["id"] == menu["dish_id"]
+
+
+@pytest.mark.asyncio
+async def test_read_dish_from_other_restaurant_is_404(client, menu):
+    url = f"/restaurants/{menu['restaurant_id'] + 1000000}/menu/dishes/{menu['dish_id']}"
+    with assert_max_queries(1):
+        response = await client.get(url)
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_create_dish_budget(client, menu):
+    url = f"/restaurants/{menu['restaurant_id']}/menu/dishes/categories/{menu['category_id']}/dishes"
+    # SELECT категории, INSERT блюда, INSERT в outbox
+    with assert_max_queries(3):
+        response = await client.post(url, json={"name": "Salad", "price": 50, "preparation_time": 5})
+    assert response.status_code == 201
+
+
+@pytest.mark.asyncio
+async def test_update_dish_budget(client, menu):
+    url = f"/restaurants/{menu['restaurant_id']}/menu/dishes/{menu['dish_id']}"
+    # UPDATE ... RETURNING, INSERT в outbox
+    with assert_max_queries(2):
+        response = await client.put(url, json={"price": 120})
+    assert response.status_code == 200
+    assert float(response.json()["price"]) == 120
+
+
+@pytest.mark.asyncio
+async def test_update_dish_availability_budget(client, menu):
+    url = f"/restaurants/{menu['restaurant_id']}/menu/dishes/{menu['dish_id']}/availability"
+    with assert_max_queries(2):
+        response = await client.put(url, json={"is_available": False})
+    assert response.status_code == 200
+    assert response.json()["is_available"] is False
+
+
+@pytest.mark.asyncio
+async def test_update_dish_from_other_restaurant_is_404(client, menu):
+    url = f"/restaurants/{menu['restaurant_id'] + 1000000}/menu/dishes/{menu['dish_id']}/availability"
+    with assert_max_queries(1):
+        response = await client.put(url, json={"is_available": False})
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_delete_dish_budget(client, menu):
+    url = f"/restaurants/{menu['restaurant_id']}/menu/dishes/{menu['dish_id']}"
+    # DELETE ... USING ... RETURNING, INSERT в outbox
+    with assert_max_queries(2):
+        response = await client.delete(url)
+    assert response.status_code == 204
+    with assert_max_queries(1):
+        response = await client.delete(url)
+    assert response.status_code == 404
@@ -0,0 +1,57 @@
+import uuid
+
+import pytest
+from sqlalchemy import text
+
+from src.core.config import settings
+from src.db.models.restaurant import Restaurant
+from src.schemas.restaurant import RestaurantCreate
+from src.services.restaurant import _restaurants_query, create_restaurant, ranking_score
+from src.services.review import apply_rating_delta, rebuild_ranking_scores
+
+
+async def _score(db, restaurant_id):
+    return (await db.execute(text("SELECT ranking_score FROM restaurants WHERE id = :id"), {"id": restaurant_id})).scalar()
+
+
+@pytest.mark.asyncio
+async def test_single_five_star_review_ranks_below_many_good_reviews(db, menu):
+    lucky = menu["restaurant_id"]
+    popular = (await create_restaurant(db, RestaurantCreate(
+        name=f"Popular restaurant {uuid.uuid4().hex}",
+        address="Test street, 2",
+        phone="+70000000000",
+        email="test@example.com",
+    ))).id
+    await apply_rating_delta(db, lucky, 5, 1)
+    await apply_rating_delta(db, popular, 230, 50)
+    await db.commit()
+
+    assert await _score(db, lucky) == pytest.approx(ranking_score(5, 1))
+    assert await _score(db, popular) == pytest.approx(ranking_score(230, 50))
+    assert await _score(db, popular) > await _score(db, lucky)
+
+
+@pytest.mark.asyncio
+async def test_listing_is_read_in_index_order(db):
+    await db.execute(text("SET LOCAL enable_seqscan = off"))
+    query = _restaurants_query([Restaurant.id], 0, 20, None).compile(compile_kwargs={"literal_binds": True})
+    plan = "\n".join(row[0] for row in await db.execute(text(f"EXPLAIN {query}")))
+    await db.rollback()
+    assert "ix_restaurants_ranking" in plan
+    assert "Sort" not in plan
+
+
+@pytest.mark.asyncio
+async def test_rebuild_applies_new_prior(db, menu, monkeypatch):
+    restaurant_id = menu["restaurant_id"]
+    monkeypatch.setattr(settings, "ranking_prior_mean", 1.0)
+    updated, last_id = await rebuild_ranking_scores(db, restaurant_id - 1, batch_size=1)
+    await db.commit()
+    assert (updated, last_id) == (1, restaurant_id)
+    assert await _score(db, restaurant_id) == pytest.approx(1.0)
+
+    monkeypatch.undo()
+    await rebuild_ranking_scores(db, restaurant_id - 1, batch_size=1)
+    await db.commit()
+    assert await _score(db, restaurant_id) == pytest.approx(ranking_score(0, 0))
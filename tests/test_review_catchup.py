@@ -0,0 +1,81 @@
+import uuid
+from collections import deque, namedtuple
+
+import pytest
+from sqlalchemy import select
+
+from src.db.models.review import Review
+from src.services.review import apply_folded_review_events, apply_review_events, find_rating_drift, fold_review_event
+from src.utils.kafka.consumer import _take_ready
+
+Message = namedtuple("Message", "topic partition offset timestamp")
+
+
+def _created(review_id, restaurant_id, rating):
+    return "created", {"review_id": review_id, "restaurant_id": restaurant_id, "user_id": 1, "rating": rating, "comment": None}
+
+
+def _updated(review_id, rating, comment=None):
+    return "updated", {"review_id": review_id, "new_rating": rating, "new_comment": comment}
+
+
+def _deleted(review_id):
+    return "deleted", {"review_id": review_id}
+
+
+async def _reviews(db, review_ids):
+    result = await db.execute(select(Review.review_id, Review.rating, Review.comment).filter(Review.review_id.in_(review_ids)))
+    return {row.review_id: (row.rating, row.comment) for row in result}
+
+
+def test_fold_keeps_outcome_for_existing_and_missing_review():
+    folded = {}
+    for kind, data in [_updated("r", 4, "ok"), _created("r", 1, 2), _updated("r", 5)]:
+        fold_review_event(folded, kind, data)
+    if_exists, if_missing = folded["r"]
+    # Отзыв уже был: повторное создание игнорируется, обновления применяются к строке из БД
+    assert if_exists == {"existing": True, "rating": 5, "comment": None}
+    # Отзыва не было: первое обновление теряется, как и при пособытийной обработке
+    assert if_missing["existing"] is False and if_missing["rating"] == 5
+
+
+@pytest.mark.asyncio
+async def test_bulk_apply_writes_net_result_and_recomputes_ratings(db, menu):
+    restaurant_id = menu["restaurant_id"]
+    prefix = uuid.uuid4().hex
+    kept, replaced, fresh, transient, unknown = (f"{prefix}-{name}" for name in ("kept", "replaced", "fresh", "transient", "unknown"))
+    await apply_review_events(db, [_created(kept, restaurant_id, 3), _created(replaced, restaurant_id, 1)])
+    await db.commit()
+
+    folded = {}
+    for kind, data in [
+        _created(kept, restaurant_id, 1),
+        _updated(kept, 4, "better"),
+        _deleted(replaced),
+        _created(replaced, restaurant_id, 5),
+        _created(fresh, restaurant_id, 2),
+        _updated(fresh, 3),
+        _created(transient, restaurant_id, 5),
+        _deleted(transient),
+        _updated(unknown, 1),
+    ]:
+        fold_review_event(folded, kind, data)
+    stats = await apply_folded_review_events(db, folded, recompute=True)
+    await db.commit()
+
+    assert stats == {"created": 2, "updated": 1, "deleted": 1, "restaurants": 1}
+    assert await _reviews(db, [kept, replaced, fresh, transient, unknown]) == {
+        kept: (4, "better"),
+        replaced: (5, None),
+        fresh: (3, None),
+    }
+    assert await find_rating_drift(db, [restaurant_id]) == []
+
+
+def test_take_ready_merges_partitions_up_to_watermark():
+    created = [Message("restaurant.review_created", 0, offset, timestamp) for offset, timestamp in enumerate((10, 20, 30))]
+    updated = [Message("restaurant.review_updated", 0, offset, timestamp) for offset, timestamp in enumerate((15, 25))]
+    pending = {"created": deque(created), "updated": deque(updated)}
+
+    assert [m.timestamp for m in _take_ready(pending, 25)] == [10, 15, 20, 25]
+    assert [m.timestamp for m in _take_ready(pending, None)] == [30]
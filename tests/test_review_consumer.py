@@ -0,0 +1,104 @@
+import asyncio
+import json
+import uuid
+from collections import namedtuple
+
+import pytest
+from aiokafka import TopicPartition
+
+from src.core.config import settings
+from src.utils.kafka.consumer import KafkaReviewConsumer
+from src.utils.kafka.offsets import PartitionOffsetTracker
+
+Message = namedtuple("Message", "topic partition offset timestamp key value headers")
+CREATED = "restaurant.review_created"
+UPDATED = "restaurant.review_updated"
+
+
+def _message(topic, timestamp, data):
+    return Message(topic, 0, 0, timestamp, None, json.dumps({"event_type": topic, "data": data}).encode(), [])
+
+
+@pytest.mark.asyncio
+async def test_parallel_dispatch_orders_poll_by_timestamp():
+    review_consumer = KafkaReviewConsumer()
+    review_id = uuid.uuid4().hex
+    created = _message(CREATED, 100, {"review_id": review_id, "restaurant_id": 1, "user_id": 1, "rating": 5})
+    updated = _message(UPDATED, 200, {"review_id": review_id, "new_rating": 1})
+    queues = [asyncio.Queue() for _ in range(8)]
+    # Опрос отдаёт партицию с изменением раньше партиции с созданием
+    await review_consumer._dispatch({TopicPartition(UPDATED, 0): [updated], TopicPartition(CREATED, 0): [created]}, queues)
+
+    routed = [[msg.topic for _, msg, _ in queue._queue] for queue in queues if not queue.empty()]
+    assert routed == [[CREATED, UPDATED]]
+
+
+@pytest.mark.asyncio
+async def test_tracker_commits_only_contiguous_prefix():
+    tracker = PartitionOffsetTracker()
+    assert tracker.committable() is None
+    for offset in (10, 11, 12):
+        tracker.add(offset)
+
+    # 11 и 12 обработаны, 10 ещё нет - коммитить можно только до 10
+    tracker.done(12)
+    tracker.done(11)
+    assert tracker.committable() == 10
+    tracker.mark_committed(10)
+    assert tracker.committable() is None
+
+    tracker.done(10)
+    assert tracker.committable() == 13
+    tracker.mark_committed(13)
+    assert tracker.committable() is None
+    await asyncio.wait_for(tracker.wait_idle(), timeout=1)
+
+    tracker.add(13)
+    assert tracker.committable() is None
+    tracker.done(13)
+    assert tracker.committable() == 14
+
+
+class _StreamingConsumer:
+    def __init__(self, messages):
+        self._messages = iter(messages)
+        self.commits = []
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._messages)
+        except StopIteration:
+            raise StopAsyncIteration
+
+    async def commit(self, offsets):
+        self.commits.append({tp.partition: offset for tp, offset in offsets.items()})
+
+    async def stop(self):
+        pass
+
+
+@pytest.mark.asyncio
+async def test_streaming_commits_every_n_events(monkeypatch):
+    monkeypatch.setattr(settings, "kafka_consumer_commit_every", 2)
+    monkeypatch.setattr(settings, "kafka_consumer_commit_interval_ms", 60_000)
+    review_consumer = KafkaReviewConsumer()
+
+    async def handle_event(topic, event_data):
+        pass
+
+    review_consumer.handle_event = handle_event
+    messages = [
+        _message(CREATED, offset, {"review_id": uuid.uuid4().hex, "restaurant_id": 1, "user_id": 1, "rating": 5})._replace(offset=offset)
+        for offset in range(5)
+    ]
+    review_consumer.consumer = _StreamingConsumer(messages)
+    await review_consumer.consume_messages()
+
+    # Один синхронный коммит на два события, а не на каждое; хвост коммитится при остановке
+    assert review_consumer.consumer.commits == [{0: 2}, {0: 4}]
+    review_consumer._is_connected = True
+    await review_consumer.stop()
+    assert review_consumer.consumer.commits[-1] == {0: 5}